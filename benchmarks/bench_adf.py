@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the conversion of Jira ADF documents to markdown.
+
+Generates a synthetic corpus of issue descriptions with headings, formatted
+text, mentions, nested lists, task lists, code blocks, quotes and tables, and
+times the iterative converter over the whole corpus:
+
+    python -m benchmarks.bench_adf --documents 5000 --repeat 5
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Any, Dict, List
+
+from src.adapters.jira_adf import adf_to_markdown
+
+WORDS = (
+    "project goal scope architecture service api database migration release risk decision "
+    "customer payment login search report dashboard latency budget deadline design review"
+).split()
+
+MARKS = [[], [], [], [{"type": "strong"}], [{"type": "em"}], [{"type": "code"}],
+         [{"type": "link", "attrs": {"href": "https://example.com"}}]]
+
+
+def make_documents(seed: int, count: int, blocks: int) -> List[Dict[str, Any]]:
+    """
+    Generate a deterministic synthetic corpus.
+
+    Args:
+        seed: Random seed
+        count: Number of documents
+        blocks: Top-level blocks per document
+
+    Returns:
+        ADF documents
+    """
+    rng = random.Random(seed)
+
+    def inline() -> List[Dict[str, Any]]:
+        nodes = []
+        for _ in range(rng.randint(2, 6)):
+            node = {"type": "text", "text": " ".join(rng.choice(WORDS) for _ in range(4)) + " "}
+            marks = rng.choice(MARKS)
+            if marks:
+                node["marks"] = marks
+            nodes.append(node)
+        if rng.random() < 0.2:
+            nodes.append({"type": "mention", "attrs": {"id": "1", "text": "@" + rng.choice(WORDS)}})
+        return nodes
+
+    def paragraph() -> Dict[str, Any]:
+        return {"type": "paragraph", "content": inline()}
+
+    def bullet_list(depth: int) -> Dict[str, Any]:
+        items = []
+        for _ in range(3):
+            content = [paragraph()]
+            if depth < 2 and rng.random() < 0.3:
+                content.append(bullet_list(depth + 1))
+            items.append({"type": "listItem", "content": content})
+        return {"type": "orderedList" if rng.random() < 0.3 else "bulletList", "content": items}
+
+    def table() -> Dict[str, Any]:
+        rows = [{"type": "tableRow", "content": [
+            {"type": "tableHeader" if index == 0 else "tableCell", "content": [paragraph()]} for _ in range(3)
+        ]} for index in range(4)]
+        return {"type": "table", "content": rows}
+
+    def block() -> Dict[str, Any]:
+        shape = rng.random()
+        if shape < 0.1:
+            return {"type": "heading", "attrs": {"level": rng.randint(1, 3)}, "content": inline()}
+        if shape < 0.3:
+            return bullet_list(0)
+        if shape < 0.35:
+            return {"type": "taskList", "content": [
+                {"type": "taskItem", "attrs": {"state": rng.choice(["DONE", "TODO"])}, "content": inline()}
+                for _ in range(3)
+            ]}
+        if shape < 0.4:
+            return {"type": "codeBlock", "attrs": {"language": "python"},
+                    "content": [{"type": "text", "text": "print('hello')\n" * 5}]}
+        if shape < 0.45:
+            return {"type": "blockquote", "content": [paragraph()]}
+        if shape < 0.5:
+            return table()
+        return paragraph()
+
+    return [{"type": "doc", "version": 1, "content": [block() for _ in range(blocks)]} for _ in range(count)]
+
+
+def count_nodes(documents: List[Dict[str, Any]]) -> int:
+    """
+    Count the nodes of a corpus.
+
+    Args:
+        documents: ADF documents
+
+    Returns:
+        Number of nodes, including the documents
+    """
+    total = 0
+    stack = list(documents)
+    while stack:
+        node = stack.pop()
+        total += 1
+        stack.extend(node.get("content") or [])
+    return total
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--documents", type=int, default=5000, help="Number of issue descriptions")
+    parser.add_argument("--blocks", type=int, default=10, help="Top-level blocks per document")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    documents = make_documents(args.seed, args.documents, args.blocks)
+    nodes = count_nodes(documents)
+
+    times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        texts = [adf_to_markdown(document) for document in documents]
+        times.append(time.perf_counter() - start)
+
+    median = statistics.median(times)
+    print(f"documents: {args.documents}, nodes: {nodes}, output: {sum(map(len, texts))} characters")
+    print(f"conversion: median {median * 1000:.1f} ms, min {min(times) * 1000:.1f} ms, "
+          f"{nodes / median:,.0f} nodes/s, {args.documents / median:,.0f} documents/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the conversion of Notion blocks to markdown.
+
+Generates a synthetic page with nested lists, toggles, code blocks, callouts
+and tables, and times the table-driven converter:
+
+    python -m benchmarks.bench_notion_blocks --blocks 20000 --repeat 5
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Any, Dict, List
+
+from src.adapters.notion_markdown import blocks_to_markdown
+
+WORDS = (
+    "project goal scope architecture service api database migration release risk decision "
+    "customer payment login search report dashboard latency budget deadline design review"
+).split()
+
+SIMPLE_TYPES = ["paragraph", "heading_1", "heading_2", "heading_3", "bulleted_list_item",
+                "numbered_list_item", "to_do", "quote", "callout", "code"]
+
+
+def make_blocks(seed: int, count: int, spans: int) -> List[Dict[str, Any]]:
+    """
+    Generate a deterministic synthetic page.
+
+    Args:
+        seed: Random seed
+        count: Approximate number of blocks, including nested ones
+        spans: Rich text spans per block
+
+    Returns:
+        Top-level blocks with nested blocks under "children"
+    """
+    rng = random.Random(seed)
+
+    def rich_text() -> List[Dict[str, Any]]:
+        return [{"plain_text": " ".join(rng.choice(WORDS) for _ in range(4)) + " "} for _ in range(spans)]
+
+    def block() -> Dict[str, Any]:
+        block_type = rng.choice(SIMPLE_TYPES)
+        return {"type": block_type, block_type: {"rich_text": rich_text(), "language": "python"}}
+
+    blocks = []
+    made = 0
+    while made < count:
+        shape = rng.random()
+        if shape < 0.1:
+            rows = [{"type": "table_row", "table_row": {"cells": [rich_text(), rich_text(), rich_text()]}}
+                    for _ in range(5)]
+            blocks.append({"type": "table", "table": {"table_width": 3, "has_column_header": True},
+                           "children": rows})
+            made += 1 + len(rows)
+        elif shape < 0.3:
+            parent = {"type": "toggle", "toggle": {"rich_text": rich_text()},
+                      "children": [block() for _ in range(3)]}
+            parent["children"][0]["children"] = [block(), block()]
+            blocks.append(parent)
+            made += 6
+        else:
+            blocks.append(block())
+            made += 1
+
+    return blocks
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--blocks", type=int, default=20000, help="Number of blocks")
+    parser.add_argument("--spans", type=int, default=3, help="Rich text spans per block")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed runs")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    blocks = make_blocks(args.seed, args.blocks, args.spans)
+
+    times = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        text = blocks_to_markdown(blocks)
+        times.append(time.perf_counter() - start)
+
+    median = statistics.median(times)
+    print(f"blocks: ~{args.blocks}, output: {len(text)} characters")
+    print(f"conversion: median {median * 1000:.1f} ms, min {min(times) * 1000:.1f} ms, "
+          f"{args.blocks / median:,.0f} blocks/s")
+
+
+if __name__ == "__main__":
+    main()
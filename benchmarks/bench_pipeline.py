@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+End-to-end summarization benchmark with recorded LLM responses.
+
+Record the responses of the real LLM once (requires OPENAI_API_KEY):
+
+    python -m benchmarks.bench_pipeline --record recordings/pipeline.jsonl
+
+Then replay them offline, deterministically and with the recorded latencies:
+
+    python -m benchmarks.bench_pipeline --replay recordings/pipeline.jsonl --repeat 5
+
+The synthetic project is generated from --seed, so record and replay runs
+must use the same seed and sizes for the prompts to match.
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Any, Dict, List
+
+from src.summarizers.llm import LLMSummarizer
+
+WORDS = (
+    "project goal scope architecture service api database migration release risk decision "
+    "customer payment login search report dashboard latency budget deadline design review "
+    "integration test deployment incident rollback feature backlog sprint milestone owner"
+).split()
+
+
+def make_project(seed: int, documents: int, tasks: int, document_size: int) -> Dict[str, Any]:
+    """
+    Generate a deterministic synthetic project.
+
+    Args:
+        seed: Random seed
+        documents: Number of Drive documents
+        tasks: Number of Jira tasks
+        document_size: Approximate number of words per document
+
+    Returns:
+        Project data in the format of DocumentationAgent
+    """
+    rng = random.Random(seed)
+
+    def text(words: int) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(words))
+
+    return {
+        "project_id": f"BENCH-{seed}",
+        "notion_data": {"id": "bench-page", "title": "Benchmark Project", "content": text(document_size)},
+        "drive_documents": [
+            {"id": f"doc{i}", "name": f"Document {i}", "type": "application/pdf",
+             "content": text(rng.randint(document_size // 10, document_size)), "url": ""}
+            for i in range(documents)
+        ],
+        "jira_tasks": [
+            {"key": f"BENCH-{i}", "summary": text(6), "description": text(30),
+             "issue_type": {"name": rng.choice(["Task", "Bug", "Story"])},
+             "status": {"name": "Done"}, "priority": {"name": rng.choice(["High", "Medium", "Low"])},
+             "created": "2024-01-01T00:00:00.000Z", "resolved": f"2024-02-{rng.randint(1, 28):02d}T00:00:00.000Z"}
+            for i in range(tasks)
+        ]
+    }
+
+
+def run_once(summarizer: LLMSummarizer, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Summarize the project once and time it.
+
+    Args:
+        summarizer: Summarizer to benchmark
+        data: Project data
+
+    Returns:
+        Time to first section, total time and section count
+    """
+    start = time.perf_counter()
+    first = None
+    sections = 0
+
+    for _ in summarizer.stream_summary(data):
+        sections += 1
+        if first is None:
+            first = time.perf_counter() - start
+
+    return {"first": first or 0.0, "total": time.perf_counter() - start, "sections": sections}
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--record", metavar="FILE", help="Record responses of the real LLM to FILE")
+    mode.add_argument("--replay", metavar="FILE", help="Replay responses recorded in FILE")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed factor, 0 to skip waiting")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--documents", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--document-size", type=int, default=1500)
+    args = parser.parse_args(argv)
+
+    config = {
+        "backend": "record" if args.record else "replay",
+        "recording_file": args.record or args.replay,
+        "replay_speed": args.speed,
+        "rate_limits": {"requests_per_minute": 10000, "tokens_per_minute": 10 ** 8}
+    }
+    data = make_project(args.seed, args.documents, args.tasks, args.document_size)
+    runs = [run_once(LLMSummarizer(config), data) for _ in range(1 if args.record else args.repeat)]
+
+    totals = [run["total"] for run in runs]
+    firsts = [run["first"] for run in runs]
+    print(f"runs: {len(runs)}, sections: {runs[0]['sections']}")
+    print(f"time to first section: median {statistics.median(firsts) * 1000:.1f} ms")
+    print(f"total time: median {statistics.median(totals):.3f} s, min {min(totals):.3f} s, max {max(totals):.3f} s")
+
+
+if __name__ == "__main__":
+    main()
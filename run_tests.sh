@@ -13,6 +13,18 @@ echo "Running notion adapter tests..."
 python -m pytest tests/test_notion_adapter.py -v
 echo ""
 
+echo "Running Google Drive adapter tests..."
+python -m pytest tests/test_gdrive_adapter.py -v
+echo ""
+
+echo "Running Jira adapter tests..."
+python -m pytest tests/test_jira_adapter.py -v
+echo ""
+
+echo "Running HTTP transport tests..."
+python -m pytest tests/test_http_transport.py -v
+echo ""
+
 echo "Running LLM summarizer tests..."
 python -m pytest tests/test_llm_summarizer.py -v
 echo ""
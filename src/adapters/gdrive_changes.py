@@ -0,0 +1,137 @@
+"""
+Persisted index of Drive project listings kept current with the Changes API.
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class DriveChangeIndex:
+    """
+    File listings of projects and the Drive changes start page token.
+
+    For every project discovered, the index keeps the files found and the
+    folders that were walked. Changes reported by the Drive Changes API since
+    the stored token are mapped back to projects through the changed file and
+    its parent folders, and the listings of those projects are dropped, so
+    only projects whose Drive content moved are listed again. The token and
+    the listings are saved together, which means a change is never consumed
+    without the affected listings being invalidated.
+    """
+
+    def __init__(self, path: str, settings: Dict[str, Any]):
+        """
+        Initialize the index.
+
+        Args:
+            path: JSON file of the index, created on the first save
+            settings: Discovery settings; listings made with other settings are discarded
+        """
+        self.path = path
+        self.settings = settings
+        self.start_page_token: Optional[str] = None
+        self._projects: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        self._load()
+
+    def get_files(self, project_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the files of a project if its listing is current.
+
+        Args:
+            project_id: ID of the project
+
+        Returns:
+            File metadata, None if the project has to be listed
+        """
+        with self._lock:
+            entry = self._projects.get(project_id)
+            return list(entry["files"]) if entry else None
+
+    def record(self, project_id: str, folders: Iterable[str], files: List[Dict[str, Any]]) -> None:
+        """
+        Store the listing of a project.
+
+        Args:
+            project_id: ID of the project
+            folders: IDs of the folders walked
+            files: File metadata found
+        """
+        with self._lock:
+            self._projects[project_id] = {"folders": sorted(set(folders)), "files": files}
+
+    def apply_changes(self, changes: List[Dict[str, Any]]) -> Set[str]:
+        """
+        Drop the listings of the projects affected by changes.
+
+        A change affects a project if the changed file or folder was part of
+        its listing or is, or was moved, into one of its walked folders.
+
+        Args:
+            changes: Change resources of the Drive Changes API
+
+        Returns:
+            IDs of the affected projects
+        """
+        with self._lock:
+            owners: Dict[str, Set[str]] = {}
+            for project_id, entry in self._projects.items():
+                for item_id in entry["folders"]:
+                    owners.setdefault(item_id, set()).add(project_id)
+                for file in entry["files"]:
+                    owners.setdefault(file["id"], set()).add(project_id)
+
+            affected: Set[str] = set()
+            for change in changes:
+                file = change.get("file") or {}
+                for item_id in [change.get("fileId") or file.get("id")] + list(file.get("parents") or []):
+                    affected.update(owners.get(item_id, ()))
+
+            for project_id in affected:
+                del self._projects[project_id]
+
+        if affected:
+            logger.info(f"Drive changes affect {len(affected)} projects: {', '.join(sorted(affected))}")
+        return affected
+
+    def save(self) -> None:
+        """Write the token and the listings to disk."""
+        with self._lock:
+            state = {"start_page_token": self.start_page_token, "settings": self.settings,
+                     "projects": self._projects}
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save the Drive change index: {e}")
+
+    def _load(self) -> None:
+        """Read the token and the listings from disk."""
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read the Drive change index: {e}")
+            return
+
+        self.start_page_token = state.get("start_page_token")
+        if state.get("settings") == self.settings:
+            self._projects = state.get("projects", {})
+        else:
+            logger.info("Drive discovery settings changed, all projects will be listed again")
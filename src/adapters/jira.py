@@ -2,12 +2,140 @@
 Jira API adapter for the Documentation Agent.
 """
 
+import base64
+import hashlib
 import logging
 import os
-from typing import Dict, List, Any, Optional
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlparse
+
+from src.adapters.jira_adf import adf_to_markdown
+from src.adapters.jira_store import JiraIssueStore
+from src.utils.http import get_shared_transport, requests_session
 
 logger = logging.getLogger(__name__)
 
+# Issue fields used by the summarizer
+ISSUE_FIELDS = ["summary", "description", "issuetype", "status", "priority", "assignee",
+                "labels", "created", "updated", "resolutiondate", "parent", "attachment"]
+
+# Maximum page size of the Jira Cloud search API
+MAX_PAGE_SIZE = 100
+
+# Maximum number of issues per bulk changelog request
+CHANGELOG_BATCH_SIZE = 1000
+
+# Mock the atlassian-python-api Jira client
+class Jira:
+    """Mock Jira client from atlassian-python-api."""
+    def __init__(self, url, username=None, password=None, cloud=True, **kwargs):
+        self.url = url
+        self.issues = [
+            {
+                "key": "TEST-1",
+                "id": "1001",
+                "fields": {
+                    "summary": "Implement feature 1",
+                    "description": "Implement the first key feature of the project",
+                    "issuetype": {"name": "Task"},
+                    "status": {"name": "Done", "statusCategory": {"name": "Done"}},
+                    "priority": {"name": "High"}
+                }
+            },
+            {
+                "key": "TEST-2",
+                "id": "1002",
+                "fields": {
+                    "summary": "Implement feature 2",
+                    "description": "Implement the second key feature of the project",
+                    "issuetype": {"name": "Task"},
+                    "status": {"name": "Done", "statusCategory": {"name": "Done"}},
+                    "priority": {"name": "Medium"}
+                }
+            }
+        ]
+        
+    def jql(self, jql, fields="*all", start=0, limit=None, **kwargs):
+        issues = self.issues[start:start + limit if limit else None]
+        return {"startAt": start, "maxResults": limit, "total": len(self.issues), "issues": issues}
+        
+    def post(self, path, data=None, **kwargs):
+        return {"issueChangeLogs": []}
+
+
+def _quote(value: str) -> str:
+    """
+    Quote a value for use in a JQL query.
+
+    Args:
+        value: Value to quote
+
+    Returns:
+        Quoted value
+    """
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def build_jql(project_key: str, statuses: List[str], exclude_labels: List[str],
+              updated_since: Optional[datetime] = None) -> str:
+    """
+    Compile the issue filters into a JQL query.
+
+    Issues are ordered by last update, newest first, so a search capped at
+    max_issues_to_fetch keeps the most recent issues; the key breaks ties,
+    so the result windows of a paginated search are stable.
+
+    Args:
+        project_key: Jira project key
+        statuses: Statuses to include, all if empty
+        exclude_labels: Labels of the issues to exclude
+        updated_since: Only include issues updated at or after this time
+
+    Returns:
+        JQL query
+    """
+    clauses = [f"project = {_quote(project_key)}"]
+    if updated_since is not None:
+        # JQL dates have minute precision
+        clauses.append(f"updated >= {_quote(updated_since.strftime('%Y/%m/%d %H:%M'))}")
+    if statuses:
+        clauses.append(f"status in ({', '.join(_quote(status) for status in statuses)})")
+    if exclude_labels:
+        # "labels not in" alone also excludes the issues without labels
+        labels = ", ".join(_quote(label) for label in exclude_labels)
+        clauses.append(f"(labels is EMPTY or labels not in ({labels}))")
+    return " and ".join(clauses) + " order by updated desc, key desc"
+
+
+def parse_time(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse a Jira timestamp.
+
+    Args:
+        value: Timestamp, e.g. "2024-01-05T10:00:00.000+0000"
+
+    Returns:
+        Timezone-aware time, None if the value is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+    except ValueError:
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+
+
+class DownloadError(Exception):
+    """Raised when an issue attachment cannot be downloaded."""
+
 
 class JiraClient:
     """Client for interacting with the Jira API."""
@@ -17,51 +145,375 @@ class JiraClient:
         Initialize the Jira client.
         
         Args:
-            jira_url: Base URL of the Jira instance
+            jira_url: URL of the Jira instance, or of a project or issue in it
             config: Configuration for the Jira client
         """
-        self.url = jira_url
+        self.url, self.project_key = self._parse_url(jira_url)
         self.config = config
         self.email = os.environ.get("JIRA_EMAIL", "")
         self.api_token = os.environ.get("JIRA_API_TOKEN", "")
         
         # Configuration parameters
         self.include_statuses = config.get("include_statuses", ["Done"])
+        self.exclude_labels = config.get("exclude_labels", [])
         self.max_issues = config.get("max_issues_to_fetch", 50)
+        self.page_size = min(config.get("page_size", MAX_PAGE_SIZE), MAX_PAGE_SIZE)
+        self.fetch_workers = config.get("fetch_workers", 4)
+        self.sync_overlap = timedelta(hours=config.get("sync_overlap_hours", 24))
+        self.reconcile_interval = config.get("reconcile_hours", 24) * 3600
+        self.fetch_changelogs = config.get("fetch_changelogs", True)
+        self.fields = ISSUE_FIELDS + (["comment"] if config.get("include_comments", False) else [])
         
-        # Just a placeholder for testing - actual implementation would use atlassian-python-api
-        self.client = "mock_client"
+        # Issues are synced into a local store per site
+        self.store: Optional[JiraIssueStore] = None
+        if config.get("store_dir"):
+            site = urlparse(self.url).netloc or re.sub(r"\W+", "_", self.url)
+            self.store = JiraIssueStore(os.path.join(config["store_dir"], f"{site}.sqlite3"))
         
-        logger.info(f"Jira client initialized for URL: {jira_url}")
+        # Clients of atlassian-python-api are not thread-safe, so every thread
+        # gets its own, all sending their requests through the shared transport
+        self.transport = get_shared_transport()
+        self._local = threading.local()
+        
+        logger.info(f"Jira client initialized for URL: {self.url}")
     
     def get_project_issues(self, project_id: str) -> List[Dict[str, Any]]:
         """
         Get issues for the project from Jira.
         
+        The status and label filters are part of the JQL query and only the
+        fields used by the summarizer are requested. The first page reveals
+        the total number of matching issues, and the remaining pages up to
+        max_issues_to_fetch are fetched concurrently. With store_dir set, the
+        issues updated since the last sync are fetched into the local store
+        instead and the filtered issues are served from it.
+        
         Args:
-            project_id: ID of the project
-            
+            project_id: Jira project key, used if the Jira URL names no project
+        
         Returns:
             List of issue data
         """
-        # Placeholder implementation for testing
-        return [
-            {
-                "key": "TEST-1",
-                "id": "1001",
-                "summary": "Implement feature 1",
-                "description": "Implement the first key feature of the project",
-                "issue_type": {"name": "Task"},
-                "status": {"name": "Done", "category": "Done"},
-                "priority": {"name": "High"}
-            },
-            {
-                "key": "TEST-2",
-                "id": "1002",
-                "summary": "Implement feature 2",
-                "description": "Implement the second key feature of the project",
-                "issue_type": {"name": "Task"},
-                "status": {"name": "Done", "category": "Done"},
-                "priority": {"name": "Medium"}
-            }
-        ]
\ No newline at end of file
+        project = self.project_key or project_id
+        if self.store is not None:
+            self.sync_project(project)
+            return self._stored_issues(project)
+        
+        jql = build_jql(project, self.include_statuses, self.exclude_labels)
+        tasks = [self._to_task(issue) for issue in self._search_all(jql, self.max_issues)]
+        self._attach_changelogs(tasks)
+        return tasks
+    
+    def sync_project(self, project: str) -> int:
+        """
+        Fetch the issues of a project updated since its watermark into the store.
+        
+        The first sync fetches every issue of the project. Later syncs ask for
+        the issues updated since the latest update seen, minus
+        sync_overlap_hours since JQL dates are in the timezone of the user;
+        issues fetched again are simply overwritten. Every reconcile_hours,
+        the keys of the project are listed and the stored issues that were
+        deleted or moved to another project are removed.
+        
+        Args:
+            project: Jira project key
+        
+        Returns:
+            Number of issues fetched
+        """
+        watermark = self.store.watermark(project)
+        since = None
+        if watermark is not None:
+            since = datetime.fromtimestamp(watermark, timezone.utc) - self.sync_overlap
+        
+        tasks = [self._to_task(issue) for issue in self._search_all(build_jql(project, [], [], since))]
+        self._attach_changelogs(tasks)
+        
+        times = [parse_time(task.get("updated")) for task in tasks]
+        latest = max((updated.timestamp() for updated in times if updated is not None), default=watermark or 0.0)
+        self.store.upsert(project, tasks, latest)
+        
+        logger.info(f"Synced {len(tasks)} Jira issues of {project} "
+                    f"{'updated since ' + since.isoformat() if since else 'in a full sync'}")
+        
+        now = time.time()
+        if since is None:
+            # A full sync saw every issue of the project
+            self.store.retain(project, [task["key"] for task in tasks], now)
+        elif now - (self.store.reconciled(project) or 0.0) >= self.reconcile_interval:
+            keys = [issue["key"] for issue in self._search_all(build_jql(project, [], []), fields=["key"])]
+            removed = self.store.retain(project, keys, now)
+            logger.info(f"Reconciled {len(keys)} Jira issue keys of {project}, removed {removed} stored issues")
+        return len(tasks)
+    
+    def get_status_changelogs(self, issue_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fetch the status changes of many issues with the bulk changelog API.
+        
+        Issues are sent in batches of up to CHANGELOG_BATCH_SIZE, fetched
+        concurrently, and only status changes are requested.
+        
+        Args:
+            issue_ids: Issue IDs or keys
+        
+        Returns:
+            Status changes of each issue with any, oldest first, as dictionaries
+            with "at", "from" and "to"
+        """
+        batches = [issue_ids[i:i + CHANGELOG_BATCH_SIZE] for i in range(0, len(issue_ids), CHANGELOG_BATCH_SIZE)]
+        if not batches:
+            return {}
+        
+        changelogs: Dict[str, List[Dict[str, Any]]] = {}
+        with ThreadPoolExecutor(max_workers=self.fetch_workers, thread_name_prefix="jira") as executor:
+            for logs in executor.map(self._fetch_changelog_batch, batches):
+                for log in logs:
+                    changes = changelogs.setdefault(str(log.get("issueId")), [])
+                    for history in log.get("changeHistories", []):
+                        changes.extend(
+                            {"at": history.get("created"), "from": item.get("fromString"), "to": item.get("toString")}
+                            for item in history.get("items", [])
+                            if (item.get("fieldId") or item.get("field")) == "status"
+                        )
+        
+        for changes in changelogs.values():
+            changes.sort(key=lambda change: change["at"] or "")
+        return changelogs
+    
+    def _fetch_changelog_batch(self, issue_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Fetch the status changelogs of a batch of issues, following pagination.
+        
+        Args:
+            issue_ids: Issue IDs or keys, at most CHANGELOG_BATCH_SIZE
+        
+        Returns:
+            Changelogs with "issueId" and "changeHistories"
+        """
+        logs = []
+        page_token = None
+        
+        while True:
+            body = {"issueIdsOrKeys": issue_ids, "fieldIds": ["status"], "maxResults": 10000}
+            if page_token:
+                body["nextPageToken"] = page_token
+            response = self._client().post("rest/api/3/changelog/bulkfetch", data=body)
+            logs.extend(response.get("issueChangeLogs", []))
+            
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return logs
+    
+    def download_attachment(self, attachment: Dict[str, Any], destination_folder: str) -> Tuple[str, str]:
+        """
+        Download an issue attachment.
+        
+        The content is streamed to the file and hashed chunk by chunk, so
+        large attachments are never held in memory.
+        
+        Args:
+            attachment: Attachment metadata as listed under "attachments" of a task
+            destination_folder: Folder to save the file in
+        
+        Returns:
+            Path to the downloaded file and the MD5 checksum of its content
+        
+        Raises:
+            DownloadError: If the attachment cannot be downloaded
+        """
+        url = attachment.get("url") or f"{self.url}/rest/api/3/attachment/content/{attachment['id']}"
+        credentials = base64.b64encode(f"{self.email}:{self.api_token}".encode("utf-8")).decode("ascii")
+        extension = os.path.splitext(attachment.get("filename", ""))[1]
+        file_path = os.path.join(destination_folder, f"jira-{attachment['id']}{extension}")
+        md5 = hashlib.md5()
+        
+        with open(file_path, "wb") as f:
+            def write(chunk: bytes) -> None:
+                md5.update(chunk)
+                f.write(chunk)
+            
+            try:
+                response = self.transport.download(url, write, headers={"Authorization": f"Basic {credentials}"})
+            except BaseException:
+                f.close()
+                os.remove(file_path)
+                raise
+        
+        if not 200 <= response.status < 300:
+            os.remove(file_path)
+            raise DownloadError(f"Could not download attachment {attachment.get('filename')}: "
+                                f"HTTP {response.status} {response.reason}")
+        return file_path, md5.hexdigest()
+    
+    def _attach_changelogs(self, tasks: List[Dict[str, Any]]) -> None:
+        """
+        Add the status changes of each task under "status_changes".
+        
+        Args:
+            tasks: Task data, updated in place
+        """
+        if not self.fetch_changelogs or not tasks:
+            return
+        
+        changelogs = self.get_status_changelogs([task["id"] for task in tasks])
+        for task in tasks:
+            task["status_changes"] = changelogs.get(str(task["id"]), [])
+    
+    def _stored_issues(self, project: str) -> List[Dict[str, Any]]:
+        """
+        Get the stored issues of a project matching the status and label filters.
+        
+        Args:
+            project: Jira project key
+        
+        Returns:
+            At most max_issues_to_fetch issues, most recently updated first
+        """
+        statuses = {status.casefold() for status in self.include_statuses}
+        excluded = {label.casefold() for label in self.exclude_labels}
+        
+        tasks = [
+            task for task in self.store.issues(project)
+            if (not statuses or (task.get("status") or {}).get("name", "").casefold() in statuses)
+            and not excluded.intersection(label.casefold() for label in task.get("labels") or [])
+        ]
+        return tasks[:self.max_issues]
+    
+    def _search_all(self, jql: str, limit: Optional[int] = None,
+                    fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch the issues matching a query, the pages after the first one concurrently.
+        
+        Args:
+            jql: JQL query
+            limit: Maximum number of issues, all if None
+            fields: Fields to fetch, the configured issue fields by default
+        
+        Returns:
+            Issues as returned by the search API
+        """
+        logger.debug(f"Searching Jira issues: {jql}")
+        
+        first = self._search(jql, 0, min(self.page_size, limit) if limit is not None else self.page_size, fields)
+        total = first.get("total", 0) if limit is None else min(first.get("total", 0), limit)
+        starts = range(len(first.get("issues", [])), total, self.page_size)
+        
+        pages = [first]
+        if starts:
+            with ThreadPoolExecutor(max_workers=self.fetch_workers, thread_name_prefix="jira") as executor:
+                pages.extend(executor.map(
+                    lambda start: self._search(jql, start, min(self.page_size, total - start), fields), starts
+                ))
+        
+        # Issues changing between the requests may shift between pages
+        issues: Dict[str, Dict[str, Any]] = {}
+        for page in pages:
+            for issue in page.get("issues", []):
+                issues.setdefault(issue["key"], issue)
+        
+        logger.debug(f"Fetched {len(issues)} of {first.get('total', 0)} Jira issues in {len(pages)} pages")
+        return list(issues.values())[:total]
+    
+    def _client(self) -> Any:
+        """
+        Get the Jira client of the current thread.
+        
+        Returns:
+            Jira client
+        """
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = Jira(url=self.url, username=self.email, password=self.api_token, cloud=True,
+                          session=requests_session(self.transport))
+            self._local.client = client
+        return client
+    
+    def _search(self, jql: str, start: int, limit: int, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Fetch one page of search results.
+        
+        Args:
+            jql: JQL query
+            start: Index of the first issue
+            limit: Maximum number of issues
+            fields: Fields to fetch, the configured issue fields by default
+        
+        Returns:
+            Search response with "issues" and "total"
+        """
+        return self._client().jql(jql, fields=",".join(fields or self.fields), start=start, limit=limit)
+    
+    def _to_task(self, issue: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert a Jira issue to the task data used by the summarizer.
+        
+        Descriptions and comments in the Atlassian Document Format of Jira
+        Cloud are converted to markdown.
+        
+        Args:
+            issue: Issue as returned by the search API
+        
+        Returns:
+            Task data
+        """
+        fields = issue.get("fields") or {}
+        status = fields.get("status") or {}
+        assignee = fields.get("assignee") or {}
+        parent = fields.get("parent") or {}
+        parent_fields = parent.get("fields") or {}
+        
+        epic = None
+        if (parent_fields.get("issuetype") or {}).get("name") == "Epic":
+            epic = {"key": parent.get("key"), "name": parent_fields.get("summary") or parent.get("key")}
+        
+        return {
+            "key": issue.get("key", ""),
+            "id": issue.get("id", ""),
+            "summary": fields.get("summary") or "",
+            "description": adf_to_markdown(fields.get("description")),
+            "issue_type": {"name": (fields.get("issuetype") or {}).get("name", "Unknown")},
+            "status": {"name": status.get("name", "Unknown"),
+                       "category": (status.get("statusCategory") or {}).get("name", "")},
+            "priority": {"name": (fields.get("priority") or {}).get("name", "")},
+            "assignee": {"name": assignee["displayName"]} if assignee.get("displayName") else None,
+            "labels": fields.get("labels") or [],
+            "created": fields.get("created"),
+            "updated": fields.get("updated"),
+            "resolved": fields.get("resolutiondate"),
+            "epic": epic,
+            "attachments": [
+                {
+                    "id": attachment.get("id"),
+                    "filename": attachment.get("filename", ""),
+                    "mimeType": attachment.get("mimeType", ""),
+                    "size": attachment.get("size", 0),
+                    "url": attachment.get("content", "")
+                }
+                for attachment in fields.get("attachment") or []
+            ],
+            "comments": [
+                {
+                    "author": (comment.get("author") or {}).get("displayName", ""),
+                    "created": comment.get("created"),
+                    "body": adf_to_markdown(comment.get("body"))
+                }
+                for comment in (fields.get("comment") or {}).get("comments", [])
+            ]
+        }
+    
+    def _parse_url(self, jira_url: str) -> Tuple[str, Optional[str]]:
+        """
+        Split a Jira URL into the site URL and the project key it names.
+        
+        Args:
+            jira_url: URL of the Jira site, a project board or an issue
+        
+        Returns:
+            Site URL and project key, None if the URL names no project
+        """
+        parsed = urlparse(jira_url)
+        if not parsed.netloc:
+            return jira_url.rstrip("/"), None
+        
+        match = re.search(r"/(?:projects|browse)/([A-Z][A-Z0-9_]+)", parsed.path)
+        return f"{parsed.scheme}://{parsed.netloc}", match.group(1) if match else None
@@ -0,0 +1,296 @@
+"""
+Conversion of Atlassian Document Format (ADF) trees to markdown text.
+
+Jira Cloud returns issue descriptions and comments as ADF documents. Block
+nodes are walked iteratively with an explicit stack of sibling iterators, and
+the inline content of each block is rendered in one loop into a list of parts
+joined once, so conversion is linear in the number of nodes and never
+recurses however deeply lists and quotes are nested. Every node type is
+dispatched with a single dictionary lookup.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Indentation of the blocks nested in a list item, after the marker
+LIST_INDENT = "  "
+
+
+def _text(node: Dict[str, Any]) -> str:
+    text = node.get("text", "")
+    marks = node.get("marks")
+    if not marks:
+        return text
+
+    # Code excludes the other formatting marks
+    for mark in marks:
+        if mark.get("type") == "code":
+            text = f"`{text}`"
+            break
+    else:
+        for mark in marks:
+            mark_type = mark.get("type")
+            if mark_type == "strong":
+                text = f"**{text}**"
+            elif mark_type == "em":
+                text = f"*{text}*"
+            elif mark_type == "strike":
+                text = f"~~{text}~~"
+
+    for mark in marks:
+        if mark.get("type") == "link":
+            href = (mark.get("attrs") or {}).get("href", "")
+            text = f"[{text}]({href})"
+    return text
+
+
+def _attr(*names: str) -> Callable[[Dict[str, Any]], str]:
+    def render(node: Dict[str, Any]) -> str:
+        attrs = node.get("attrs") or {}
+        for name in names:
+            if attrs.get(name):
+                return str(attrs[name])
+        return ""
+    return render
+
+
+def _status(node: Dict[str, Any]) -> str:
+    return f"[{(node.get('attrs') or {}).get('text', '')}]"
+
+
+def _date(node: Dict[str, Any]) -> str:
+    timestamp = (node.get("attrs") or {}).get("timestamp")
+    try:
+        return datetime.fromtimestamp(int(timestamp) / 1000, timezone.utc).strftime("%Y-%m-%d")
+    except (TypeError, ValueError):
+        return ""
+
+
+# Renderer of each inline node type
+INLINE_RENDERERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "text": _text,
+    "hardBreak": lambda node: "\n",
+    "mention": _attr("text", "id"),
+    "emoji": _attr("text", "shortName"),
+    "inlineCard": _attr("url"),
+    "status": _status,
+    "date": _date,
+    "placeholder": lambda node: "",
+    "mediaInline": lambda node: "[attachment]",
+}
+
+
+def inline_to_markdown(nodes: Optional[List[Dict[str, Any]]]) -> str:
+    """
+    Render inline nodes as markdown.
+
+    Args:
+        nodes: Inline nodes of a block
+
+    Returns:
+        Markdown text of the nodes
+    """
+    if not nodes:
+        return ""
+
+    renderers = INLINE_RENDERERS
+    parts = []
+    append = parts.append
+    for node in nodes:
+        renderer = renderers.get(node.get("type", ""))
+        if renderer is not None:
+            append(renderer(node))
+        elif "text" in node:
+            append(node["text"])
+    return "".join(parts)
+
+
+def plain_text(node: Dict[str, Any]) -> str:
+    """
+    Collect the text of all the inline nodes below a node.
+
+    Args:
+        node: ADF node
+
+    Returns:
+        Inline markdown of the descendant blocks, separated by spaces
+    """
+    texts = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        content = current.get("content")
+        if not content:
+            continue
+        if content[0].get("type") in INLINE_RENDERERS:
+            texts.append(inline_to_markdown(content))
+        else:
+            stack.extend(reversed(content))
+    return " ".join(text for text in texts if text)
+
+
+def _table(node: Dict[str, Any]) -> str:
+    rows = []
+    header = False
+    for index, row in enumerate(node.get("content") or []):
+        cells = row.get("content") or []
+        if index == 0:
+            header = bool(cells) and all(cell.get("type") == "tableHeader" for cell in cells)
+        rows.append("| " + " | ".join(plain_text(cell).replace("|", "\\|").replace("\n", " ")
+                                       for cell in cells) + " |")
+    if not rows:
+        return ""
+
+    # Markdown tables need a header row
+    width = rows[0].count(" | ") + 1
+    separator = "|" + " --- |" * width
+    if header:
+        return "\n".join([rows[0], separator] + rows[1:])
+    return "\n".join(["|" + "  |" * width, separator] + rows)
+
+
+def _code_block(node: Dict[str, Any]) -> str:
+    language = (node.get("attrs") or {}).get("language") or ""
+    code = "".join(child.get("text", "") for child in node.get("content") or [])
+    return f"```{language}\n{code}\n```"
+
+
+def _heading(node: Dict[str, Any]) -> str:
+    level = (node.get("attrs") or {}).get("level") or 1
+    return "#" * min(int(level), 6) + " " + inline_to_markdown(node.get("content"))
+
+
+def _media(node: Dict[str, Any]) -> str:
+    names = [
+        (child.get("attrs") or {}).get("alt") or "attachment"
+        for child in node.get("content") or []
+        if child.get("type") == "media"
+    ]
+    return ", ".join(f"[{name}]" for name in names)
+
+
+# Renderer of each leaf block type, whose content is not walked further
+BLOCK_RENDERERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "paragraph": lambda node: inline_to_markdown(node.get("content")),
+    "heading": _heading,
+    "codeBlock": _code_block,
+    "rule": lambda node: "---",
+    "table": _table,
+    "mediaSingle": _media,
+    "mediaGroup": _media,
+    "blockCard": lambda node: (node.get("attrs") or {}).get("url", ""),
+    "embedCard": lambda node: (node.get("attrs") or {}).get("url", ""),
+}
+
+# List types, whose items are numbered in ordered lists and bulleted otherwise
+LIST_TYPES = frozenset(["bulletList", "orderedList", "taskList", "decisionList"])
+
+# Item types whose content is inline rather than blocks
+INLINE_ITEMS = frozenset(["taskItem", "decisionItem"])
+
+# Container types whose blocks are quoted
+QUOTE_TYPES = frozenset(["blockquote", "panel"])
+
+
+def _take_lead(frame: List[Any]) -> str:
+    """
+    Take the prefix of the next block of a frame.
+
+    Args:
+        frame: Frame of iter_adf_markdown; its pending lead is cleared
+
+    Returns:
+        The pending lead, such as the marker of a list item, or the prefix
+    """
+    lead = frame[2]
+    if lead is None:
+        return frame[1]
+    frame[2] = None
+    return lead
+
+
+def iter_adf_markdown(document: Dict[str, Any]) -> Iterator[str]:
+    """
+    Render the blocks of an ADF document as markdown, one block at a time.
+
+    Args:
+        document: ADF document, or any node with block content
+
+    Yields:
+        Markdown of each non-empty block in document order
+    """
+    # Frames of [sibling iterator, prefix, prefix of the first block, list type, item number]
+    stack: List[List[Any]] = [[iter(document.get("content") or []), "", None, None, 0]]
+
+    while stack:
+        frame = stack[-1]
+        node = next(frame[0], None)
+        if node is None:
+            stack.pop()
+            continue
+
+        node_type = node.get("type", "")
+        prefix = frame[1]
+
+        if node_type in BLOCK_RENDERERS or node_type in INLINE_ITEMS:
+            if node_type in INLINE_ITEMS:
+                done = (node.get("attrs") or {}).get("state") in ("DONE", "DECIDED")
+                marker = ("- [x] " if done else "- [ ] ") if node_type == "taskItem" else "- "
+                text = marker + inline_to_markdown(node.get("content"))
+            else:
+                text = BLOCK_RENDERERS[node_type](node)
+            if not text:
+                continue
+
+            yield _take_lead(frame) + (text.replace("\n", "\n" + prefix) if prefix else text)
+        elif node_type == "listItem":
+            frame[4] += 1
+            marker = f"{frame[4]}. " if frame[3] == "orderedList" else "- "
+            lead = (frame[2] if frame[2] is not None else prefix) + marker
+            frame[2] = None
+            stack.append([iter(node.get("content") or []), prefix + LIST_INDENT + " " * (len(marker) - 2),
+                          lead, None, 0])
+        elif node_type in LIST_TYPES:
+            # A list opening a list item starts on the line of its marker
+            start = (node.get("attrs") or {}).get("order") or 1
+            stack.append([iter(node.get("content") or []), prefix, frame[2], node_type, int(start) - 1])
+            frame[2] = None
+        elif node_type in QUOTE_TYPES:
+            lead = None if frame[2] is None else frame[2] + "> "
+            frame[2] = None
+            stack.append([iter(node.get("content") or []), prefix + "> ", lead, None, 0])
+        elif node.get("content"):
+            content = node["content"]
+            if content[0].get("type") in INLINE_RENDERERS:
+                # Unknown block with inline content
+                text = inline_to_markdown(content)
+                if text:
+                    yield _take_lead(frame) + (text.replace("\n", "\n" + prefix) if prefix else text)
+                continue
+
+            # Expands and unknown containers, starting on the line of a
+            # pending list marker with their title or else their first block
+            title = (node.get("attrs") or {}).get("title")
+            lead = None
+            if title:
+                yield f"{_take_lead(frame)}**{title}**"
+            else:
+                lead, frame[2] = frame[2], None
+            stack.append([iter(content), prefix, lead, None, 0])
+
+
+def adf_to_markdown(document: Any) -> str:
+    """
+    Convert an ADF document to markdown.
+
+    Args:
+        document: ADF document; strings are returned unchanged and None as empty
+
+    Returns:
+        Markdown text with blocks separated by blank lines
+    """
+    if document is None:
+        return ""
+    if isinstance(document, str):
+        return document
+    return "\n\n".join(iter_adf_markdown(document))
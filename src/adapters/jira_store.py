@@ -0,0 +1,186 @@
+"""
+Local SQLite store of the issues of a Jira site.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    key TEXT PRIMARY KEY,
+    project TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    updated TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS issues_project ON issues (project, number);
+CREATE TABLE IF NOT EXISTS projects (
+    project TEXT PRIMARY KEY,
+    watermark REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reconciliations (
+    project TEXT PRIMARY KEY,
+    reconciled REAL NOT NULL
+);
+"""
+
+
+class JiraIssueStore:
+    """
+    Issues of the projects of one Jira site, kept in a SQLite database.
+
+    The store holds every issue of a synced project regardless of the status
+    and label filters, so an issue changing status is updated rather than
+    dropped by the delta query. Each project has a watermark, the latest
+    update time seen, from which the next sync starts. Issues deleted or
+    moved to another project never show up in a delta query, so the stored
+    keys are reconciled with the current keys of the project from time to
+    time.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the store.
+
+        Args:
+            path: Database file, created if missing
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def watermark(self, project: str) -> Optional[float]:
+        """
+        Get the latest update time of the stored issues of a project.
+
+        Args:
+            project: Jira project key
+
+        Returns:
+            Seconds since the epoch, None if the project was never synced
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT watermark FROM projects WHERE project = ?", (project,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def upsert(self, project: str, tasks: Iterable[Dict[str, Any]], watermark: float) -> int:
+        """
+        Store issues and advance the watermark of their project in one transaction.
+
+        Args:
+            project: Jira project key
+            tasks: Task data of the fetched issues
+            watermark: Latest update time seen, in seconds since the epoch
+
+        Returns:
+            Number of issues stored
+        """
+        rows = [
+            (task["key"], project, _key_number(task["key"]), task.get("updated"), json.dumps(task))
+            for task in tasks
+        ]
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT INTO issues (key, project, number, updated, data) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET project = excluded.project, number = excluded.number, "
+                "updated = excluded.updated, data = excluded.data",
+                rows
+            )
+            self._connection.execute(
+                "INSERT INTO projects (project, watermark) VALUES (?, ?) "
+                "ON CONFLICT (project) DO UPDATE SET watermark = MAX(watermark, excluded.watermark)",
+                (project, watermark)
+            )
+        return len(rows)
+
+    def reconciled(self, project: str) -> Optional[float]:
+        """
+        Get the time the stored keys of a project were last reconciled.
+
+        Args:
+            project: Jira project key
+
+        Returns:
+            Seconds since the epoch, None if the project was never reconciled
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT reconciled FROM reconciliations WHERE project = ?", (project,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def retain(self, project: str, keys: Iterable[str], reconciled: float) -> int:
+        """
+        Delete the stored issues of a project whose keys are no longer in it.
+
+        Args:
+            project: Jira project key
+            keys: Current issue keys of the project
+            reconciled: Time of the reconciliation, in seconds since the epoch
+
+        Returns:
+            Number of issues deleted
+        """
+        current = set(keys)
+
+        with self._lock, self._connection:
+            stored = [row[0] for row in self._connection.execute(
+                "SELECT key FROM issues WHERE project = ?", (project,)
+            )]
+            gone = [(key,) for key in stored if key not in current]
+            self._connection.executemany("DELETE FROM issues WHERE key = ?", gone)
+            self._connection.execute(
+                "INSERT INTO reconciliations (project, reconciled) VALUES (?, ?) "
+                "ON CONFLICT (project) DO UPDATE SET reconciled = excluded.reconciled",
+                (project, reconciled)
+            )
+        return len(gone)
+
+    def issues(self, project: str) -> List[Dict[str, Any]]:
+        """
+        Get the stored issues of a project.
+
+        Args:
+            project: Jira project key
+
+        Returns:
+            Task data, most recently updated first
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT data FROM issues WHERE project = ? ORDER BY updated DESC, number DESC", (project,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._connection.close()
+
+
+def _key_number(key: str) -> int:
+    """
+    Get the number of an issue key.
+
+    Args:
+        key: Issue key, e.g. "APO-42"
+
+    Returns:
+        Issue number, 0 if the key has none
+    """
+    number = key.rpartition("-")[2]
+    return int(number) if number.isdigit() else 0
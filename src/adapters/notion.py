@@ -2,38 +2,78 @@
 Notion API adapter for the Documentation Agent.
 """
 
+import difflib
+import hashlib
+import json
 import logging
 import os
-from typing import Dict, List, Any, Optional
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Any, Optional, Set, Tuple
+
+from src.adapters.notion_cache import NotionPageCache
+from src.adapters.notion_markdown import blocks_to_markdown, markdown_to_blocks, property_to_text, rich_text_to_text
+from src.utils.http import HttpTransport, get_shared_transport, httpx_client
+from src.utils.retry import backoff_delay, is_rejected_error, is_transient_error
 
 logger = logging.getLogger(__name__)
 
+# Notion API limit for block appends
+MAX_BLOCKS_PER_REQUEST = 100
+
+# Options the API lists for blocks created without them
+DEFAULT_BLOCK_OPTIONS = {"color": "default", "is_toggleable": False}
+
+# Paragraphs of the summary that change on every run; they are only updated
+# along with other changes
+VOLATILE_PREFIXES = ("Generated on:",)
+
 # Mock the notion-client
 class Client:
     """Mock Client class from notion-client package."""
-    def __init__(self, auth):
+    def __init__(self, auth, client=None):
         self.auth = auth
+        self.client = client
         self.pages = PagesClient()
         self.blocks = BlocksClient()
+        self.databases = DatabasesClient()
         
 class PagesClient:
     """Mock Pages client."""
-    def retrieve(self, page_id):
-        return {}
+    def retrieve(self, page_id, **kwargs):
+        return {"id": page_id, "properties": {}}
         
-    def create(self, data):
+    def create(self, **kwargs):
         return {"id": "new-page-id", "url": "https://notion.so/new-page"}
         
+class DatabasesClient:
+    """Mock Databases client."""
+    def retrieve(self, database_id, **kwargs):
+        return {"id": database_id, "title": [], "properties": {}}
+        
+    def query(self, database_id, **kwargs):
+        return {"results": [], "next_cursor": None, "has_more": False}
+        
 class BlocksClient:
     """Mock Blocks client."""
-    def children(self):
-        return self
+    def __init__(self):
+        self.children = BlockChildrenClient()
         
-    def list(self, block_id):
-        return {"results": []}
+    def update(self, block_id, **kwargs):
+        return dict(kwargs, id=block_id)
+        
+    def delete(self, block_id):
+        return {"id": block_id, "archived": True}
+
+class BlockChildrenClient:
+    """Mock Block children client."""
+    def list(self, block_id, **kwargs):
+        return {"results": [], "next_cursor": None, "has_more": False}
         
-    def append(self, block_id, children):
-        return {}
+    def append(self, block_id, children, **kwargs):
+        return {"results": children}
 
 
 class NotionPage:
@@ -44,6 +84,239 @@ class NotionPage:
         self.content = content
 
 
+def _block_summary(block: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Get the type and text of a block, as sent or as listed by Notion.
+    
+    Args:
+        block: Notion block
+    
+    Returns:
+        Block type and the text of its rich text
+    """
+    data = block.get(block.get("type", "")) or {}
+    return block.get("type", ""), rich_text_to_text(data.get("rich_text") if isinstance(data, dict) else None)
+
+
+class PublishError(Exception):
+    """Raised when blocks could not be appended to a page."""
+    def __init__(self, message: str, acknowledged: int):
+        super().__init__(message)
+        self.acknowledged = acknowledged
+
+
+class BlockPublisher:
+    """
+    Ordered, pipelined publisher of markdown content to a Notion page.
+    
+    Content is converted to blocks on the caller's thread and packed into
+    batches of up to MAX_BLOCKS_PER_REQUEST blocks, carrying partial batches
+    over to the next write. A single background sender appends the batches
+    strictly in order while the caller produces more content; a partial batch
+    is only sent when the sender is idle, so batches grow while requests are
+    in flight. Transient errors are retried from the failed batch; appends
+    are not idempotent, so after an error that does not prove the batch was
+    rejected, such as a timeout, the end of the page is compared with the
+    batch before it is sent again. If the sender gives up, the
+    unacknowledged batches are kept and resume() sends them again, starting
+    from the first one not acknowledged.
+    """
+    
+    def __init__(self, client: Any, page_id: str, max_retries: int = 3, base_delay: float = 1.0,
+                 sleep: Callable[[float], None] = time.sleep, transport: Optional[HttpTransport] = None,
+                 max_delay: Optional[float] = None):
+        """
+        Initialize the publisher.
+        
+        Args:
+            client: Notion SDK client
+            page_id: ID of the page to append to
+            max_retries: Retries of a batch after transient errors
+            base_delay: Initial retry delay in seconds, doubled after every retry
+            sleep: Sleep function
+            transport: Transport of the client, the shared one by default
+            max_delay: Maximum retry delay in seconds, the maximum backoff of
+                the transport by default
+        """
+        self.client = client
+        self.page_id = page_id
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.sleep = sleep
+        self.transport = transport or get_shared_transport()
+        self.max_delay = self.transport.max_backoff if max_delay is None else max_delay
+        self.batches: List[List[Dict[str, Any]]] = []
+        self.acknowledged = 0
+        self.requests = 0
+        self.error: Optional[Exception] = None
+        # Batch whose last append failed after it may have reached Notion
+        self._unconfirmed: Optional[int] = None
+        self._pending: List[Dict[str, Any]] = []
+        self._futures: List[Future] = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="notion-publish")
+    
+    def __enter__(self) -> "BlockPublisher":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._executor.shutdown(wait=True)
+    
+    def write(self, content: str) -> None:
+        """
+        Queue markdown content to be appended.
+        
+        Args:
+            content: Markdown content
+        
+        Raises:
+            PublishError: If an earlier batch could not be appended
+        """
+        self._raise_error()
+        self._pending.extend(markdown_to_blocks(content))
+        
+        while len(self._pending) >= MAX_BLOCKS_PER_REQUEST:
+            self._submit(self._pending[:MAX_BLOCKS_PER_REQUEST])
+            self._pending = self._pending[MAX_BLOCKS_PER_REQUEST:]
+        
+        self._futures = [future for future in self._futures if not future.done()]
+        if self._pending and not self._futures:
+            self._submit(self._pending)
+            self._pending = []
+    
+    def close(self) -> None:
+        """
+        Send the remaining blocks and wait until all batches are appended.
+        
+        Raises:
+            PublishError: If a batch could not be appended
+        """
+        if self._pending and self.error is None:
+            self._submit(self._pending)
+            self._pending = []
+        
+        wait(self._futures)
+        self._futures = []
+        self._raise_error()
+        self._executor.shutdown(wait=True)
+        
+        logger.debug(f"Appended {len(self.batches)} batches to page {self.page_id} in {self.requests} requests")
+    
+    def resume(self) -> None:
+        """
+        Send the unacknowledged batches again after a failure and wait for them.
+        
+        The publisher stays open, so writing can continue afterwards.
+        
+        Raises:
+            PublishError: If a batch fails again
+        """
+        with self._lock:
+            self.error = None
+        
+        logger.info(f"Resuming publication to page {self.page_id} at batch {self.acknowledged + 1} of {len(self.batches)}")
+        self._futures = [self._executor.submit(self._send, index)
+                         for index in range(self.acknowledged, len(self.batches))]
+        wait(self._futures)
+        self._futures = []
+        self._raise_error()
+    
+    def _submit(self, blocks: List[Dict[str, Any]]) -> None:
+        """
+        Queue a batch for the sender.
+        
+        Args:
+            blocks: Blocks of the batch
+        """
+        self.batches.append(blocks)
+        self._futures.append(self._executor.submit(self._send, len(self.batches) - 1))
+    
+    def _send(self, index: int) -> None:
+        """
+        Append a batch, retrying transient errors.
+        
+        Batches after a failed one are skipped until resume() is called.
+        
+        Args:
+            index: Index of the batch
+        """
+        for attempt in range(self.max_retries + 1):
+            with self._lock:
+                if self.error is not None or index < self.acknowledged:
+                    return
+            
+            try:
+                if self._unconfirmed == index:
+                    appended = self._appended(index)
+                    self._unconfirmed = None
+                    if appended:
+                        logger.info(f"Batch {index + 1} was appended to page {self.page_id} despite the error")
+                        with self._lock:
+                            self.acknowledged = index + 1
+                        return
+                
+                self.requests += 1
+                # Failed appends are retried here, not by the transport
+                with self.transport.without_retries():
+                    self.client.blocks.children.append(block_id=self.page_id, children=self.batches[index])
+                with self._lock:
+                    self.acknowledged = index + 1
+                return
+            except Exception as e:
+                if is_transient_error(e) and not is_rejected_error(e):
+                    self._unconfirmed = index
+                if attempt == self.max_retries or not is_transient_error(e):
+                    logger.error(f"Could not append batch {index + 1} to page {self.page_id}: {e}")
+                    with self._lock:
+                        self.error = e
+                    return
+                
+                delay = backoff_delay(attempt, self.base_delay, e, self.max_delay)
+                logger.warning(f"Appending batch {index + 1} to page {self.page_id} failed, retrying in {delay:.1f}s: {e}")
+                self.sleep(delay)
+    
+    def _appended(self, index: int) -> bool:
+        """
+        Check whether a batch is at the end of the page, i.e. whether a failed append was applied.
+        
+        Blocks are compared by type and text, as Notion returns them with
+        their IDs and without their children.
+        
+        Args:
+            index: Index of the batch
+        
+        Returns:
+            True if the last blocks of the page match the batch
+        """
+        batch = self.batches[index]
+        tail: Deque[Dict[str, Any]] = deque(maxlen=len(batch))
+        cursor = None
+        while True:
+            kwargs = {"page_size": MAX_BLOCKS_PER_REQUEST}
+            if cursor:
+                kwargs["start_cursor"] = cursor
+            
+            response = self.client.blocks.children.list(block_id=self.page_id, **kwargs)
+            tail.extend(response.get("results", []))
+            
+            cursor = response.get("next_cursor")
+            if not response.get("has_more") or not cursor:
+                break
+        
+        return [_block_summary(block) for block in tail] == [_block_summary(block) for block in batch]
+    
+    def _raise_error(self) -> None:
+        """Raise a PublishError if the sender gave up."""
+        if self.error is not None:
+            raise PublishError(
+                f"Appended {self.acknowledged} of {len(self.batches)} batches to page {self.page_id}: {self.error}",
+                self.acknowledged
+            )
+
+
 class NotionClient:
     """Client for interacting with the Notion API."""
     
@@ -57,8 +330,14 @@ class NotionClient:
         self.config = config
         self.api_key = os.environ.get("NOTION_API_KEY", "")
         
-        # Using the client from notion-client
-        self.client = Client(auth=self.api_key)
+        # Using the client from notion-client on the shared transport, whose
+        # connection pool serves the threads fetching blocks concurrently
+        self.transport = get_shared_transport()
+        self.client = Client(auth=self.api_key, client=httpx_client(self.transport))
+        self.fetch_workers = config.get("fetch_workers", 8)
+        
+        # Page bodies are cached locally and revalidated by their last edit time
+        self.cache = NotionPageCache(config["cache_dir"]) if config.get("cache_dir") else None
         
         logger.info("Notion client initialized")
     
@@ -66,20 +345,398 @@ class NotionClient:
         """
         Get project data from Notion.
         
+        The body of the project page is fetched with all nested blocks, along
+        with the pages it links to up to notion.search_depth levels away.
+        
         Args:
             project_id: ID of the project page
             
         Returns:
             Dictionary with project data
         """
-        # Placeholder implementation for testing
+        page = self.client.pages.retrieve(page_id=project_id)
+        blocks, linked_pages = self._fetch_page_tree(project_id, page.get("last_edited_time"))
+        
+        content = [self._blocks_to_text(blocks)]
+        for linked_page in linked_pages:
+            text = self._blocks_to_text(linked_page["blocks"])
+            if text:
+                content.append(f"## {linked_page['title']}\n\n{text}")
+        
+        databases = self._query_linked_databases([blocks] + [linked_page["blocks"] for linked_page in linked_pages])
+        
+        logger.info(f"Fetched Notion page {project_id} with {len(linked_pages)} linked pages "
+                    f"and {len(databases)} databases")
         return {
             "id": project_id,
-            "title": "Test Project",
-            "properties": {},
-            "content": "Test project content"
+            "title": self._page_title(page),
+            "url": page.get("url", ""),
+            "properties": page.get("properties", {}),
+            "last_edited_time": page.get("last_edited_time"),
+            "content": "\n\n".join(part for part in content if part),
+            "linked_pages": [{"id": linked_page["id"], "title": linked_page["title"]} for linked_page in linked_pages],
+            "databases": databases
         }
     
+    def _fetch_page_tree(self, page_id: str, last_edited_time: Optional[str] = None
+                         ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Fetch the blocks of a page and of its linked pages breadth-first.
+        
+        Each level of the tree is fetched concurrently, so the fetch time grows
+        with the depth of the tree rather than its number of blocks. Nested
+        blocks are attached to their parent under "children". Child pages,
+        page links and page mentions are followed up to search_depth levels,
+        every page at most once. With a page cache, pages whose last edit time
+        is unchanged are read from the cache with all their nested blocks.
+        
+        Args:
+            page_id: ID of the root page
+            last_edited_time: Last edit time of the root page, if already known
+            
+        Returns:
+            Tuple of (blocks of the root page, linked pages with "id", "title"
+            and "blocks", in breadth-first order)
+        """
+        search_depth = self.config.get("search_depth", 2)
+        started = time.time()
+        visited = {page_id}
+        root = {"id": page_id, "title": "", "blocks": [], "last_edited_time": last_edited_time}
+        linked_pages: List[Dict[str, Any]] = []
+        fetched_pages = []
+        
+        # IDs of the pages with a block whose children could not be listed
+        incomplete: Set[str] = set()
+        
+        # Pending fetches: (block or page ID, list receiving its children, page depth,
+        # page for the body of a page or None for nested blocks, page the block belongs to)
+        level: List[Tuple[str, List[Dict[str, Any]], int, Optional[Dict[str, Any]], Dict[str, Any]]] = [
+            (page_id, root["blocks"], 0, root, root)
+        ]
+        
+        with ThreadPoolExecutor(max_workers=self.fetch_workers, thread_name_prefix="notion") as executor:
+            while level:
+                results = executor.map(
+                    lambda task: self._fetch_children(task[0], task[3], required=task[0] == page_id), level
+                )
+                next_level = []
+                
+                for (_, target, depth, page, owner), (children, cached, complete) in zip(level, results):
+                    target.extend(children)
+                    if not complete:
+                        incomplete.add(owner["id"])
+                    if page is not None and not cached:
+                        fetched_pages.append(page)
+                    
+                    # Cached pages come with all nested blocks, only their links are followed
+                    for block in self._walk_blocks(children) if cached else children:
+                        for linked_id, title in self._linked_pages(block):
+                            if depth < search_depth and linked_id not in visited:
+                                visited.add(linked_id)
+                                linked_page = {"id": linked_id, "title": title, "blocks": [], "last_edited_time": None}
+                                linked_pages.append(linked_page)
+                                next_level.append((linked_id, linked_page["blocks"], depth + 1, linked_page,
+                                                   linked_page))
+                        
+                        # The children of a child page are the body of the linked page
+                        if not cached and block.get("has_children") and block.get("type") != "child_page":
+                            block["children"] = []
+                            next_level.append((block["id"], block["children"], depth, None, owner))
+                
+                level = next_level
+        
+        # Pages missing some nested blocks are not cached, so they are fetched
+        # again by the next run
+        if self.cache is not None:
+            for page in fetched_pages:
+                if page["id"] in incomplete:
+                    logger.debug(f"Not caching Notion page {page['id']}, some of its blocks could not be fetched")
+                    continue
+                self.cache.put(page["id"], page["last_edited_time"], page["blocks"], fetched_at=started)
+        
+        return root["blocks"], linked_pages
+    
+    def _fetch_children(self, block_id: str, page: Optional[Dict[str, Any]],
+                        required: bool) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Get the child blocks of a block or the body of a page, from the cache if possible.
+        
+        Args:
+            block_id: ID of the block or page
+            page: Page whose body is fetched, None for the children of a block;
+                its last edit time is retrieved if unknown
+            required: Whether errors are raised
+            
+        Returns:
+            Tuple of (child blocks, whether they come from the cache with nested
+            blocks, whether all the children could be listed)
+        """
+        if page is not None and self.cache is not None:
+            if page.get("last_edited_time") is None:
+                try:
+                    metadata = self.client.pages.retrieve(page_id=block_id)
+                    page["last_edited_time"] = metadata.get("last_edited_time")
+                except Exception as e:
+                    if required:
+                        raise
+                    logger.debug(f"Could not retrieve Notion page {block_id}: {e}")
+            
+            cached = self.cache.get(block_id, page.get("last_edited_time"))
+            if cached is not None:
+                return cached, True, True
+        
+        failures: List[str] = []
+        children = self._list_children(block_id, required=required, failures=failures)
+        return children, False, not failures
+    
+    def _query_linked_databases(self, page_blocks: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Query the databases embedded in or linked from the fetched pages.
+        
+        Databases are queried concurrently, each with the settings of
+        notion.databases.
+        
+        Args:
+            page_blocks: Block trees of the fetched pages
+            
+        Returns:
+            Databases with "id", "title" and compact "records"
+        """
+        settings = self.config.get("databases", {})
+        if settings.get("max_rows", 100) <= 0:
+            return []
+        
+        database_ids = []
+        for blocks in page_blocks:
+            for block in self._walk_blocks(blocks):
+                data = block.get(block.get("type")) or {}
+                if block.get("type") == "child_database":
+                    database_ids.append(block["id"])
+                elif block.get("type") == "link_to_page" and data.get("type") == "database_id":
+                    database_ids.append(data["database_id"])
+        
+        database_ids = list(dict.fromkeys(database_ids))[:settings.get("max_databases", 10)]
+        if not database_ids:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=self.fetch_workers, thread_name_prefix="notion-db") as executor:
+            databases = list(executor.map(self._read_database, database_ids))
+        
+        return [database for database in databases if database is not None]
+    
+    def _read_database(self, database_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the rows of a database selected by the configured query.
+        
+        Args:
+            database_id: Database ID
+            
+        Returns:
+            Database with "id", "title" and "records", None if it cannot be read
+        """
+        try:
+            schema = self.client.databases.retrieve(database_id=database_id)
+            title = rich_text_to_text(schema.get("title")) or "Untitled Database"
+            records = list(self.query_database(database_id, schema))
+        except Exception as e:
+            logger.warning(f"Could not query Notion database {database_id}: {e}")
+            return None
+        
+        logger.debug(f"Read {len(records)} rows of Notion database {title}")
+        return {"id": database_id, "title": title, "records": records}
+    
+    def query_database(self, database_id: str, schema: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the rows of a database as compact records.
+        
+        The filter and sorts of notion.databases are applied by the API, only
+        the properties in filter_properties are returned, and rows are
+        fetched page by page until max_rows. Settings for a database can be
+        overridden under per_database, keyed by its title or ID.
+        
+        Args:
+            database_id: Database ID
+            schema: Database object from databases.retrieve, retrieved if not given
+            
+        Yields:
+            Records with "id", "title", "url" and the text of each "properties" value
+        """
+        if schema is None:
+            schema = self.client.databases.retrieve(database_id=database_id)
+        
+        settings = dict(self.config.get("databases", {}))
+        title = rich_text_to_text(schema.get("title"))
+        settings.update(settings.get("per_database", {}).get(title) or
+                        settings.get("per_database", {}).get(database_id) or {})
+        
+        properties = schema.get("properties") or {}
+        query: Dict[str, Any] = {"page_size": MAX_BLOCKS_PER_REQUEST}
+        
+        query_filter = settings.get("filter")
+        if query_filter and (not query_filter.get("property") or query_filter["property"] in properties):
+            query["filter"] = query_filter
+        
+        sorts = [sort for sort in settings.get("sorts") or []
+                 if not sort.get("property") or sort["property"] in properties]
+        if sorts:
+            query["sorts"] = sorts
+        
+        # Only the configured properties are returned, identified by their IDs
+        names = settings.get("filter_properties") or []
+        property_ids = [properties[name]["id"] for name in names if name in properties and "id" in properties[name]]
+        if property_ids:
+            query["filter_properties"] = property_ids
+        
+        max_rows = settings.get("max_rows", 100)
+        rows = 0
+        cursor = None
+        
+        while rows < max_rows:
+            if cursor:
+                query["start_cursor"] = cursor
+            query["page_size"] = min(MAX_BLOCKS_PER_REQUEST, max_rows - rows)
+            response = self.client.databases.query(database_id=database_id, **query)
+            
+            for row in response.get("results", []):
+                if rows >= max_rows:
+                    break
+                rows += 1
+                yield self._compact_record(row)
+            
+            cursor = response.get("next_cursor")
+            if not response.get("has_more") or not cursor:
+                break
+    
+    def _compact_record(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Reduce a database row to the text of its properties.
+        
+        Args:
+            row: Page object of the row
+            
+        Returns:
+            Record with "id", "title", "url" and non-empty "properties"
+        """
+        title = ""
+        values = {}
+        for name, prop in (row.get("properties") or {}).items():
+            text = property_to_text(prop)
+            if prop.get("type") == "title":
+                title = text
+            elif text:
+                values[name] = text
+        
+        return {"id": row.get("id", ""), "title": title or "Untitled", "url": row.get("url", ""), "properties": values}
+    
+    def _walk_blocks(self, blocks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        List blocks with all their nested blocks.
+        
+        Args:
+            blocks: Blocks with nested blocks under "children"
+            
+        Returns:
+            All blocks in document order
+        """
+        walked = []
+        stack = list(reversed(blocks))
+        
+        while stack:
+            block = stack.pop()
+            walked.append(block)
+            stack.extend(reversed(block.get("children") or []))
+        
+        return walked
+    
+    def _list_children(self, block_id: str, required: bool = True,
+                       failures: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        List all child blocks of a block or page, following pagination.
+        
+        Args:
+            block_id: ID of the block or page
+            required: Whether errors are raised; otherwise they are logged and
+                the block is treated as empty (e.g. linked pages without access)
+            failures: List receiving the block ID if listing failed without raising
+            
+        Returns:
+            Child blocks in order
+        """
+        children = []
+        cursor = None
+        
+        try:
+            while True:
+                kwargs = {"page_size": MAX_BLOCKS_PER_REQUEST}
+                if cursor:
+                    kwargs["start_cursor"] = cursor
+                
+                response = self.client.blocks.children.list(block_id=block_id, **kwargs)
+                children.extend(response.get("results", []))
+                
+                cursor = response.get("next_cursor")
+                if not response.get("has_more") or not cursor:
+                    return children
+        except Exception as e:
+            if required:
+                raise
+            logger.warning(f"Could not fetch Notion blocks of {block_id}: {e}")
+            if failures is not None:
+                failures.append(block_id)
+            return children
+    
+    def _linked_pages(self, block: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """
+        Find the pages a block links to.
+        
+        Args:
+            block: Notion block
+            
+        Returns:
+            (page ID, title) pairs of child pages, page links and page mentions
+        """
+        block_type = block.get("type")
+        data = block.get(block_type) or {}
+        
+        if block_type == "child_page":
+            return [(block["id"], data.get("title") or "Untitled Page")]
+        
+        if block_type == "link_to_page" and data.get("type") == "page_id":
+            return [(data["page_id"], "Linked Page")]
+        
+        return [
+            (span["mention"]["page"]["id"], span.get("plain_text") or "Linked Page")
+            for span in data.get("rich_text") or []
+            if span.get("type") == "mention" and span.get("mention", {}).get("type") == "page"
+        ]
+    
+    def _page_title(self, page: Dict[str, Any]) -> str:
+        """
+        Get the title of a page from its title property.
+        
+        Args:
+            page: Notion page object
+            
+        Returns:
+            Page title
+        """
+        for prop in (page.get("properties") or {}).values():
+            if prop.get("type") == "title":
+                title = "".join(span.get("plain_text", "") for span in prop.get("title", []))
+                if title:
+                    return title
+        return "Untitled Project"
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Get the statistics of the page cache.
+        
+        Returns:
+            Dictionary with the number of hits, misses and stored pages,
+            empty if caching is disabled
+        """
+        return self.cache.stats() if self.cache is not None else {}
+    
     def create_summary_page(self, project_id: str, content: str) -> str:
         """
         Create a new documentation page in Notion.
@@ -91,43 +748,328 @@ class NotionClient:
         Returns:
             URL of the created page
         """
-        # Placeholder implementation for testing
-        return "https://notion.so/summary-page"
+        page = self.start_summary_page(project_id)
+        self.append_to_page(page["id"], content)
+        return page["url"]
+    
+    def update_summary_page(self, project_id: str, content: str) -> str:
+        """
+        Update the existing documentation page of a project in place.
+        
+        The new blocks are diffed against the current top-level blocks of the
+        page by content hash, and only the changed blocks are patched, inserted
+        or deleted, so the number of write calls scales with the size of the
+        change. A new page is created if the project has none yet.
+        
+        Args:
+            project_id: ID of the project page
+            content: Content of the documentation page
+            
+        Returns:
+            URL of the updated page
+        """
+        page_id = self._find_summary_page(project_id)
+        if page_id is None:
+            logger.info(f"No summary page found for project {project_id}, creating one")
+            return self.create_summary_page(project_id, content)
+        
+        old_blocks = self._list_children(page_id)
+        new_blocks = self._markdown_to_blocks(content)
+        calls = self._apply_block_diff(page_id, old_blocks, new_blocks)
+        
+        logger.info(f"Updated summary page {page_id} with {calls} write requests "
+                    f"({len(old_blocks)} blocks before, {len(new_blocks)} after)")
+        return self.client.pages.retrieve(page_id=page_id).get("url", "")
+    
+    def _find_summary_page(self, project_id: str) -> Optional[str]:
+        """
+        Find the documentation page created below a project page.
+        
+        Args:
+            project_id: ID of the project page
+            
+        Returns:
+            ID of the most recently created summary page, None if there is none
+        """
+        title = f"Project Summary: {project_id}"
+        page_ids = [
+            block["id"] for block in self._list_children(project_id)
+            if block.get("type") == "child_page" and block.get("child_page", {}).get("title") == title
+        ]
+        return page_ids[-1] if page_ids else None
+    
+    def _apply_block_diff(self, page_id: str, old_blocks: List[Dict[str, Any]],
+                          new_blocks: List[Dict[str, Any]]) -> int:
+        """
+        Turn the blocks of a page into new blocks with a minimal set of changes.
+        
+        Blocks with equal content hashes are kept, and nothing is written if
+        only volatile paragraphs (e.g. the generation time) differ. Replaced
+        blocks are patched in place when their type is unchanged; other blocks
+        are deleted, and new blocks are inserted after the preceding block of
+        the new content.
+        
+        Args:
+            page_id: ID of the page
+            old_blocks: Current top-level blocks of the page
+            new_blocks: Blocks the page should contain
+            
+        Returns:
+            Number of write requests
+        """
+        matcher = difflib.SequenceMatcher(
+            None, [self._block_hash(block) for block in old_blocks],
+            [self._block_hash(block) for block in new_blocks], autojunk=False
+        )
+        opcodes = matcher.get_opcodes()
+        
+        # Volatile paragraphs alone do not make a change
+        if all(tag == "equal" for tag, _, _, _, _ in opcodes):
+            return 0
+        
+        # Blocks can only be inserted after an existing block or at the end, so
+        # a page whose first block cannot be kept or patched is rewritten
+        tag = opcodes[0][0] if opcodes else "equal"
+        if old_blocks and (tag == "insert" or (
+            tag == "replace" and old_blocks[0].get("type") != new_blocks[0].get("type")
+        )):
+            logger.debug(f"Summary page {page_id} changed at the first block, rewriting it")
+            opcodes = [("replace", 0, len(old_blocks), 0, len(new_blocks))]
+        
+        calls = 0
+        anchor: Optional[str] = None
+        
+        for tag, i1, i2, j1, j2 in opcodes:
+            if tag == "equal":
+                # Volatile paragraphs are updated along with the other changes
+                for old_block, new_block in zip(old_blocks[i1:i2], new_blocks[j1:j2]):
+                    if self._block_hash(old_block, False) != self._block_hash(new_block, False):
+                        self.client.blocks.update(block_id=old_block["id"], paragraph=new_block["paragraph"])
+                        calls += 1
+                anchor = old_blocks[i2 - 1]["id"]
+                continue
+            
+            old, new = old_blocks[i1:i2], new_blocks[j1:j2]
+            
+            # Patch blocks of the same type in place
+            patched = 0
+            while patched < min(len(old), len(new)) and old[patched].get("type") == new[patched]["type"]:
+                block_type = new[patched]["type"]
+                self.client.blocks.update(block_id=old[patched]["id"], **{block_type: new[patched][block_type]})
+                anchor = old[patched]["id"]
+                patched += 1
+                calls += 1
+            
+            for block in old[patched:]:
+                self.client.blocks.delete(block_id=block["id"])
+                calls += 1
+            
+            inserted = new[patched:]
+            for start in range(0, len(inserted), MAX_BLOCKS_PER_REQUEST):
+                kwargs = {"after": anchor} if anchor else {}
+                response = self.client.blocks.children.append(
+                    block_id=page_id, children=inserted[start:start + MAX_BLOCKS_PER_REQUEST], **kwargs
+                )
+                results = response.get("results") or []
+                if results and results[-1].get("id"):
+                    anchor = results[-1]["id"]
+                calls += 1
+        
+        return calls
+    
+    def _block_hash(self, block: Dict[str, Any], ignore_volatile: bool = True) -> str:
+        """
+        Hash the content of a block, ignoring IDs and formatting metadata.
+        
+        Args:
+            block: Notion block, as listed or as created from markdown
+            ignore_volatile: Whether volatile paragraphs hash by their prefix only
+            
+        Returns:
+            Hex digest of the block type and its normalized payload, including
+            nested children
+        """
+        if ignore_volatile:
+            prefix = self._volatile_prefix(block)
+            if prefix is not None:
+                return hashlib.sha256(json.dumps(["volatile", prefix]).encode("utf-8")).hexdigest()
+        return hashlib.sha256(
+            json.dumps(self._normalize_block(block), sort_keys=True).encode("utf-8")
+        ).hexdigest()
+    
+    def _normalize_block(self, block: Dict[str, Any]) -> List[Any]:
+        """
+        Reduce a block to its content.
+        
+        Rich text is reduced to its text, options with their default value and
+        empty values are dropped, and the signed URLs of Notion-hosted files
+        lose their expiring query string, so a listed block and the same block
+        created from markdown are equal.
+        
+        Args:
+            block: Notion block, nested blocks under "children"
+            
+        Returns:
+            Block type, normalized payload and normalized children
+        """
+        block_type = block.get("type", "")
+        children = [self._normalize_block(child) for child in block.get("children") or []]
+        return [block_type, self._normalize_value(block.get(block_type) or {}), children]
+    
+    def _normalize_value(self, value: Any) -> Any:
+        """
+        Normalize a value of a block payload.
+        
+        Args:
+            value: Payload or one of its values
+            
+        Returns:
+            Normalized value
+        """
+        if isinstance(value, list):
+            return [self._normalize_value(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        
+        result = {}
+        for key, item in value.items():
+            if key in ("rich_text", "caption"):
+                item = rich_text_to_text(item)
+            elif key == "children":
+                item = [self._normalize_block(child) for child in item or []]
+            elif key == "file" and isinstance(item, dict):
+                item = {"url": (item.get("url") or "").split("?")[0]}
+            elif key == "expiry_time" or (key in DEFAULT_BLOCK_OPTIONS and DEFAULT_BLOCK_OPTIONS[key] == item):
+                continue
+            else:
+                item = self._normalize_value(item)
+            
+            if item is None or (isinstance(item, (str, list, dict)) and not item):
+                continue
+            result[key] = item
+        return result
+    
+    def _volatile_prefix(self, block: Dict[str, Any]) -> Optional[str]:
+        """
+        Get the volatile prefix a paragraph starts with.
+        
+        Args:
+            block: Notion block
+            
+        Returns:
+            Prefix from VOLATILE_PREFIXES, None for other blocks
+        """
+        if block.get("type") != "paragraph":
+            return None
+        text = rich_text_to_text((block.get("paragraph") or {}).get("rich_text"))
+        return next((prefix for prefix in VOLATILE_PREFIXES if text.startswith(prefix)), None)
+    
+    def start_summary_page(self, project_id: str) -> Dict[str, str]:
+        """
+        Create an empty documentation page below the project page.
+        
+        Content is added afterwards with append_to_page, which lets callers
+        publish a summary section by section.
+        
+        Args:
+            project_id: ID of the project page
+            
+        Returns:
+            Dictionary with the "id" and "url" of the created page
+        """
+        response = self.client.pages.create(
+            parent={"page_id": project_id},
+            properties={
+                "title": {"title": [{"text": {"content": f"Project Summary: {project_id}"}}]}
+            }
+        )
+        return {"id": response["id"], "url": response.get("url", "")}
+    
+    def append_to_page(self, page_id: str, content: str) -> None:
+        """
+        Append markdown content to a page as Notion blocks.
+        
+        Args:
+            page_id: ID of the page to append to
+            content: Markdown content to append
+        """
+        with self.open_publisher(page_id) as publisher:
+            publisher.write(content)
+    
+    def publish_sections(self, page_id: str, sections: Iterable[str]) -> None:
+        """
+        Append sections to a page as they are produced.
+        
+        The publisher sends each section in the background while the next one
+        is produced. If it gives up on a batch, publication resumes from the
+        first unacknowledged batch, up to publish_resumes times, so the page
+        never ends up with a gap in its content.
+        
+        Args:
+            page_id: ID of the page to append to
+            sections: Markdown sections, in page order
+        
+        Raises:
+            PublishError: If batches still fail after the last resume
+        """
+        resumes = self.config.get("publish_resumes", 2)
+        
+        with self.open_publisher(page_id) as publisher:
+            def run(action: Callable[[], None]) -> None:
+                nonlocal resumes
+                while True:
+                    try:
+                        action()
+                        return
+                    except PublishError as e:
+                        if resumes <= 0:
+                            raise
+                        resumes -= 1
+                        logger.warning(f"Publication to page {page_id} stopped, resuming: {e}")
+                    
+                    # A failed resume is raised again by the next action
+                    try:
+                        publisher.resume()
+                    except PublishError:
+                        pass
+            
+            for section in sections:
+                run(lambda: publisher.write(section))
+            run(publisher.close)
+    
+    def open_publisher(self, page_id: str) -> BlockPublisher:
+        """
+        Open a publisher appending content to a page in order.
+        
+        Args:
+            page_id: ID of the page to append to
+            
+        Returns:
+            Publisher, to be closed once all content is written
+        """
+        return BlockPublisher(self.client, page_id, max_retries=self.config.get("publish_retries", 3),
+                              transport=self.transport)
+    
+    def _markdown_to_blocks(self, content: str) -> List[Dict[str, Any]]:
+        """
+        Convert markdown text to Notion blocks.
+        
+        Args:
+            content: Markdown text
+            
+        Returns:
+            List of Notion blocks
+        """
+        return markdown_to_blocks(content)
     
     def _blocks_to_text(self, blocks: List[Dict[str, Any]]) -> str:
         """
         Convert Notion blocks to text.
         
         Args:
-            blocks: List of Notion blocks
+            blocks: List of Notion blocks, nested blocks under "children"
             
         Returns:
             Formatted text
         """
-        # Simple implementation for testing
-        text_parts = []
-        
-        for block in blocks:
-            block_type = block.get("type")
-            
-            if block_type == "heading_1":
-                text = block.get("heading_1", {}).get("rich_text", [{}])[0].get("plain_text", "")
-                text_parts.append(f"# {text}")
-            elif block_type == "heading_2":
-                text = block.get("heading_2", {}).get("rich_text", [{}])[0].get("plain_text", "")
-                text_parts.append(f"## {text}")
-            elif block_type == "paragraph":
-                text = block.get("paragraph", {}).get("rich_text", [{}])[0].get("plain_text", "")
-                text_parts.append(text)
-            elif block_type == "bulleted_list_item":
-                text = block.get("bulleted_list_item", {}).get("rich_text", [{}])[0].get("plain_text", "")
-                text_parts.append(f"- {text}")
-            elif block_type == "numbered_list_item":
-                text = block.get("numbered_list_item", {}).get("rich_text", [{}])[0].get("plain_text", "")
-                text_parts.append(f"1. {text}")
-            elif block_type == "to_do":
-                text = block.get("to_do", {}).get("rich_text", [{}])[0].get("plain_text", "")
-                checked = block.get("to_do", {}).get("checked", False)
-                text_parts.append(f"- [{'x' if checked else ' '}] {text}")
-        
-        return "\n\n".join(text_parts)
\ No newline at end of file
+        return blocks_to_markdown(blocks)
@@ -0,0 +1,157 @@
+"""
+Local cache of Notion page blocks validated by last edit time.
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Precision of last_edited_time, which Notion rounds down to the minute
+EDIT_TIME_RESOLUTION = 60
+
+
+class NotionPageCache:
+    """
+    Disk cache of the block trees of Notion pages.
+
+    Each page is stored with the last_edited_time it had when it was fetched.
+    Notion updates that time whenever any block of the page changes, so an
+    entry is valid as long as the time reported by a pages.retrieve call is
+    unchanged, and the page body does not need to be listed again. As the
+    time is rounded down to the minute, pages fetched within a minute of
+    their last edit are not stored: a later edit in that minute would keep
+    the time unchanged. Entries read from disk are also kept in memory, which
+    helps batch runs over projects sharing linked pages.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Directory of the cache files, created if missing
+        """
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self._memory: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, page_id: str, last_edited_time: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the cached blocks of a page if the page is unchanged.
+
+        Args:
+            page_id: Page ID
+            last_edited_time: Current last edit time of the page
+
+        Returns:
+            Blocks of the page with nested children, None if not cached or outdated
+        """
+        entry = self._load(page_id) if last_edited_time else None
+
+        with self._lock:
+            if entry is not None and entry.get("last_edited_time") == last_edited_time:
+                self.hits += 1
+                return entry["blocks"]
+            self.misses += 1
+            return None
+
+    def put(self, page_id: str, last_edited_time: Optional[str], blocks: List[Dict[str, Any]],
+            fetched_at: Optional[float] = None) -> None:
+        """
+        Store the blocks of a page.
+
+        Args:
+            page_id: Page ID
+            last_edited_time: Last edit time of the page when it was fetched
+            blocks: Blocks of the page with nested children
+            fetched_at: Time the fetch started, in seconds since the epoch (now by default)
+        """
+        if not last_edited_time:
+            return
+
+        try:
+            edited = datetime.fromisoformat(last_edited_time.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return
+        if (fetched_at if fetched_at is not None else time.time()) < edited + EDIT_TIME_RESOLUTION:
+            logger.debug(f"Not caching Notion page {page_id}, it was edited less than a minute before the fetch")
+            return
+
+        entry = {"last_edited_time": last_edited_time, "blocks": blocks}
+        path = self._path(page_id)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+
+        try:
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not cache Notion page {page_id}: {e}")
+            return
+
+        with self._lock:
+            self._memory[page_id] = entry
+            self.stores += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache statistics.
+
+        Returns:
+            Dictionary with the number of hits, misses and stored pages
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "stores": self.stores}
+
+    def _load(self, page_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the entry of a page from memory or disk.
+
+        Args:
+            page_id: Page ID
+
+        Returns:
+            Cache entry, None if there is none or it cannot be read
+        """
+        with self._lock:
+            if page_id in self._memory:
+                return self._memory[page_id]
+
+        path = self._path(page_id)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read cached Notion page {page_id}: {e}")
+            return None
+
+        with self._lock:
+            self._memory[page_id] = entry
+        return entry
+
+    def _path(self, page_id: str) -> str:
+        """
+        Get the cache file of a page.
+
+        Args:
+            page_id: Page ID
+
+        Returns:
+            File path
+        """
+        return os.path.join(self.directory, f"{page_id.replace('-', '')}.json.gz")
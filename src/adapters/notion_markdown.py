@@ -0,0 +1,363 @@
+"""
+Conversion between Notion blocks and markdown text.
+
+Every block type is rendered by a function looked up in BLOCK_RENDERERS, so
+each block is dispatched once. Nested blocks (under "children") are walked
+iteratively with an explicit stack and the output is produced as a stream of
+lines that callers join once, which keeps conversion linear in the number of
+blocks however deep the tree is.
+
+In the other direction, markdown lines are mapped to block types by their
+leading marker with a single dictionary lookup.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+# Indentation of the children of list items, to-dos and toggles
+NESTED_INDENT = "  "
+
+# Notion API limit for the content of a rich text span
+MAX_RICH_TEXT_LENGTH = 2000
+
+
+def rich_text_to_text(spans: Optional[Iterable[Dict[str, Any]]]) -> str:
+    """
+    Concatenate the text of all rich text spans.
+
+    Args:
+        spans: Rich text spans of a block
+
+    Returns:
+        Plain text of the spans
+    """
+    if not spans:
+        return ""
+    return "".join(
+        span.get("plain_text") or (span.get("text") or {}).get("content", "")
+        for span in spans
+    )
+
+
+def _text(data: Dict[str, Any], block: Dict[str, Any], number: int) -> str:
+    return rich_text_to_text(data.get("rich_text"))
+
+
+def _prefixed(prefix: str) -> Callable[[Dict[str, Any], Dict[str, Any], int], str]:
+    def render(data: Dict[str, Any], block: Dict[str, Any], number: int) -> str:
+        return prefix + rich_text_to_text(data.get("rich_text"))
+    return render
+
+
+def _numbered_list_item(data: Dict[str, Any], block: Dict[str, Any], number: int) -> str:
+    return f"{number}. {rich_text_to_text(data.get('rich_text'))}"
+
+
+def _to_do(data: Dict[str, Any], block: Dict[str, Any], number: int) -> str:
+    return f"- [{'x' if data.get('checked') else ' '}] {rich_text_to_text(data.get('rich_text'))}"
+
+
+def _callout(data: Dict[str, Any], block: Dict[str, Any], number: int) -> str:
+    icon = (data.get("icon") or {}).get("emoji")
+    text = rich_text_to_text(data.get("rich_text"))
+    return f"> {icon} {text}" if icon else f"> {text}"
+
+
+def _code(data: Dict[str, Any], block: Dict[str, Any], number: int) -> str:
+    language = data.get("language") or ""
+    if language == "plain text":
+        language = ""
+    return f"```{language}\n{rich_text_to_text(data.get('rich_text'))}\n```"
+
+
+def _equation(data: Dict[str, Any], block: Dict[str, Any], number: int) -> str:
+    return f"$$ {data.get('expression', '')} $$"
+
+
+def _divider(data: Dict[str, Any], block: Dict[str, Any], number: int) -> str:
+    return "---"
+
+
+def _child_page(data: Dict[str, Any], block: Dict[str, Any], number: int) -> str:
+    return f"Page: {data.get('title') or 'Untitled'}"
+
+
+def _child_database(data: Dict[str, Any], block: Dict[str, Any], number: int) -> str:
+    return f"Database: {data.get('title') or 'Untitled'}"
+
+
+def _link(data: Dict[str, Any], block: Dict[str, Any], number: int) -> str:
+    url = data.get("url", "")
+    caption = rich_text_to_text(data.get("caption"))
+    return f"[{caption}]({url})" if caption else url
+
+
+def _file(data: Dict[str, Any], block: Dict[str, Any], number: int) -> str:
+    # Files are either hosted by Notion or external
+    url = (data.get(data.get("type", "")) or {}).get("url", "")
+    caption = rich_text_to_text(data.get("caption")) or data.get("name") or block.get("type", "file")
+    return f"[{caption}]({url})" if url else caption
+
+
+def _link_to_page(data: Dict[str, Any], block: Dict[str, Any], number: int) -> str:
+    return f"Link to page: {data.get(data.get('type', ''), '')}"
+
+
+def _table(data: Dict[str, Any], block: Dict[str, Any], number: int) -> str:
+    rows = [
+        "| " + " | ".join(rich_text_to_text(cell).replace("|", "\\|")
+                          for cell in (row.get("table_row") or {}).get("cells", [])) + " |"
+        for row in block.get("children") or []
+        if row.get("type") == "table_row"
+    ]
+    if not rows:
+        return ""
+
+    # Markdown tables need a header row
+    width = data.get("table_width") or rows[0].count(" | ") + 1
+    separator = "|" + " --- |" * width
+    if data.get("has_column_header"):
+        return "\n".join([rows[0], separator] + rows[1:])
+    return "\n".join(["|" + "  |" * width, separator] + rows)
+
+
+def _none(data: Dict[str, Any], block: Dict[str, Any], number: int) -> str:
+    return ""
+
+
+# Renderer of each block type, given the type data, the block and its number in a numbered list
+BLOCK_RENDERERS: Dict[str, Callable[[Dict[str, Any], Dict[str, Any], int], str]] = {
+    "paragraph": _text,
+    "heading_1": _prefixed("# "),
+    "heading_2": _prefixed("## "),
+    "heading_3": _prefixed("### "),
+    "bulleted_list_item": _prefixed("- "),
+    "numbered_list_item": _numbered_list_item,
+    "to_do": _to_do,
+    "toggle": _prefixed("- "),
+    "quote": _prefixed("> "),
+    "callout": _callout,
+    "code": _code,
+    "equation": _equation,
+    "divider": _divider,
+    "table": _table,
+    "child_page": _child_page,
+    "child_database": _child_database,
+    "bookmark": _link,
+    "embed": _link,
+    "link_preview": _link,
+    "image": _file,
+    "video": _file,
+    "audio": _file,
+    "file": _file,
+    "pdf": _file,
+    "link_to_page": _link_to_page,
+    "template": _text,
+    "synced_block": _none,
+    "column_list": _none,
+    "column": _none,
+    "breadcrumb": _none,
+    "table_of_contents": _none,
+    "unsupported": _none,
+}
+
+# Block types whose children are indented below them
+INDENTED_CHILDREN = frozenset(["bulleted_list_item", "numbered_list_item", "to_do", "toggle"])
+
+# Block types rendering their own children
+RENDERS_CHILDREN = frozenset(["table"])
+
+
+def iter_blocks_markdown(blocks: List[Dict[str, Any]]) -> Iterator[str]:
+    """
+    Render blocks and their nested children as markdown, one block at a time.
+
+    Args:
+        blocks: Notion blocks, nested blocks under "children"
+
+    Yields:
+        Markdown of each non-empty block in document order
+    """
+    # Stack of (sibling iterator, indentation, numbering of the current list)
+    stack = [(iter(blocks), "", [0])]
+
+    while stack:
+        siblings, indent, numbering = stack[-1]
+        block = next(siblings, None)
+        if block is None:
+            stack.pop()
+            continue
+
+        block_type = block.get("type", "")
+        numbering[0] = numbering[0] + 1 if block_type == "numbered_list_item" else 0
+
+        renderer = BLOCK_RENDERERS.get(block_type, _text)
+        text = renderer(block.get(block_type) or {}, block, numbering[0])
+        if text:
+            yield indent + text.replace("\n", "\n" + indent) if indent else text
+
+        children = block.get("children")
+        if children and block_type not in RENDERS_CHILDREN:
+            child_indent = indent + NESTED_INDENT if block_type in INDENTED_CHILDREN else indent
+            stack.append((iter(children), child_indent, [0]))
+
+
+def blocks_to_markdown(blocks: List[Dict[str, Any]]) -> str:
+    """
+    Convert Notion blocks and their nested children to markdown.
+
+    Args:
+        blocks: Notion blocks, nested blocks under "children"
+
+    Returns:
+        Markdown text with blocks separated by blank lines
+    """
+    return "\n\n".join(iter_blocks_markdown(blocks))
+
+
+# Block type of each leading markdown marker
+LINE_MARKERS = {
+    "#": "heading_1",
+    "##": "heading_2",
+    "###": "heading_3",
+    "####": "heading_3",
+    "-": "bulleted_list_item",
+    "*": "bulleted_list_item",
+    "+": "bulleted_list_item",
+    ">": "quote",
+}
+
+
+def text_to_rich_text(text: str) -> List[Dict[str, Any]]:
+    """
+    Split text into rich text spans within the Notion length limit.
+
+    Args:
+        text: Plain text
+
+    Returns:
+        Rich text spans
+    """
+    return [
+        {"type": "text", "text": {"content": text[i:i + MAX_RICH_TEXT_LENGTH]}}
+        for i in range(0, len(text), MAX_RICH_TEXT_LENGTH)
+    ]
+
+
+def _make_block(block_type: str, text: str, **data: Any) -> Dict[str, Any]:
+    data["rich_text"] = text_to_rich_text(text)
+    return {"object": "block", "type": block_type, block_type: data}
+
+
+def markdown_to_blocks(content: str) -> List[Dict[str, Any]]:
+    """
+    Convert markdown text to Notion blocks.
+
+    Headings, bulleted and numbered lists, to-dos, quotes, dividers and fenced
+    code blocks are recognized; any other line becomes a paragraph. Nested
+    list items are flattened.
+
+    Args:
+        content: Markdown text
+
+    Returns:
+        List of Notion blocks
+    """
+    blocks = []
+    code_lines: Optional[List[str]] = None
+    code_language = ""
+
+    for raw_line in content.splitlines():
+        if code_lines is not None:
+            if raw_line.strip().startswith("```"):
+                blocks.append(_make_block("code", "\n".join(code_lines), language=code_language or "plain text"))
+                code_lines = None
+            else:
+                code_lines.append(raw_line)
+            continue
+
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        if line.startswith("```"):
+            code_lines = []
+            code_language = line[3:].strip()
+            continue
+
+        if line == "---":
+            blocks.append({"object": "block", "type": "divider", "divider": {}})
+            continue
+
+        marker, _, text = line.partition(" ")
+        block_type = LINE_MARKERS.get(marker)
+
+        if block_type == "bulleted_list_item" and text[:4] in ("[ ] ", "[x] ", "[X] "):
+            blocks.append(_make_block("to_do", text[4:], checked=text[1] != " "))
+        elif block_type:
+            blocks.append(_make_block(block_type, text))
+        elif marker[:-1].isdigit() and marker[-1:] == ".":
+            blocks.append(_make_block("numbered_list_item", text))
+        else:
+            blocks.append(_make_block("paragraph", line))
+
+    # Unterminated code fence
+    if code_lines is not None:
+        blocks.append(_make_block("code", "\n".join(code_lines), language=code_language or "plain text"))
+
+    return blocks
+
+
+def _names(values: Optional[List[Dict[str, Any]]]) -> str:
+    return ", ".join(value.get("name") or value.get("id", "") for value in values or [])
+
+
+def _date(value: Optional[Dict[str, Any]]) -> str:
+    if not value:
+        return ""
+    return f"{value['start']} to {value['end']}" if value.get("end") else value.get("start") or ""
+
+
+def _formula(value: Optional[Dict[str, Any]]) -> str:
+    if not value:
+        return ""
+    result = value.get(value.get("type", ""))
+    return _date(result) if isinstance(result, dict) else ("" if result is None else str(result))
+
+
+# Text of each property type, given the property value
+PROPERTY_RENDERERS: Dict[str, Callable[[Any], str]] = {
+    "title": rich_text_to_text,
+    "rich_text": rich_text_to_text,
+    "select": lambda value: (value or {}).get("name", ""),
+    "status": lambda value: (value or {}).get("name", ""),
+    "multi_select": _names,
+    "people": _names,
+    "date": _date,
+    "formula": _formula,
+    "relation": lambda value: f"{len(value or [])} linked",
+    "checkbox": lambda value: "yes" if value else "no",
+    "created_by": lambda value: (value or {}).get("name", ""),
+    "last_edited_by": lambda value: (value or {}).get("name", ""),
+}
+
+
+def property_to_text(prop: Dict[str, Any]) -> str:
+    """
+    Convert a page property value to text.
+
+    Args:
+        prop: Property value as returned by the API, with a "type" entry
+
+    Returns:
+        Text of the value, empty if it is unset
+    """
+    property_type = prop.get("type", "")
+    value = prop.get(property_type)
+
+    renderer = PROPERTY_RENDERERS.get(property_type)
+    if renderer is not None:
+        return renderer(value)
+    # Numbers, URLs, emails, phone numbers, timestamps and unique IDs
+    if isinstance(value, dict):
+        return " ".join(str(part) for part in value.values() if part is not None)
+    return "" if value is None else str(value)
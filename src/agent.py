@@ -5,13 +5,16 @@ Main agent for documentation generation.
 import logging
 import os
 import tempfile
-from typing import Dict, List, Any, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Set
 
 from src.adapters.notion import NotionClient
 from src.adapters.gdrive import GoogleDriveClient
 from src.adapters.jira import JiraClient
 from src.parsers.factory import ParserFactory
 from src.summarizers.llm import LLMSummarizer
+from src.utils.http import get_shared_transport
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +38,8 @@ class DocumentationAgent:
         self.project_id = project_id
         self.dry_run = dry_run
         
-        # Initialize clients
+        # Initialize clients, which share the HTTP transport configured here
+        self.transport = get_shared_transport(config.get("http", {}))
         self.notion_client = NotionClient(config.get("notion", {}))
         self.gdrive_client = GoogleDriveClient(config.get("gdrive", {}))
         self.jira_client = None  # Will be initialized when we get the Jira URL
@@ -49,6 +53,9 @@ class DocumentationAgent:
         # Create temporary directory for downloading files
         self.temp_dir = tempfile.TemporaryDirectory()
         
+        # Timings and statistics of the last run
+        self.trace: Dict[str, Any] = {}
+        
         logger.info(f"Documentation agent initialized for project {project_id}")
         
     def run(self) -> Optional[str]:
@@ -72,36 +79,20 @@ class DocumentationAgent:
                 self.jira_client = JiraClient(jira_url, self.config.get("jira", {}))
                 logger.info(f"Initialized Jira client with URL: {jira_url}")
             
-            # Step 3: Find and download relevant Google Drive documents
-            drive_documents = []
-            drive_files = self.gdrive_client.get_relevant_files(self.project_id)
+            # Step 3: Find relevant Google Drive documents
+            drive_files = self.gdrive_client.get_relevant_files(self.project_id, notion_data.get("title"))
             logger.info(f"Found {len(drive_files)} relevant files in Google Drive")
             
-            for file in drive_files:
-                try:
-                    file_path = self.gdrive_client.download_file(file["id"], self.temp_dir.name)
-                    parser = self.parser_factory.get_parser(file["mimeType"])
-                    
-                    if parser:
-                        content = parser.parse(file_path)
-                        drive_documents.append({
-                            "id": file["id"],
-                            "name": file["name"],
-                            "type": file["mimeType"],
-                            "content": content,
-                            "url": file.get("webViewLink", "")
-                        })
-                    else:
-                        logger.warning(f"No parser available for file: {file['name']} ({file['mimeType']})")
-                except Exception as e:
-                    logger.error(f"Error processing file {file['name']}: {e}")
-            
             # Step 4: Extract tasks from Jira
             jira_tasks = []
             if self.jira_client:
                 jira_tasks = self.jira_client.get_project_issues(self.project_id)
                 logger.info(f"Found {len(jira_tasks)} tasks in Jira")
             
+            # Download and parse the Drive documents and the Jira attachments
+            # in a single parallel pass
+            drive_documents = self._collect_documents(drive_files, jira_tasks)
+            
             # Step 5: Generate comprehensive summary
             summary_data = {
                 "notion_data": notion_data,
@@ -110,10 +101,10 @@ class DocumentationAgent:
                 "project_id": self.project_id
             }
             
-            summary = self.summarizer.generate_summary(summary_data)
-            logger.info("Generated comprehensive summary")
+            sections = self.summarizer.stream_summary(summary_data)
             
-            # Step 6: Create documentation page in Notion or save locally
+            # Step 6: Create documentation page in Notion or save locally,
+            # writing each section as soon as the summarizer finishes it
             if self.dry_run:
                 # Save to file
                 output_folder = self.config.get("project", {}).get("default_output_folder", ".")
@@ -121,20 +112,137 @@ class DocumentationAgent:
                 output_file = os.path.join(output_folder, f"{self.project_id}_summary.md")
                 
                 with open(output_file, "w") as f:
-                    f.write(summary)
+                    for index, section in enumerate(sections):
+                        if index:
+                            f.write("\n\n")
+                        f.write(section)
+                        f.flush()
                     
                 logger.info(f"Saved summary to file: {output_file}")
+                self._log_trace()
                 return output_file
+            elif self.config.get("notion", {}).get("summary_mode", "create") == "update":
+                # Update the existing Notion page with the changed blocks only
+                url = self.notion_client.update_summary_page(self.project_id, "\n\n".join(sections))
+                logger.info(f"Updated summary page in Notion: {url}")
+                self._log_trace()
+                return url
             else:
-                # Create Notion page
-                url = self.notion_client.create_summary_page(self.project_id, summary)
+                # Create Notion page and append the sections as they arrive;
+                # they are sent in the background while the next section is
+                # summarized, resuming from the last appended batch on failure
+                page = self.notion_client.start_summary_page(self.project_id)
+                self.notion_client.publish_sections(page["id"], sections)
+                    
+                url = page["url"]
                 logger.info(f"Created summary page in Notion: {url}")
+                self._log_trace()
                 return url
                 
         except Exception as e:
             logger.exception(f"Error generating documentation: {e}")
             return None
             
+    def _log_trace(self) -> None:
+        """Record the statistics of the finished run in the trace and log it."""
+        self.trace["section_timings"] = dict(self.summarizer.section_timings)
+        self.trace["notion_cache"] = self.notion_client.cache_stats()
+        self.trace["http"] = self.transport.stats()
+        logger.info(f"Run trace: {self.trace}")
+        
+    def _collect_documents(self, drive_files: List[Dict[str, Any]],
+                           jira_tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Download and parse the Drive files and the Jira attachments concurrently.
+        
+        Attachments are downloaded only if a parser exists for their type.
+        Jira lists no checksum of attachments, so those with the name and size
+        of a Drive file are skipped without being downloaded, and those whose
+        content hash matches a Drive file or an attachment already seen are
+        dropped before parsing.
+        
+        Args:
+            drive_files: Metadata of the selected Drive files
+            jira_tasks: Jira tasks with their attachments
+            
+        Returns:
+            Parsed documents, Drive files first, in the order of the inputs
+        """
+        max_attachment_bytes = self.config.get("jira", {}).get("max_attachment_bytes", 50 * 1024 * 1024)
+        drive_names = {(file["name"], int(file["size"])) for file in drive_files if file.get("size")}
+        candidates = [
+            (task, attachment)
+            for task in jira_tasks
+            for attachment in task.get("attachments") or []
+            if attachment.get("size", 0) <= max_attachment_bytes
+            and self.parser_factory.get_parser(attachment.get("mimeType", ""))
+        ]
+        attachments = [(task, attachment) for task, attachment in candidates
+                       if (attachment.get("filename"), attachment.get("size")) not in drive_names]
+        duplicates = [attachment["filename"] for task, attachment in candidates
+                      if (attachment.get("filename"), attachment.get("size")) in drive_names]
+        
+        seen_hashes: Set[str] = {file["md5Checksum"] for file in drive_files if file.get("md5Checksum")}
+        lock = threading.Lock()
+        
+        def drive_document(file: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            try:
+                file_path = self.gdrive_client.download_file(file["id"], self.temp_dir.name, metadata=file)
+                parser = self.parser_factory.get_parser(file.get("exportMimeType", file["mimeType"]))
+                
+                if not parser:
+                    logger.warning(f"No parser available for file: {file['name']} ({file['mimeType']})")
+                    return None
+                return {
+                    "id": file["id"],
+                    "name": file["name"],
+                    "type": file["mimeType"],
+                    "content": parser.parse(file_path),
+                    "url": file.get("webViewLink", "")
+                }
+            except Exception as e:
+                logger.error(f"Error processing file {file['name']}: {e}")
+                return None
+        
+        def attachment_document(task: Dict[str, Any], attachment: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            try:
+                file_path, md5 = self.jira_client.download_attachment(attachment, self.temp_dir.name)
+                with lock:
+                    duplicate = md5 in seen_hashes
+                    seen_hashes.add(md5)
+                if duplicate:
+                    duplicates.append(attachment["filename"])
+                    os.remove(file_path)
+                    return None
+                
+                parser = self.parser_factory.get_parser(attachment["mimeType"])
+                return {
+                    "id": f"jira-{attachment['id']}",
+                    "name": f"{attachment['filename']} ({task.get('key', '')})",
+                    "type": attachment["mimeType"],
+                    "content": parser.parse(file_path),
+                    "url": attachment.get("url", "")
+                }
+            except Exception as e:
+                logger.error(f"Error processing attachment {attachment.get('filename')} of {task.get('key')}: {e}")
+                return None
+        
+        workers = self.config.get("project", {}).get("document_workers", 4)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="documents") as executor:
+            futures = [executor.submit(drive_document, file) for file in drive_files]
+            futures += [executor.submit(attachment_document, task, attachment) for task, attachment in attachments]
+            documents = [future.result() for future in futures]
+        
+        documents = [document for document in documents if document]
+        self.trace["documents"] = {
+            "drive_files": len(drive_files),
+            "jira_attachments": len(candidates) - len(duplicates),
+            "duplicate_attachments": len(duplicates)
+        }
+        if duplicates:
+            logger.info(f"Skipped {len(duplicates)} Jira attachments already in Drive or attached twice")
+        return documents
+    
     def _extract_notion_data(self) -> Dict[str, Any]:
         """
         Extract project data from Notion.
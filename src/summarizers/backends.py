@@ -0,0 +1,199 @@
+"""
+Pluggable LLM backends for the summarizer.
+
+Besides the LangChain backend used in production, a recording backend stores
+every response with its latency, and a replay backend serves those responses
+offline with the recorded timing. Together they allow deterministic
+end-to-end benchmarks with realistic LLM latency.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def prompt_hash(prompt: str) -> str:
+    """
+    Compute the key under which a prompt is recorded.
+    
+    Args:
+        prompt: Prompt text
+    
+    Returns:
+        Hex digest of the prompt
+    """
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class LLMBackend(ABC):
+    """Base class for all LLM backends."""
+    
+    @abstractmethod
+    def complete(self, prompt: str) -> str:
+        """
+        Run a prompt through the LLM.
+        
+        Args:
+            prompt: Prompt text
+        
+        Returns:
+            LLM response
+        """
+        pass
+
+
+class ChainBackend(LLMBackend):
+    """Backend running prompts through a LangChain chain."""
+    
+    def __init__(self, chain: Any):
+        """
+        Initialize the backend.
+        
+        Args:
+            chain: Chain with a run(text) method
+        """
+        self.chain = chain
+    
+    def complete(self, prompt: str) -> str:
+        return self.chain.run(prompt)
+
+
+class RecordingBackend(LLMBackend):
+    """
+    Backend that records the responses and latencies of another backend.
+    
+    Records are appended to a JSON Lines file, one object per call with the
+    prompt hash, the response and the latency in seconds.
+    """
+    
+    def __init__(self, backend: LLMBackend, path: str, clock: Callable[[], float] = time.perf_counter):
+        """
+        Initialize the backend.
+        
+        Args:
+            backend: Backend performing the actual calls
+            path: Path of the recording file, appended to if it exists
+            clock: Clock used to measure latency
+        """
+        self.backend = backend
+        self.path = path
+        self.clock = clock
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    
+    def complete(self, prompt: str) -> str:
+        start = self.clock()
+        response = self.backend.complete(prompt)
+        latency = self.clock() - start
+        
+        record = json.dumps({"prompt": prompt_hash(prompt), "response": response, "latency": latency})
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(record + "\n")
+        
+        return response
+
+
+class ReplayMissError(KeyError):
+    """Raised when a prompt was not recorded and replay is strict."""
+
+
+class ReplayBackend(LLMBackend):
+    """
+    Backend replaying recorded responses with their recorded latency.
+    
+    Repeated prompts are answered with their recorded responses in order; the
+    last one is reused once they are exhausted. Prompts that were not recorded
+    raise ReplayMissError in strict mode, otherwise they get a placeholder
+    response after a latency drawn from the recorded distribution.
+    """
+    
+    def __init__(self, path: str, speed: float = 1.0, strict: bool = False, seed: int = 0,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialize the backend.
+        
+        Args:
+            path: Path of the recording file
+            speed: Replay speed factor, 2.0 halves every latency; 0 disables waiting
+            strict: Whether unrecorded prompts raise instead of being answered
+            seed: Seed for sampling latencies of unrecorded prompts
+            sleep: Sleep function
+        """
+        self.speed = speed
+        self.strict = strict
+        self.sleep = sleep
+        self.records: Dict[str, Deque[Tuple[str, float]]] = {}
+        self.latencies: List[float] = []
+        self.misses = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        
+        with open(path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                self.records.setdefault(record["prompt"], deque()).append((record["response"], record["latency"]))
+                self.latencies.append(record["latency"])
+        
+        logger.info(f"Loaded {len(self.latencies)} recorded LLM responses from {path}")
+    
+    def complete(self, prompt: str) -> str:
+        key = prompt_hash(prompt)
+        
+        with self._lock:
+            responses = self.records.get(key)
+            if responses:
+                response, latency = responses.popleft() if len(responses) > 1 else responses[0]
+            elif self.strict:
+                raise ReplayMissError(f"No recorded response for prompt {key[:12]}")
+            else:
+                self.misses += 1
+                response = f"[No recorded response for prompt {key[:12]}]"
+                latency = self._random.choice(self.latencies) if self.latencies else 0.0
+        
+        if self.speed > 0 and latency > 0:
+            self.sleep(latency / self.speed)
+        return response
+
+
+def create_backend(config: Dict[str, Any], chain: Optional[Any]) -> Optional[LLMBackend]:
+    """
+    Create the backend selected in the summarization configuration.
+    
+    Args:
+        config: Summarization configuration
+        chain: LangChain chain, None if no LLM is available
+    
+    Returns:
+        The backend, None if it needs an LLM and none is available
+    """
+    mode = config.get("backend", "langchain")
+    
+    if mode == "replay":
+        return ReplayBackend(
+            config["recording_file"],
+            speed=config.get("replay_speed", 1.0),
+            strict=config.get("replay_strict", False)
+        )
+    
+    if chain is None:
+        return None
+    
+    if mode == "record":
+        return RecordingBackend(ChainBackend(chain), config["recording_file"])
+    
+    return ChainBackend(chain)
@@ -3,7 +3,7 @@ Base summarizer interface.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Iterator
 
 
 class BaseSummarizer(ABC):
@@ -21,3 +21,17 @@ class BaseSummarizer(ABC):
             Generated summary text
         """
         pass
+    
+    def stream_summary(self, data: Dict[str, Any]) -> Iterator[str]:
+        """
+        Generate a summary section by section.
+        
+        The default implementation yields the full summary as a single section.
+        
+        Args:
+            data: Data to summarize
+            
+        Yields:
+            Finished summary sections, in document order
+        """
+        yield self.generate_summary(data)
@@ -0,0 +1,158 @@
+"""
+Batching of small summarization requests into shared LLM prompts.
+"""
+
+import json
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BATCH_PROMPT = (
+    "{instruction}\n\n"
+    "Summarize each of the following items separately. Respond only with a JSON object "
+    "that maps every item id to the summary of that item, for example "
+    "{{\"1\": \"summary of item 1\", \"2\": \"summary of item 2\"}}.\n\n"
+    "{items}"
+)
+ITEM_TEMPLATE = "### Item {item_id}\n{text}"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text.
+    
+    Args:
+        text: Text to measure
+    
+    Returns:
+        Approximate token count (about four characters per token)
+    """
+    return len(text) // 4 + 1
+
+
+class PromptBatcher:
+    """
+    Packs small items into shared prompts and splits the responses per item.
+    
+    Items are bin-packed first-fit decreasing by estimated size, so each prompt
+    stays within the token budget. Items that are too large to share a prompt,
+    batches whose response cannot be parsed and items missing from a parsed
+    response fall back to one prompt per item.
+    """
+    
+    def __init__(self, complete: Callable[[str], str], token_budget: int = 3000,
+                 max_items: int = 20, small_item_tokens: Optional[int] = None):
+        """
+        Initialize the batcher.
+        
+        Args:
+            complete: Function running a prompt through the LLM
+            token_budget: Maximum estimated tokens of the items in one prompt
+            max_items: Maximum number of items in one prompt, bounding the response size
+            small_item_tokens: Items above this size are always sent alone
+                (defaults to half the token budget)
+        """
+        self.complete = complete
+        self.token_budget = token_budget
+        self.max_items = max_items
+        self.small_item_tokens = small_item_tokens or token_budget // 2
+    
+    def pack(self, items: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+        """
+        Group items into batches within the token budget.
+        
+        Args:
+            items: (item id, text) pairs
+        
+        Returns:
+            List of batches, single-item batches for large items
+        """
+        batches: List[List[Tuple[str, str]]] = []
+        loads: List[int] = []
+        
+        for item in sorted(items, key=lambda pair: estimate_tokens(pair[1]), reverse=True):
+            tokens = estimate_tokens(item[1])
+            
+            if tokens > self.small_item_tokens:
+                batches.append([item])
+                loads.append(self.token_budget)
+                continue
+            
+            for index, load in enumerate(loads):
+                if load + tokens <= self.token_budget and len(batches[index]) < self.max_items:
+                    batches[index].append(item)
+                    loads[index] += tokens
+                    break
+            else:
+                batches.append([item])
+                loads.append(tokens)
+        
+        return batches
+    
+    def summarize(self, items: List[Tuple[str, str]], instruction: str,
+                  single_prompt: str) -> Dict[str, str]:
+        """
+        Summarize all items with as few LLM calls as possible.
+        
+        Args:
+            items: (item id, text) pairs, ids must be unique
+            instruction: Instruction placed at the top of batched prompts
+            single_prompt: Prompt template with a {text} field for single-item calls
+        
+        Returns:
+            Dictionary mapping item id to summary
+        """
+        results: Dict[str, str] = {}
+        
+        for batch in self.pack(items):
+            if len(batch) > 1:
+                prompt = BATCH_PROMPT.format(
+                    instruction=instruction,
+                    items="\n\n".join(ITEM_TEMPLATE.format(item_id=item_id, text=text) for item_id, text in batch)
+                )
+                parsed = self._parse_response(self.complete(prompt), [item_id for item_id, _ in batch])
+                results.update(parsed)
+                
+                if len(parsed) < len(batch):
+                    logger.warning(f"Batched response covered {len(parsed)} of {len(batch)} items, "
+                                   f"falling back to single prompts")
+            
+            for item_id, text in batch:
+                if item_id not in results:
+                    results[item_id] = self.complete(single_prompt.format(text=text))
+        
+        return results
+    
+    @staticmethod
+    def _parse_response(response: str, item_ids: List[str]) -> Dict[str, str]:
+        """
+        Extract the per-item summaries from a batched response.
+        
+        Args:
+            response: LLM response, expected to contain a JSON object
+            item_ids: Ids of the items in the batch
+        
+        Returns:
+            Dictionary with the summaries that could be parsed, empty on failure
+        """
+        if not isinstance(response, str):
+            return {}
+        
+        start, end = response.find("{"), response.rfind("}")
+        if start < 0 or end < start:
+            return {}
+        
+        try:
+            parsed = json.loads(response[start:end + 1])
+        except ValueError:
+            return {}
+        
+        if not isinstance(parsed, dict):
+            return {}
+        
+        return {
+            item_id: parsed[item_id]
+            for item_id in item_ids
+            if isinstance(parsed.get(item_id), str) and parsed[item_id].strip()
+        }
@@ -0,0 +1,315 @@
+"""
+Offline clustering of issues into themes.
+
+Texts are turned into hashed term-frequency vectors and grouped with a
+mini-batch k-means, both implemented with NumPy so no model or service is
+needed. Each cluster is described by its top terms and a few representative
+members, which are the only texts that need to be sent to the LLM.
+"""
+
+import logging
+import math
+import re
+import zlib
+from collections import Counter
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z0-9]+")
+
+STOP_WORDS = frozenset("""
+    a an and are as at be by for from has have in into is it its of on or that the this to was
+    were will with when which should can not no we our you your they their all any add fix
+    implement update issue task bug story
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase terms, dropping stop words.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of terms
+    """
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class SparseRows:
+    """Row vectors stored in compressed sparse row form."""
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, n_features: int):
+        """
+        Initialize the rows.
+
+        Args:
+            indptr: Offsets of each row in indices and data
+            indices: Column indices of the non-zero values
+            data: Non-zero values
+            n_features: Number of columns
+        """
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.n_features = n_features
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    def dense(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Materialize a subset of the rows as a dense matrix.
+
+        Args:
+            rows: Row indices
+
+        Returns:
+            Matrix of shape (len(rows), n_features)
+        """
+        matrix = np.zeros((len(rows), self.n_features), dtype=np.float32)
+        for position, row in enumerate(rows):
+            start, end = self.indptr[row], self.indptr[row + 1]
+            matrix[position, self.indices[start:end]] = self.data[start:end]
+        return matrix
+
+
+class HashingVectorizer:
+    """
+    Stateless text vectorizer using the hashing trick.
+
+    Terms are hashed into a fixed number of signed buckets, term frequencies
+    are damped with log1p and every row is L2-normalized.
+    """
+
+    def __init__(self, n_features: int = 2 ** 12):
+        """
+        Initialize the vectorizer.
+
+        Args:
+            n_features: Number of hash buckets
+        """
+        self.n_features = n_features
+
+    def transform(self, texts: List[str]) -> SparseRows:
+        """
+        Vectorize texts.
+
+        Args:
+            texts: Texts to vectorize
+
+        Returns:
+            One sparse row per text
+        """
+        indptr = [0]
+        indices: List[int] = []
+        data: List[float] = []
+
+        for text in texts:
+            buckets: Counter = Counter()
+            for token in tokenize(text):
+                digest = zlib.crc32(token.encode("utf-8"))
+                buckets[digest % self.n_features] += 1.0 if digest & 0x80000000 else -1.0
+
+            values = [math.copysign(math.log1p(abs(count)), count) for count in buckets.values() if count]
+            norm = math.sqrt(sum(value * value for value in values)) or 1.0
+
+            indices.extend(bucket for bucket, count in buckets.items() if count)
+            data.extend(value / norm for value in values)
+            indptr.append(len(indices))
+
+        return SparseRows(
+            np.array(indptr, dtype=np.int64),
+            np.array(indices, dtype=np.int32),
+            np.array(data, dtype=np.float32),
+            self.n_features
+        )
+
+
+class MiniBatchKMeans:
+    """
+    Mini-batch k-means over sparse rows.
+
+    Centroids are updated from random mini-batches with per-centroid learning
+    rates, so memory stays bounded by the batch size rather than the number of
+    rows.
+    """
+
+    def __init__(self, n_clusters: int, batch_size: int = 1024, max_iter: int = 100, seed: int = 0):
+        """
+        Initialize the clustering.
+
+        Args:
+            n_clusters: Number of clusters
+            batch_size: Rows per mini-batch
+            max_iter: Number of mini-batch updates
+            seed: Random seed, for reproducible themes
+        """
+        self.n_clusters = n_clusters
+        self.batch_size = batch_size
+        self.max_iter = max_iter
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+
+    def fit(self, rows: SparseRows) -> "MiniBatchKMeans":
+        """
+        Fit the centroids.
+
+        Args:
+            rows: Vectors to cluster
+
+        Returns:
+            The fitted clustering
+        """
+        rng = np.random.default_rng(self.seed)
+        n_clusters = min(self.n_clusters, len(rows))
+
+        self.centroids = self._init_centroids(rows, n_clusters, rng)
+        counts = np.zeros(n_clusters, dtype=np.float64)
+
+        for _ in range(self.max_iter):
+            batch = rows.dense(rng.integers(0, len(rows), size=min(self.batch_size, len(rows))))
+            labels, _ = self._nearest(batch)
+
+            for cluster in np.unique(labels):
+                members = batch[labels == cluster]
+                counts[cluster] += len(members)
+                rate = len(members) / counts[cluster]
+                self.centroids[cluster] += rate * (members.mean(axis=0) - self.centroids[cluster])
+
+        return self
+
+    def _init_centroids(self, rows: SparseRows, n_clusters: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        Choose initial centroids with greedy k-means++ seeding on a sample of the rows.
+
+        Each step draws a few candidates with probability proportional to their
+        squared distance from the chosen centroids and keeps the one that
+        reduces the total distance most.
+
+        Args:
+            rows: Vectors to cluster
+            n_clusters: Number of centroids
+            rng: Random generator
+
+        Returns:
+            Initial centroids
+        """
+        sample = rows.dense(rng.choice(len(rows), size=min(len(rows), 4 * self.batch_size), replace=False))
+        squared_norms = (sample * sample).sum(axis=1)
+        n_trials = 2 + int(math.log(n_clusters))
+
+        def distances_to(index: int) -> np.ndarray:
+            return np.maximum(squared_norms + squared_norms[index] - 2 * sample @ sample[index], 0)
+
+        chosen = [int(rng.integers(len(sample)))]
+        distances = distances_to(chosen[0])
+
+        while len(chosen) < n_clusters:
+            total = distances.sum()
+            if total <= 0:
+                # Fewer distinct rows than clusters
+                chosen.append(int(rng.integers(len(sample))))
+                continue
+
+            best = None
+            for candidate in rng.choice(len(sample), size=n_trials, p=distances / total):
+                candidate_distances = np.minimum(distances, distances_to(candidate))
+                if best is None or candidate_distances.sum() < best[1].sum():
+                    best = (int(candidate), candidate_distances)
+
+            chosen.append(best[0])
+            distances = best[1]
+
+        return sample[chosen].copy()
+
+    def predict(self, rows: SparseRows):
+        """
+        Assign every row to its nearest centroid.
+
+        Args:
+            rows: Vectors to assign
+
+        Returns:
+            Tuple of (cluster labels, similarity of each row to its centroid)
+        """
+        labels = np.empty(len(rows), dtype=np.int32)
+        scores = np.empty(len(rows), dtype=np.float32)
+
+        for start in range(0, len(rows), self.batch_size):
+            batch_rows = np.arange(start, min(start + self.batch_size, len(rows)))
+            labels[batch_rows], scores[batch_rows] = self._nearest(rows.dense(batch_rows))
+
+        return labels, scores
+
+    def _nearest(self, batch: np.ndarray):
+        """
+        Find the nearest centroid of each row of a dense batch.
+
+        Args:
+            batch: Dense matrix of unit-length rows
+
+        Returns:
+            Tuple of (cluster labels, dot product with the assigned centroid)
+        """
+        products = batch @ self.centroids.T
+        # For unit rows, |x - c|^2 = 1 - 2 x.c + |c|^2
+        distances = (self.centroids * self.centroids).sum(axis=1) - 2 * products
+        labels = distances.argmin(axis=1)
+        return labels, products[np.arange(len(batch)), labels]
+
+
+class Theme:
+    """A cluster of issues."""
+    def __init__(self, terms: List[str], members: List[int], representatives: List[int]):
+        self.terms = terms
+        self.members = members
+        self.representatives = representatives
+
+
+def cluster_texts(texts: List[str], n_clusters: int = 0, n_representatives: int = 3,
+                  n_terms: int = 3, n_features: int = 2 ** 12) -> List[Theme]:
+    """
+    Group texts into themes.
+
+    Args:
+        texts: Texts to cluster
+        n_clusters: Number of themes, 0 to derive it from the number of texts
+        n_representatives: Members closest to the centroid kept per theme
+        n_terms: Most frequent terms of the representatives used as the theme label
+        n_features: Number of hash buckets of the vectorizer
+
+    Returns:
+        Non-empty themes, largest first
+    """
+    if not texts:
+        return []
+
+    if not n_clusters:
+        n_clusters = max(1, min(12, round(math.sqrt(len(texts) / 2))))
+
+    rows = HashingVectorizer(n_features).transform(texts)
+    kmeans = MiniBatchKMeans(n_clusters).fit(rows)
+    labels, scores = kmeans.predict(rows)
+
+    themes = []
+    for cluster in range(len(kmeans.centroids)):
+        members = np.flatnonzero(labels == cluster)
+        if not members.size:
+            continue
+
+        representatives = members[np.argsort(-scores[members], kind="stable")[:n_representatives]]
+        terms = Counter(token for index in representatives for token in tokenize(texts[index]))
+        themes.append(Theme(
+            [term for term, _ in terms.most_common(n_terms)],
+            [int(index) for index in members],
+            [int(index) for index in representatives]
+        ))
+
+    themes.sort(key=lambda theme: len(theme.members), reverse=True)
+    logger.debug(f"Clustered {len(texts)} texts into {len(themes)} themes")
+    return themes
@@ -0,0 +1,136 @@
+"""
+Dependency graph of summary sections executed in parallel.
+"""
+
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SectionNode:
+    """A unit of work in the section graph."""
+    def __init__(self, name: str, run: Callable[[Dict[str, Any]], Any],
+                 dependencies: Sequence[str], output: bool):
+        self.name = name
+        self.run = run
+        self.dependencies = list(dependencies)
+        self.output = output
+
+
+class SectionGraph:
+    """
+    Graph of summary sections and the intermediate results they depend on.
+
+    Nodes run on a thread pool as soon as their dependencies are finished, so
+    independent sections are computed concurrently. Output nodes are yielded
+    in the order they were added, each as soon as it and all output nodes
+    before it are finished. The wall-clock time of every node is recorded in
+    timings.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        """
+        Initialize an empty graph.
+
+        Args:
+            max_workers: Maximum number of nodes running at the same time
+        """
+        self.max_workers = max_workers
+        self.nodes: Dict[str, SectionNode] = {}
+        self.timings: Dict[str, float] = {}
+
+    def add(self, name: str, run: Callable[[Dict[str, Any]], Any],
+            dependencies: Sequence[str] = (), output: bool = True) -> None:
+        """
+        Add a node to the graph.
+
+        Args:
+            name: Unique node name
+            run: Function computing the node from the results of its dependencies
+            dependencies: Names of nodes that must finish first, already added
+            output: Whether the result is a section to yield (None results are skipped)
+
+        Raises:
+            ValueError: If the name is taken or a dependency is unknown
+        """
+        if name in self.nodes:
+            raise ValueError(f"Duplicate section node: {name}")
+
+        missing = [dependency for dependency in dependencies if dependency not in self.nodes]
+        if missing:
+            raise ValueError(f"Unknown dependencies of section node {name}: {missing}")
+
+        self.nodes[name] = SectionNode(name, run, dependencies, output)
+
+    def execute(self) -> Iterator[Tuple[str, Any]]:
+        """
+        Run all nodes and yield the output sections in order.
+
+        Yields:
+            (node name, section) pairs of the output nodes
+
+        Raises:
+            Exception: The first error raised by a node; pending nodes are cancelled
+        """
+        results: Dict[str, Any] = {}
+        running: Dict[Future, str] = {}
+        pending = list(self.nodes)
+        outputs = [name for name, node in self.nodes.items() if node.output]
+        next_output = 0
+        self.timings.clear()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="section") as executor:
+            try:
+                while pending or running:
+                    for name in [name for name in pending if self._ready(name, results)]:
+                        pending.remove(name)
+                        inputs = {dependency: results[dependency] for dependency in self.nodes[name].dependencies}
+                        running[executor.submit(self._run, name, inputs)] = name
+
+                    done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = running.pop(future)
+                        results[name] = future.result()
+
+                    while next_output < len(outputs) and outputs[next_output] in results:
+                        name = outputs[next_output]
+                        next_output += 1
+                        if results[name] is not None:
+                            yield name, results[name]
+            finally:
+                for future in running:
+                    future.cancel()
+
+    def _ready(self, name: str, results: Dict[str, Any]) -> bool:
+        """
+        Check whether all dependencies of a node are finished.
+
+        Args:
+            name: Node name
+            results: Results of the finished nodes
+
+        Returns:
+            True if the node can run
+        """
+        return all(dependency in results for dependency in self.nodes[name].dependencies)
+
+    def _run(self, name: str, inputs: Dict[str, Any]) -> Any:
+        """
+        Run a node and record its timing.
+
+        Args:
+            name: Node name
+            inputs: Results of the node's dependencies
+
+        Returns:
+            Result of the node
+        """
+        start = time.perf_counter()
+        result = self.nodes[name].run(inputs)
+        self.timings[name] = time.perf_counter() - start
+
+        logger.debug(f"Section node {name} finished in {self.timings[name]:.3f}s")
+        return result
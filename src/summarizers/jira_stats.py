@@ -0,0 +1,411 @@
+"""
+Columnar statistics over large sets of Jira issues.
+"""
+
+import datetime
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400.0
+SECONDS_PER_WEEK = 7 * SECONDS_PER_DAY
+
+# 1970-01-05, the first Monday after the epoch
+FIRST_MONDAY = 4 * SECONDS_PER_DAY
+
+# Rank of priority names, lower is more urgent
+PRIORITY_RANKS = {
+    "Blocker": 0,
+    "Highest": 0,
+    "Critical": 1,
+    "High": 2,
+    "Medium": 3,
+    "Low": 4,
+    "Lowest": 5,
+}
+DEFAULT_PRIORITY_RANK = 3
+
+NONE_LABEL = "None"
+
+
+def parse_timestamp(value: Optional[str]) -> float:
+    """
+    Parse a Jira timestamp into seconds since the epoch.
+
+    Args:
+        value: ISO 8601 timestamp, e.g. "2023-01-05T10:00:00.000Z" or
+            "2023-01-05T10:00:00.000+0000"
+
+    Returns:
+        Seconds since the epoch, NaN if the value is missing or invalid
+    """
+    if not value:
+        return float("nan")
+
+    text = value.strip()
+    if text.endswith("Z"):
+        text = text[:-1] + "+00:00"
+    elif len(text) > 5 and text[-5] in "+-" and text[-4:].isdigit():
+        text = f"{text[:-2]}:{text[-2:]}"
+
+    try:
+        parsed = datetime.datetime.fromisoformat(text)
+    except ValueError:
+        return float("nan")
+
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.timestamp()
+
+
+def distribution(values: np.ndarray, percentiles: Tuple[int, ...] = (50, 75, 90, 95)) -> Dict[str, float]:
+    """
+    Summarize the distribution of the finite values of an array.
+
+    Args:
+        values: Values, NaN entries are ignored
+        percentiles: Percentiles to compute
+
+    Returns:
+        Dictionary with "count", "mean", "max" and "p<N>" entries, empty if
+        there is no finite value
+    """
+    values = values[np.isfinite(values)]
+    if not values.size:
+        return {}
+
+    result = {"count": float(values.size), "mean": float(values.mean()), "max": float(values.max())}
+    for percentile, value in zip(percentiles, np.percentile(values, percentiles)):
+        result[f"p{percentile}"] = float(value)
+    return result
+
+
+def _name(value: Any) -> str:
+    """
+    Get the display name of an issue field.
+
+    Args:
+        value: Field value, either a dict with a name or key, a string or None
+
+    Returns:
+        Name of the value, NONE_LABEL if missing
+    """
+    if isinstance(value, dict):
+        return value.get("name") or value.get("key") or NONE_LABEL
+    return str(value) if value else NONE_LABEL
+
+
+class IssueColumns:
+    """
+    Compact columnar view of a list of issues.
+
+    Categorical fields are stored as int32 codes into per-field vocabularies
+    and timestamps as float64 seconds, so aggregates can be computed with
+    vectorized NumPy operations instead of per-issue Python loops.
+    """
+
+    CATEGORICAL = ("issue_type", "status", "priority", "assignee", "epic")
+
+    def __init__(self, keys: List[str], titles: List[str], codes: Dict[str, np.ndarray],
+                 vocabularies: Dict[str, List[str]], created: np.ndarray, resolved: np.ndarray):
+        """
+        Initialize the columns.
+
+        Args:
+            keys: Issue keys
+            titles: Issue summaries
+            codes: Integer codes of each categorical field
+            vocabularies: Names for the codes of each categorical field
+            created: Creation time in seconds since the epoch
+            resolved: Resolution time in seconds since the epoch, NaN if unresolved
+        """
+        self.keys = keys
+        self.titles = titles
+        self.codes = codes
+        self.vocabularies = vocabularies
+        self.created = created
+        self.resolved = resolved
+
+    @classmethod
+    def from_tasks(cls, tasks: List[Dict[str, Any]]) -> "IssueColumns":
+        """
+        Build the columns from issue dictionaries in a single pass.
+
+        Args:
+            tasks: Issues as returned by JiraClient.get_project_issues
+
+        Returns:
+            Columnar view of the issues
+        """
+        lookups: Dict[str, Dict[str, int]] = {field: {} for field in cls.CATEGORICAL}
+        codes: Dict[str, List[int]] = {field: [] for field in cls.CATEGORICAL}
+        keys, titles, created, resolved = [], [], [], []
+
+        for task in tasks:
+            keys.append(task.get("key", ""))
+            titles.append(task.get("summary", "Untitled Task"))
+            created.append(parse_timestamp(task.get("created")))
+            resolved.append(parse_timestamp(task.get("resolved")))
+
+            for field in cls.CATEGORICAL:
+                lookup = lookups[field]
+                name = _name(task.get(field))
+                codes[field].append(lookup.setdefault(name, len(lookup)))
+
+        return cls(
+            keys,
+            titles,
+            {field: np.array(values, dtype=np.int32) for field, values in codes.items()},
+            {field: list(lookup) for field, lookup in lookups.items()},
+            np.array(created, dtype=np.float64),
+            np.array(resolved, dtype=np.float64)
+        )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def counts(self, field: str) -> List[Tuple[str, int]]:
+        """
+        Count issues per value of a categorical field.
+
+        Args:
+            field: Field name, one of CATEGORICAL
+
+        Returns:
+            (value, count) pairs sorted by descending count
+        """
+        counts = np.bincount(self.codes[field], minlength=len(self.vocabularies[field]))
+        order = np.argsort(-counts, kind="stable")
+        return [(self.vocabularies[field][i], int(counts[i])) for i in order if counts[i]]
+
+    def lead_times(self) -> np.ndarray:
+        """
+        Get the lead time of every issue.
+
+        Returns:
+            Days from creation to resolution, NaN for unresolved issues
+        """
+        return (self.resolved - self.created) / SECONDS_PER_DAY
+
+    def lead_time_distribution(self, percentiles: Tuple[int, ...] = (50, 75, 90, 95)) -> Dict[str, float]:
+        """
+        Summarize the distribution of lead times of resolved issues.
+
+        Args:
+            percentiles: Percentiles to compute
+
+        Returns:
+            Dictionary with "count", "mean", "max" and "p<N>" entries in days,
+            empty if no issue is resolved
+        """
+        return distribution(self.lead_times(), percentiles)
+
+    def top_epics(self, limit: int = 5) -> List[Tuple[str, int, float]]:
+        """
+        Get the epics with the most issues.
+
+        Args:
+            limit: Maximum number of epics
+
+        Returns:
+            (epic, issue count, median lead time in days or NaN) tuples
+        """
+        epic_codes = self.codes["epic"]
+        vocabulary = self.vocabularies["epic"]
+        counts = np.bincount(epic_codes, minlength=len(vocabulary))
+        if NONE_LABEL in vocabulary:
+            counts[vocabulary.index(NONE_LABEL)] = 0
+
+        lead_times = self.lead_times()
+        top = []
+        for code in np.argsort(-counts, kind="stable")[:limit]:
+            if not counts[code]:
+                break
+            epic_lead_times = lead_times[(epic_codes == code) & np.isfinite(lead_times)]
+            median = float(np.median(epic_lead_times)) if epic_lead_times.size else float("nan")
+            top.append((vocabulary[code], int(counts[code]), median))
+        return top
+
+    def notable(self, limit: int = 20) -> List[int]:
+        """
+        Select the issues worth listing individually.
+
+        Issues are ranked by priority first and by lead time second, so the
+        most urgent and the longest-running issues are selected.
+
+        Args:
+            limit: Maximum number of issues
+
+        Returns:
+            Indices of the selected issues, most notable first
+        """
+        if not len(self):
+            return []
+
+        ranks = np.array(
+            [PRIORITY_RANKS.get(name, DEFAULT_PRIORITY_RANK) for name in self.vocabularies["priority"]],
+            dtype=np.int32
+        )[self.codes["priority"]]
+        lead_times = np.nan_to_num(self.lead_times(), nan=0.0)
+
+        # lexsort sorts by the last key first
+        order = np.lexsort((-lead_times, ranks))
+        return [int(i) for i in order[:limit]]
+
+
+class FlowMetrics:
+    """
+    Delivery flow metrics of a set of issues.
+
+    The status changes of all issues are flattened into parallel arrays of
+    issue index, time and status codes, sorted once by issue and time. Time in
+    status, cycle times and weekly throughput are then computed with
+    vectorized operations over all issues at once.
+    """
+
+    def __init__(self, created: np.ndarray, resolved: np.ndarray, issues: np.ndarray, times: np.ndarray,
+                 from_codes: np.ndarray, to_codes: np.ndarray, statuses: List[str]):
+        """
+        Initialize the metrics.
+
+        Args:
+            created: Creation time of each issue in seconds since the epoch
+            resolved: Resolution time of each issue, NaN if unresolved
+            issues: Issue index of each status change
+            times: Time of each status change
+            from_codes: Code of the status left by each change
+            to_codes: Code of the status entered by each change
+            statuses: Names for the status codes
+        """
+        order = np.lexsort((times, issues))
+        self.created = created
+        self.resolved = resolved
+        self.issues = issues[order]
+        self.times = times[order]
+        self.from_codes = from_codes[order]
+        self.to_codes = to_codes[order]
+        self.statuses = statuses
+
+        # First change of each issue
+        self.first = np.ones(self.issues.size, dtype=bool)
+        self.first[1:] = self.issues[1:] != self.issues[:-1]
+
+    @classmethod
+    def from_tasks(cls, tasks: List[Dict[str, Any]]) -> "FlowMetrics":
+        """
+        Build the metrics from issue dictionaries in a single pass.
+
+        Args:
+            tasks: Issues as returned by JiraClient.get_project_issues, with their
+                status changes under "status_changes"
+
+        Returns:
+            Flow metrics of the issues
+        """
+        lookup: Dict[str, int] = {}
+        created, resolved = [], []
+        issues, times, from_codes, to_codes = [], [], [], []
+
+        for index, task in enumerate(tasks):
+            created.append(parse_timestamp(task.get("created")))
+            resolved.append(parse_timestamp(task.get("resolved")))
+
+            for change in task.get("status_changes") or []:
+                issues.append(index)
+                times.append(parse_timestamp(change.get("at")))
+                from_codes.append(lookup.setdefault(change.get("from") or NONE_LABEL, len(lookup)))
+                to_codes.append(lookup.setdefault(change.get("to") or NONE_LABEL, len(lookup)))
+
+        return cls(
+            np.array(created, dtype=np.float64),
+            np.array(resolved, dtype=np.float64),
+            np.array(issues, dtype=np.int32),
+            np.array(times, dtype=np.float64),
+            np.array(from_codes, dtype=np.int32),
+            np.array(to_codes, dtype=np.int32),
+            list(lookup)
+        )
+
+    def has_changes(self) -> bool:
+        """
+        Check whether any status change is known.
+
+        Returns:
+            True if at least one issue has status changes
+        """
+        return bool(self.issues.size)
+
+    def cycle_times(self) -> np.ndarray:
+        """
+        Get the cycle time of every issue.
+
+        Work is considered started at the first status change of an issue,
+        i.e. when it leaves its initial status.
+
+        Returns:
+            Days from the first status change to resolution, NaN for unresolved
+            issues and issues without status changes
+        """
+        started = np.full(self.created.size, np.nan)
+        started[self.issues[self.first]] = self.times[self.first]
+        return (self.resolved - started) / SECONDS_PER_DAY
+
+    def time_in_status(self) -> List[Tuple[str, int, float, float]]:
+        """
+        Aggregate the time spent in each status before leaving it.
+
+        The time spent in a status is the time between entering it, or the
+        creation of the issue for the initial status, and the next change.
+
+        Returns:
+            (status, number of stays, median days, total days) tuples sorted by
+            descending total
+        """
+        if not self.issues.size:
+            return []
+
+        entered = np.empty_like(self.times)
+        entered[1:] = self.times[:-1]
+        entered[self.first] = self.created[self.issues[self.first]]
+        durations = (self.times - entered) / SECONDS_PER_DAY
+
+        valid = np.isfinite(durations) & (durations >= 0)
+        codes = self.from_codes[valid]
+        durations = durations[valid]
+
+        # Group the durations by status to take the medians
+        order = np.lexsort((durations, codes))
+        codes, durations = codes[order], durations[order]
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if codes.size else np.array([], dtype=int)
+        ends = np.r_[starts[1:], codes.size]
+        totals = np.add.reduceat(durations, starts) if codes.size else np.array([])
+
+        rows = [
+            (self.statuses[codes[start]], int(end - start), float(np.median(durations[start:end])), float(total))
+            for start, end, total in zip(starts, ends, totals)
+        ]
+        rows.sort(key=lambda row: -row[3])
+        return rows
+
+    def weekly_throughput(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Count the issues resolved in each week.
+
+        Weeks start on Monday (UTC) and span the first to the last resolution,
+        including weeks without any.
+
+        Returns:
+            Start of each week in seconds since the epoch and the number of
+            issues resolved in it
+        """
+        resolved = self.resolved[np.isfinite(self.resolved)]
+        if not resolved.size:
+            return np.array([]), np.array([], dtype=np.int64)
+
+        weeks = np.floor((resolved - FIRST_MONDAY) / SECONDS_PER_WEEK).astype(np.int64)
+        first = weeks.min()
+        counts = np.bincount(weeks - first)
+        return FIRST_MONDAY + (first + np.arange(counts.size)) * SECONDS_PER_WEEK, counts
@@ -2,19 +2,58 @@
 Summarizer for project documentation using LLM.
 """
 
+import hashlib
 import logging
+import math
 import os
 import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterator, Optional
+
+from src.summarizers.backends import create_backend
+from src.summarizers.base import BaseSummarizer
+from src.summarizers.clustering import cluster_texts
+from src.summarizers.dag import SectionGraph
+from src.summarizers.jira_stats import FlowMetrics, IssueColumns, distribution
+from src.summarizers.retrieval import BM25Index
+from src.summarizers.batching import PromptBatcher, estimate_tokens
+from src.summarizers.scheduler import get_shared_scheduler
+from src.summarizers.tree import SummaryNode, SummaryTree
 
 logger = logging.getLogger(__name__)
 
+# Prompts for the nodes of the summary tree
+CHUNK_PROMPT = (
+    "Summarize the following excerpt of a project document. "
+    "Keep goals, decisions, results and open issues.\n\n{text}"
+)
+CHUNK_BATCH_INSTRUCTION = (
+    "The items below are short project documents or excerpts of documents. "
+    "Keep goals, decisions, results and open issues."
+)
+THEME_PROMPT = (
+    "The following Jira issues are representative of one theme of the project's work. "
+    "Describe the theme in two or three sentences.\n\n{text}"
+)
+THEME_BATCH_INSTRUCTION = (
+    "Each item below lists Jira issues representative of one theme of the project's work. "
+    "Describe each theme in two or three sentences."
+)
+TOPIC_PROMPT = (
+    "Write the \"{title}\" section of a project summary using only the passages below. "
+    "Be concise and do not invent information.\n\n{text}"
+)
+COMBINE_PROMPT = (
+    "Combine the following summaries of {kind} into a single concise summary "
+    "without repeating information.\n\n{text}"
+)
+
 # Add mock classes for testing
 class ChatOpenAI:
-    def __init__(self, temperature=0, model_name="gpt-4", max_tokens=None):
+    def __init__(self, temperature=0, model_name="gpt-4", max_tokens=None, max_retries=2):
         self.temperature = temperature
         self.model_name = model_name
         self.max_tokens = max_tokens
+        self.max_retries = max_retries
 
 class LLMChain:
     def __init__(self, llm, prompt):
@@ -28,7 +67,7 @@ def load_summarize_chain(*args, **kwargs):
     return LLMChain(None, None)
 
 
-class LLMSummarizer:
+class LLMSummarizer(BaseSummarizer):
     """
     Summarizer for project documentation using an LLM.
     Uses OpenAI's GPT models via LangChain to generate comprehensive summaries.
@@ -51,9 +90,51 @@ class LLMSummarizer:
         self.chunk_size = config.get("chunk_size", 4000)
         self.chunk_overlap = config.get("chunk_overlap", 200)
         
-        # Just for testing - we're mocking the actual LLM implementation
-        self.llm = None if not self.api_key else "mock_llm"
-        self.chain = None
+        self.tree_cache_dir = config.get("tree_cache_dir")
+        self.batch_token_budget = config.get("batch_token_budget", 3000)
+        self.batch_max_items = config.get("batch_max_items", 20)
+        
+        self.jira_summary_mode = config.get("jira_summary_mode", "auto")
+        self.jira_digest_threshold = config.get("jira_digest_threshold", 100)
+        self.jira_digest_rows = config.get("jira_digest_rows", 10)
+        self.jira_notable_issues = config.get("jira_notable_issues", 20)
+        self.jira_theme_count = config.get("jira_theme_count", 0)
+        self.jira_theme_representatives = config.get("jira_theme_representatives", 3)
+        self.jira_flow_weeks = config.get("jira_flow_weeks", 8)
+        
+        self.topic_sections: Dict[str, str] = config.get("topic_sections") or {}
+        self.retrieval_top_k = config.get("retrieval_top_k", 5)
+        self.index_dir = config.get("index_dir")
+        
+        # Independent sections are summarized concurrently
+        self.section_workers = config.get("section_workers", 4)
+        self.section_timings: Dict[str, float] = {}
+        
+        # Rate limits are shared by all summarizers in the process
+        self.scheduler = get_shared_scheduler(config.get("rate_limits", {}))
+        
+        # Just for testing - we're mocking the actual LLM implementation.
+        # Failed calls are retried by the scheduler, not by the client
+        self.llm = None if not self.api_key else ChatOpenAI(
+            temperature=self.temperature,
+            model_name=self.model_name,
+            max_tokens=self.max_tokens,
+            max_retries=0
+        )
+        self.chain = LLMChain(llm=self.llm, prompt=None) if self.llm else None
+        
+        # Backend running the prompts: the chain, a recording of it or a replay
+        self.backend = create_backend(config, self.chain)
+        
+        # Memoized summary tree, replaced by a persistent one per project
+        self.tree = SummaryTree(salt=self.model_name)
+        
+        # Packs small chunks into shared prompts
+        self.batcher = PromptBatcher(
+            self._complete,
+            token_budget=self.batch_token_budget,
+            max_items=self.batch_max_items
+        )
     
     def generate_summary(self, data: Dict[str, Any]) -> str:
         """
@@ -70,40 +151,395 @@ class LLMSummarizer:
             Formatted summary as markdown
         """
         try:
-            if not self.llm:
-                return f"Error: LLM not initialized. Please provide an OpenAI API key.\n\nProject ID: {data.get('project_id', 'Unknown')}"
+            # Combine the sections into a single document
+            return "\n\n".join(self._iter_sections(data))
+            
+        except Exception as e:
+            logger.exception(f"Error generating summary: {e}")
+            return f"Error generating summary: {str(e)}\n\nProject ID: {data.get('project_id', 'Unknown')}"
+    
+    def stream_summary(self, data: Dict[str, Any]) -> Iterator[str]:
+        """
+        Generate the project summary section by section.
+        
+        Each section is yielded as soon as it is finished, so callers can write
+        or publish it before the remaining sections are computed. Joining the
+        yielded sections with blank lines gives the same document as
+        generate_summary.
+        
+        Args:
+            data: Dictionary containing all project data (see generate_summary)
             
-            # Generate date stamp
-            date_stamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        Yields:
+            Finished summary sections as markdown
+        """
+        try:
+            yield from self._iter_sections(data)
             
-            # Extract project ID
-            project_id = data.get("project_id", "Unknown")
+        except Exception as e:
+            logger.exception(f"Error generating summary: {e}")
+            yield f"Error generating summary: {str(e)}\n\nProject ID: {data.get('project_id', 'Unknown')}"
+    
+    def _iter_sections(self, data: Dict[str, Any]) -> Iterator[str]:
+        """
+        Lazily build the summary sections in document order.
+        
+        Args:
+            data: Dictionary containing all project data
             
-            # Start with the header
-            summary = [
-                f"# Project Summary: {project_id}",
-                f"Generated on: {date_stamp}",
-                "\n"
+        Yields:
+            Summary sections as markdown
+        """
+        if not self.backend:
+            yield f"Error: LLM not initialized. Please provide an OpenAI API key.\n\nProject ID: {data.get('project_id', 'Unknown')}"
+            return
+        
+        # Generate date stamp
+        date_stamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        # Extract project ID
+        project_id = data.get("project_id", "Unknown")
+        
+        # Load the summary tree of the project, so unchanged nodes are reused
+        self.tree = self._load_tree(project_id)
+        
+        graph = self._build_section_graph(data, "\n\n".join([
+            f"# Project Summary: {project_id}",
+            f"Generated on: {date_stamp}",
+            "\n"
+        ]))
+        self.section_timings = graph.timings
+        
+        for _, section in graph.execute():
+            yield section
+        
+        logger.info(f"Summary tree: {self.tree.misses} nodes computed, {self.tree.hits} reused")
+        logger.debug("Section timings: " + ", ".join(
+            f"{name} {seconds:.2f}s" for name, seconds in self.section_timings.items()
+        ))
+        self.tree.save()
+    
+    def _build_section_graph(self, data: Dict[str, Any], header: str) -> SectionGraph:
+        """
+        Build the graph of summary sections.
+        
+        The Notion, Drive, Jira and the configured topic sections do not
+        depend on each other and run concurrently. Each source also yields a
+        section node of the summary tree, and the executive summary is
+        combined from those once they are all finished.
+        
+        Args:
+            data: Dictionary containing all project data
+            header: Header section
+            
+        Returns:
+            Graph whose output nodes are the sections in document order
+        """
+        graph = SectionGraph(max_workers=self.section_workers)
+        notion_data = data.get("notion_data")
+        drive_documents = data.get("drive_documents")
+        jira_tasks = data.get("jira_tasks")
+        
+        graph.add("header", lambda _: header)
+        
+        # Add Notion data if available
+        if notion_data:
+            graph.add("notion", lambda _: self._summarize_notion_data(notion_data))
+            notion_contents = [notion_data["content"]] if notion_data.get("content") else []
+            notion_contents += [
+                "\n".join(self._format_record(record) for record in database["records"])
+                for database in notion_data.get("databases") or [] if database.get("records")
             ]
+            if notion_contents:
+                graph.add("notion_node", lambda _: self._section_node(
+                    "notion", self._document_nodes(notion_contents)
+                ), output=False)
+        
+        # Add Google Drive documents if available; the section node reuses the
+        # document nodes computed for the section
+        if drive_documents:
+            graph.add("drive", lambda _: self._summarize_drive_documents(drive_documents))
+            contents = [doc["content"] for doc in drive_documents if doc.get("content")]
+            if contents:
+                graph.add("drive_node", lambda _: self._section_node("drive", self._document_nodes(contents)),
+                          dependencies=["drive"], output=False)
+        
+        # Add Jira tasks if available
+        if jira_tasks:
+            graph.add("jira", lambda _: self._summarize_jira_tasks(jira_tasks))
+            graph.add("jira_node", lambda results: self._section_node("jira", [
+                self._document_node(results["jira"])
+            ]), dependencies=["jira"], output=False)
+        
+        # Add the sections built from retrieved passages, if any are configured
+        if self.topic_sections:
+            graph.add("index", lambda _: self._load_index(data), output=False)
+        for title, query in self.topic_sections.items():
+            graph.add(
+                f"topic:{title}",
+                lambda results, title=title, query=query: (
+                    self._summarize_topic(results["index"], title, query) if len(results["index"]) else None
+                ),
+                dependencies=["index"]
+            )
+        
+        # Finish with the project overview at the root of the tree
+        section_names = [name for name in ("notion_node", "drive_node", "jira_node") if name in graph.nodes]
+        if section_names:
+            graph.add("overview", lambda results: "\n\n".join([
+                "# Executive Summary",
+                self.tree.node(
+                    "project", [results[name] for name in section_names],
+                    lambda summaries: self._combine("the project", summaries)
+                ).summary
+            ]), dependencies=section_names)
+        
+        return graph
+    
+    def _load_tree(self, project_id: str) -> SummaryTree:
+        """
+        Load the persistent summary tree of a project.
+        
+        Args:
+            project_id: Project ID
             
-            # Add Notion data if available
-            if data.get("notion_data"):
-                summary.append(self._summarize_notion_data(data["notion_data"]))
+        Returns:
+            Summary tree, kept in memory only if no cache directory is configured
+        """
+        path = None
+        if self.tree_cache_dir:
+            path = os.path.join(self.tree_cache_dir, f"{project_id}.json")
+        return SummaryTree(path, salt=self.model_name)
+    
+    def _build_passages(self, data: Dict[str, Any]) -> List[Dict[str, str]]:
+        """
+        Split all collected project content into passages for retrieval.
+        
+        Args:
+            data: Dictionary containing all project data
             
-            # Add Google Drive documents if available
-            if data.get("drive_documents"):
-                summary.append(self._summarize_drive_documents(data["drive_documents"]))
+        Returns:
+            Passages with source, title, url and text
+        """
+        passages = []
+        notion_data = data.get("notion_data") or {}
+        
+        if notion_data.get("content"):
+            for chunk in self._split_text(notion_data["content"]):
+                passages.append({"source": "Notion", "title": notion_data.get("title", "Untitled Project"),
+                                 "url": notion_data.get("url", ""), "text": chunk})
+        
+        for database in notion_data.get("databases") or []:
+            for record in database.get("records") or []:
+                passages.append({"source": "Notion", "title": database.get("title", "Untitled Database"),
+                                 "url": record.get("url", ""), "text": self._format_record(record)[2:]})
+        
+        for doc in data.get("drive_documents") or []:
+            for chunk in self._split_text(doc.get("content") or ""):
+                if chunk:
+                    passages.append({"source": "Google Drive", "title": doc.get("name", "Untitled Document"),
+                                     "url": doc.get("url", ""), "text": chunk})
+        
+        for task in data.get("jira_tasks") or []:
+            comments = "\n".join(comment.get("body") or "" for comment in task.get("comments") or [])
+            text = f"{task.get('summary', '')}\n{task.get('description') or ''}\n{comments}".strip()
+            if text:
+                passages.append({"source": "Jira", "title": task.get("key", ""), "url": "", "text": text})
+        
+        return passages
+    
+    def _load_index(self, data: Dict[str, Any]) -> BM25Index:
+        """
+        Get the retrieval index of the project content.
+        
+        The index is persisted per project under index_dir and reused as long
+        as the indexed passages are unchanged.
+        
+        Args:
+            data: Dictionary containing all project data
             
-            # Add Jira tasks if available
-            if data.get("jira_tasks"):
-                summary.append(self._summarize_jira_tasks(data["jira_tasks"]))
+        Returns:
+            BM25 index over all passages
+        """
+        passages = self._build_passages(data)
+        
+        digest = hashlib.sha256()
+        for passage in passages:
+            digest.update(passage["title"].encode("utf-8"))
+            digest.update(passage["text"].encode("utf-8"))
+            digest.update(b"\0")
+        fingerprint = digest.hexdigest()
+        
+        path = None
+        if self.index_dir:
+            path = os.path.join(self.index_dir, f"{data.get('project_id', 'Unknown')}.json.gz")
+            if os.path.exists(path):
+                try:
+                    index = BM25Index.load(path)
+                    if index.fingerprint == fingerprint:
+                        return index
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Could not load retrieval index from {path}: {e}")
+        
+        index = BM25Index(fingerprint=fingerprint)
+        for passage in passages:
+            index.add(passage)
+        
+        if path:
+            try:
+                index.save(path)
+            except OSError as e:
+                logger.warning(f"Could not save retrieval index to {path}: {e}")
+        
+        return index
+    
+    def _summarize_topic(self, index: BM25Index, title: str, query: str) -> Optional[str]:
+        """
+        Write a summary section from the passages retrieved for its query.
+        
+        Args:
+            index: Retrieval index of the project content
+            title: Section title
+            query: Retrieval query of the section
             
-            # Return the combined summary
-            return "\n\n".join(summary)
+        Returns:
+            Formatted summary section, None if no passage matches
+        """
+        results = index.search(query, self.retrieval_top_k)
+        if not results:
+            return None
+        
+        passages = "\n\n".join(
+            f"[{passage['source']}: {passage['title']}]\n{passage['text']}" for _, passage in results
+        )
+        node = self.tree.leaf(
+            "topic", f"{title}\n{passages}",
+            lambda text: self._complete(TOPIC_PROMPT.format(title=title, text=passages))
+        )
+        
+        summary = [f"# {title}", "", node.summary, "", "Sources:"]
+        sources = []
+        for _, passage in results:
+            source = f"- {passage['source']}: {passage['title']}"
+            if passage.get("url"):
+                source += f" ({passage['url']})"
+            if source not in sources:
+                sources.append(source)
+        summary.extend(sources)
+        
+        return "\n".join(summary)
+    
+    def _complete(self, prompt: str) -> str:
+        """
+        Run a prompt through the LLM within the provider rate limits.
+        
+        Args:
+            prompt: Prompt text
             
-        except Exception as e:
-            logger.exception(f"Error generating summary: {e}")
-            return f"Error generating summary: {str(e)}\n\nProject ID: {data.get('project_id', 'Unknown')}"
+        Returns:
+            LLM response
+        """
+        return self.scheduler.call(lambda: self.backend.complete(prompt), estimate_tokens(prompt) + self.max_tokens)
+    
+    def _combine(self, kind: str, summaries: List[str]) -> str:
+        """
+        Combine several summaries into one with the LLM.
+        
+        Args:
+            kind: Description of what the summaries cover
+            summaries: Summaries to combine
+            
+        Returns:
+            Combined summary
+        """
+        return self._complete(COMBINE_PROMPT.format(kind=kind, text="\n\n".join(summaries)))
+    
+    def _split_text(self, text: str) -> List[str]:
+        """
+        Split text into overlapping chunks of at most chunk_size characters.
+        
+        Args:
+            text: Text to split
+            
+        Returns:
+            List of chunks
+        """
+        if len(text) <= self.chunk_size:
+            return [text]
+        
+        step = max(self.chunk_size - self.chunk_overlap, 1)
+        return [text[start:start + self.chunk_size] for start in range(0, len(text) - self.chunk_overlap, step)]
+    
+    def _document_node(self, content: str) -> SummaryNode:
+        """
+        Get the summary tree node of a document from its chunks.
+        
+        Args:
+            content: Document text
+            
+        Returns:
+            Document node
+        """
+        return self._document_nodes([content])[0]
+    
+    def _document_nodes(self, contents: List[str]) -> List[SummaryNode]:
+        """
+        Get the summary tree nodes of several documents.
+        
+        The chunks of all documents that are not in the tree yet are summarized
+        together, so small documents share LLM calls.
+        
+        Args:
+            contents: Document texts
+            
+        Returns:
+            Document nodes, in the order of the contents
+        """
+        chunks_per_document = [self._split_text(content) for content in contents]
+        leaves = self.tree.leaves(
+            "chunk",
+            [chunk for chunks in chunks_per_document for chunk in chunks],
+            self._summarize_chunks
+        )
+        
+        nodes = []
+        for chunks in chunks_per_document:
+            children, leaves = leaves[:len(chunks)], leaves[len(chunks):]
+            nodes.append(self.tree.node(
+                "document", children,
+                lambda summaries: self._combine("parts of a document", summaries)
+            ))
+        return nodes
+    
+    def _summarize_chunks(self, chunks: List[str]) -> List[str]:
+        """
+        Summarize chunks, packing small ones into batched prompts.
+        
+        Args:
+            chunks: Chunk texts
+            
+        Returns:
+            Summaries, in the order of the chunks
+        """
+        items = [(str(index + 1), chunk) for index, chunk in enumerate(chunks)]
+        results = self.batcher.summarize(items, CHUNK_BATCH_INSTRUCTION, CHUNK_PROMPT)
+        return [results[item_id] for item_id, _ in items]
+    
+    def _section_node(self, source: str, documents: List[SummaryNode]) -> SummaryNode:
+        """
+        Get the summary tree node of a source section from its documents.
+        
+        Args:
+            source: Name of the source (notion, drive, jira)
+            documents: Document nodes of the source
+            
+        Returns:
+            Section node
+        """
+        return self.tree.node(
+            f"section:{source}", documents,
+            lambda summaries: self._combine(f"the project's {source} content", summaries)
+        )
     
     def _summarize_notion_data(self, notion_data: Dict[str, Any]) -> str:
         """
@@ -125,8 +561,27 @@ class LLMSummarizer:
         if notion_data.get("content"):
             summary.append(notion_data["content"])
         
+        # Rows of linked databases, e.g. meeting notes and decisions
+        for database in notion_data.get("databases") or []:
+            if database.get("records"):
+                summary.append(f"### {database.get('title', 'Untitled Database')}")
+                summary.append("\n".join(self._format_record(record) for record in database["records"]))
+        
         return "\n\n".join(summary)
     
+    def _format_record(self, record: Dict[str, Any]) -> str:
+        """
+        Format a Notion database record as a list item.
+        
+        Args:
+            record: Compact record with "title" and "properties"
+            
+        Returns:
+            Markdown list item
+        """
+        properties = ", ".join(f"{name}: {value}" for name, value in record.get("properties", {}).items())
+        return f"- {record.get('title', 'Untitled')}" + (f" ({properties})" if properties else "")
+    
     def _summarize_drive_documents(self, documents: List[Dict[str, Any]]) -> str:
         """
         Summarize the Google Drive documents.
@@ -141,6 +596,8 @@ class LLMSummarizer:
             return "# Project Documents\n\nNo documents found."
         
         summary = ["# Project Documents"]
+        contents = [doc["content"] for doc in documents if doc.get("content")]
+        document_summaries = dict(zip(contents, (node.summary for node in self._document_nodes(contents))))
         
         for doc in documents:
             doc_name = doc.get("name", "Untitled Document")
@@ -155,7 +612,7 @@ class LLMSummarizer:
             
             if doc_content:
                 summary.append("\n**Content Summary:**")
-                summary.append(doc_content[:500] + "..." if len(doc_content) > 500 else doc_content)
+                summary.append(document_summaries[doc_content])
             
             summary.append("")  # Empty line
         
@@ -174,6 +631,14 @@ class LLMSummarizer:
         if not tasks:
             return "# Project Tasks\n\nNo tasks found."
         
+        if self.jira_summary_mode == "themes":
+            return self._summarize_jira_themes(tasks)
+        
+        if self.jira_summary_mode == "digest" or (
+            self.jira_summary_mode == "auto" and len(tasks) > self.jira_digest_threshold
+        ):
+            return self._summarize_jira_digest(tasks)
+        
         # Group tasks by type
         tasks_by_type = {}
         for task in tasks:
@@ -196,4 +661,174 @@ class LLMSummarizer:
             
             summary.append("")  # Empty line
         
-        return "\n".join(summary)
\ No newline at end of file
+        return "\n".join(summary)
+    
+    def _summarize_jira_digest(self, tasks: List[Dict[str, Any]]) -> str:
+        """
+        Summarize a large number of Jira tasks as aggregated statistics.
+        
+        The digest has a bounded size regardless of the number of tasks: counts
+        per type, status, priority and assignee, the lead time distribution,
+        the top epics and only the most notable individual issues.
+        
+        Args:
+            tasks: List of Jira task data
+            
+        Returns:
+            Formatted summary section
+        """
+        columns = IssueColumns.from_tasks(tasks)
+        summary = ["# Project Tasks", "", f"{len(columns)} issues in total.", ""]
+        
+        for field, title in [("issue_type", "By Type"), ("status", "By Status"),
+                             ("priority", "By Priority"), ("assignee", "By Assignee")]:
+            counts = columns.counts(field)
+            summary.append(f"## {title}")
+            for name, count in counts[:self.jira_digest_rows]:
+                summary.append(f"- {name}: {count} ({100.0 * count / len(columns):.0f}%)")
+            if len(counts) > self.jira_digest_rows:
+                summary.append(f"- ... and {len(counts) - self.jira_digest_rows} more")
+            summary.append("")  # Empty line
+        
+        lead_times = columns.lead_time_distribution()
+        if lead_times:
+            summary.append("## Lead Time")
+            summary.append(f"- Resolved issues: {int(lead_times['count'])}")
+            summary.append(f"- Mean: {lead_times['mean']:.1f} days, maximum: {lead_times['max']:.1f} days")
+            summary.append(
+                f"- Median: {lead_times['p50']:.1f} days, p75: {lead_times['p75']:.1f} days, "
+                f"p90: {lead_times['p90']:.1f} days, p95: {lead_times['p95']:.1f} days"
+            )
+            summary.append("")  # Empty line
+        
+        epics = columns.top_epics()
+        if epics:
+            summary.append("## Top Epics")
+            for epic, count, median in epics:
+                lead_time = f", median lead time {median:.1f} days" if not math.isnan(median) else ""
+                summary.append(f"- {epic}: {count} issues{lead_time}")
+            summary.append("")  # Empty line
+        
+        summary.extend(self._summarize_jira_flow(tasks))
+        
+        summary.append("## Notable Issues")
+        lead_times = columns.lead_times()
+        for index in columns.notable(self.jira_notable_issues):
+            status = columns.vocabularies["status"][columns.codes["status"][index]]
+            priority = columns.vocabularies["priority"][columns.codes["priority"][index]]
+            lead_time = f", lead time {lead_times[index]:.1f} days" if not math.isnan(lead_times[index]) else ""
+            summary.append(
+                f"- [{columns.keys[index]}] {columns.titles[index]} "
+                f"(Status: {status}, Priority: {priority}{lead_time})"
+            )
+        summary.append("")  # Empty line
+        
+        return "\n".join(summary)
+    
+    def _summarize_jira_themes(self, tasks: List[Dict[str, Any]]) -> str:
+        """
+        Summarize Jira tasks grouped into thematic clusters.
+        
+        Tasks are clustered locally on their summary and description. Only a
+        few representative tasks per theme are sent to the LLM, so the token
+        volume grows with the number of themes rather than the number of tasks.
+        
+        Args:
+            tasks: List of Jira task data
+            
+        Returns:
+            Formatted summary section
+        """
+        texts = [f"{task.get('summary', '')}\n{task.get('description') or ''}" for task in tasks]
+        themes = cluster_texts(
+            texts,
+            n_clusters=self.jira_theme_count,
+            n_representatives=self.jira_theme_representatives
+        )
+        
+        representative_texts = [
+            "\n".join(
+                f"[{tasks[index].get('key', '')}] {texts[index][:500]}" for index in theme.representatives
+            )
+            for theme in themes
+        ]
+        descriptions = self.tree.leaves("theme", representative_texts, self._describe_themes)
+        
+        summary = ["# Project Tasks", "", f"{len(tasks)} issues grouped into {len(themes)} themes.", ""]
+        
+        for theme, description in zip(themes, descriptions):
+            label = ", ".join(theme.terms) or "Other"
+            summary.append(f"## Theme: {label} ({len(theme.members)} issues)")
+            summary.append(description.summary)
+            summary.append("")  # Empty line
+            summary.append("Representative issues:")
+            
+            for index in theme.representatives:
+                key = tasks[index].get("key", "")
+                title = tasks[index].get("summary", "Untitled Task")
+                status = tasks[index].get("status", {}).get("name", "Unknown")
+                summary.append(f"- [{key}] {title} (Status: {status})")
+            
+            summary.append("")  # Empty line
+        
+        return "\n".join(summary)
+    
+    def _summarize_jira_flow(self, tasks: List[Dict[str, Any]]) -> List[str]:
+        """
+        Summarize the delivery flow of the Jira tasks for the digest.
+        
+        Cycle time, weekly throughput and time in status are computed over
+        all tasks at once from their status changes and resolution dates.
+        
+        Args:
+            tasks: List of Jira task data
+            
+        Returns:
+            Lines of the flow section, empty if the tasks have no flow data
+        """
+        metrics = FlowMetrics.from_tasks(tasks)
+        week_starts, counts = metrics.weekly_throughput()
+        if not counts.size and not metrics.has_changes():
+            return []
+        
+        lines = ["## Delivery Flow"]
+        
+        stats = distribution(metrics.cycle_times(), (50, 85))
+        if stats:
+            lines.append(f"- Cycle time: median {stats['p50']:.1f} days, p85 {stats['p85']:.1f} days "
+                         f"({int(stats['count'])} issues)")
+        
+        if counts.size:
+            recent = counts[-self.jira_flow_weeks:]
+            throughput = distribution(counts.astype(float), (50,))
+            lines.append(f"- Throughput: {throughput['mean']:.1f} issues per week over {counts.size} weeks, "
+                         f"median {throughput['p50']:.1f}")
+            weeks = ", ".join(
+                f"{datetime.datetime.fromtimestamp(start, datetime.timezone.utc):%Y-%m-%d}: {count}"
+                for start, count in zip(week_starts[-self.jira_flow_weeks:], recent)
+            )
+            lines.append(f"- Recent weeks: {weeks}")
+        
+        stays = metrics.time_in_status()
+        if stays:
+            lines.append("")  # Empty line
+            lines.append("### Time in Status")
+            for status, count, median, total in stays[:self.jira_digest_rows]:
+                lines.append(f"- {status}: median {median:.1f} days, {total:.1f} days in total over {count} stays")
+        
+        lines.append("")  # Empty line
+        return lines
+    
+    def _describe_themes(self, representative_texts: List[str]) -> List[str]:
+        """
+        Describe themes from their representative issues, batching the prompts.
+        
+        Args:
+            representative_texts: Representative issues of each theme
+            
+        Returns:
+            Theme descriptions, in the order of the inputs
+        """
+        items = [(str(index + 1), text) for index, text in enumerate(representative_texts)]
+        results = self.batcher.summarize(items, THEME_BATCH_INSTRUCTION, THEME_PROMPT)
+        return [results[item_id] for item_id, _ in items]
@@ -0,0 +1,186 @@
+"""
+In-process BM25 retrieval over project content.
+"""
+
+import gzip
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset("""
+    a an and are as at be by for from has have in is it its of on or that the this to was were
+    will with
+""".split())
+
+
+def analyze(text: str) -> List[str]:
+    """
+    Split text into lowercase index terms, dropping stop words.
+
+    Args:
+        text: Text to analyze
+
+    Returns:
+        List of terms
+    """
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class BM25Index:
+    """
+    Inverted index with Okapi BM25 scoring.
+
+    Passages are dictionaries with at least a "text" entry; other entries
+    (source, title, url) are kept as metadata. Postings are frozen into NumPy
+    arrays on the first search, so a query costs one vectorized update per
+    query term.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, fingerprint: str = ""):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalization
+            fingerprint: Identifier of the indexed content, used to decide
+                whether a persisted index can be reused
+        """
+        self.k1 = k1
+        self.b = b
+        self.fingerprint = fingerprint
+        self.passages: List[Dict[str, Any]] = []
+        self.lengths: List[int] = []
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._arrays: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None
+        self._length_array: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.passages)
+
+    def add(self, passage: Dict[str, Any]) -> None:
+        """
+        Add a passage to the index.
+
+        Args:
+            passage: Passage with a "text" entry and optional metadata
+        """
+        index = len(self.passages)
+        terms = Counter(analyze(passage["text"]))
+
+        self.passages.append(passage)
+        self.lengths.append(sum(terms.values()))
+        for term, frequency in terms.items():
+            self.postings.setdefault(term, []).append((index, frequency))
+
+        self._arrays = None
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Find the passages best matching a query.
+
+        Args:
+            query: Query text
+            k: Maximum number of passages
+
+        Returns:
+            (score, passage) pairs, best first, only passages matching a query term
+        """
+        if not self.passages:
+            return []
+
+        arrays = self._freeze()
+        lengths = self._length_array
+        average_length = lengths.mean() or 1.0
+        scores = np.zeros(len(self.passages), dtype=np.float64)
+
+        for term in set(analyze(query)):
+            if term not in arrays:
+                continue
+
+            documents, frequencies = arrays[term]
+            idf = math.log(1 + (len(self.passages) - len(documents) + 0.5) / (len(documents) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * lengths[documents] / average_length)
+            scores[documents] += idf * frequencies * (self.k1 + 1) / (frequencies + norm)
+
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        return [(float(scores[index]), self.passages[index]) for index in candidates]
+
+    def save(self, path: str) -> None:
+        """
+        Persist the index as gzipped JSON.
+
+        Args:
+            path: File path
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump({
+                "k1": self.k1,
+                "b": self.b,
+                "fingerprint": self.fingerprint,
+                "passages": self.passages,
+                "lengths": self.lengths,
+                "postings": self.postings
+            }, f)
+        os.replace(tmp_path, path)
+
+        logger.debug(f"Saved index of {len(self.passages)} passages to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        """
+        Load a persisted index.
+
+        Args:
+            path: File path
+
+        Returns:
+            The loaded index
+        """
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            state = json.load(f)
+
+        index = cls(state["k1"], state["b"], state["fingerprint"])
+        index.passages = state["passages"]
+        index.lengths = state["lengths"]
+        index.postings = {term: [tuple(posting) for posting in postings]
+                          for term, postings in state["postings"].items()}
+
+        logger.debug(f"Loaded index of {len(index.passages)} passages from {path}")
+        return index
+
+    def _freeze(self) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """
+        Convert the postings to arrays for scoring.
+
+        Returns:
+            Dictionary mapping each term to (passage indices, term frequencies)
+        """
+        if self._arrays is None:
+            # Lengths first, so concurrent searches never see arrays without lengths
+            self._length_array = np.array(self.lengths, dtype=np.float64)
+            self._arrays = {
+                term: (np.array([p[0] for p in postings], dtype=np.int64),
+                       np.array([p[1] for p in postings], dtype=np.float64))
+                for term, postings in self.postings.items()
+            }
+        return self._arrays
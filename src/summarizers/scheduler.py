@@ -0,0 +1,267 @@
+"""
+Rate-limit aware scheduling of LLM requests.
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.retry import is_rate_limit_error, is_transient_error, retry_after
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at a per-minute rate.
+    
+    Reservations may overdraw the bucket; the caller is told how long to wait
+    until its reservation is covered, which keeps waiting callers in order.
+    """
+    
+    def __init__(self, per_minute: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the bucket, initially full.
+        
+        Args:
+            per_minute: Refill rate in units per minute
+            capacity: Maximum number of stored units (defaults to one minute of refill)
+            clock: Monotonic clock in seconds
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.clock = clock
+        self.level = self.capacity
+        self.updated = clock()
+        self._lock = threading.Lock()
+    
+    def reserve(self, amount: float) -> float:
+        """
+        Take units from the bucket.
+        
+        Args:
+            amount: Number of units, capped at the bucket capacity
+        
+        Returns:
+            Seconds to wait before the reserved units are available
+        """
+        with self._lock:
+            now = self.clock()
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+            self.level -= min(amount, self.capacity)
+            
+            if self.level >= 0:
+                return 0.0
+            return -self.level / self.rate
+
+
+class LLMScheduler:
+    """
+    Scheduler that keeps LLM calls within provider rate limits.
+    
+    Every call reserves one request and its estimated tokens from two token
+    buckets (requests per minute and tokens per minute). The number of calls
+    in flight is bounded by a concurrency limit adapted with AIMD: it grows
+    by one per window of successful calls and is halved when the provider
+    throttles or latency exceeds the target. Throttled and transient failures
+    are retried with exponential backoff and full jitter.
+    """
+    
+    def __init__(self, requests_per_minute: float = 500, tokens_per_minute: float = 90000,
+                 max_concurrency: int = 16, initial_concurrency: int = 4,
+                 target_latency: float = 30.0, max_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep,
+                 jitter: Callable[[], float] = random.random):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            requests_per_minute: Provider request limit
+            tokens_per_minute: Provider token limit
+            max_concurrency: Upper bound of the adaptive concurrency limit
+            initial_concurrency: Starting concurrency limit
+            target_latency: Latency in seconds above which concurrency is reduced
+            max_retries: Number of retries for throttled or transient failures
+            base_delay: First backoff delay in seconds
+            max_delay: Maximum backoff delay in seconds
+            clock: Monotonic clock in seconds
+            sleep: Sleep function
+            jitter: Random number generator in [0, 1)
+        """
+        self.requests = TokenBucket(requests_per_minute, clock=clock)
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock)
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self.sleep = sleep
+        self.jitter = jitter
+        
+        self.limit = float(min(initial_concurrency, max_concurrency))
+        self.in_flight = 0
+        self.stats = {"calls": 0, "retries": 0, "throttled": 0, "failures": 0}
+        self._condition = threading.Condition()
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "LLMScheduler":
+        """
+        Create a scheduler from the rate_limits configuration.
+        
+        Args:
+            config: Rate limit configuration
+        
+        Returns:
+            Configured scheduler
+        """
+        return cls(
+            requests_per_minute=config.get("requests_per_minute", 500),
+            tokens_per_minute=config.get("tokens_per_minute", 90000),
+            max_concurrency=config.get("max_concurrency", 16),
+            initial_concurrency=config.get("initial_concurrency", 4),
+            target_latency=config.get("target_latency", 30.0),
+            max_retries=config.get("max_retries", 5)
+        )
+    
+    @property
+    def concurrency(self) -> int:
+        """Current concurrency limit."""
+        return max(1, int(self.limit))
+    
+    def call(self, request: Callable[[], Any], tokens: int) -> Any:
+        """
+        Run an LLM request within the rate limits.
+        
+        Args:
+            request: Function performing the request
+            tokens: Estimated tokens consumed by the request (prompt and completion)
+        
+        Returns:
+            Result of the request
+        
+        Raises:
+            Exception: The last error if the request fails after all retries,
+                or any non-transient error immediately
+        """
+        for attempt in range(self.max_retries + 1):
+            wait = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+            if wait > 0:
+                self.sleep(wait)
+            
+            self._acquire()
+            start = self.clock()
+            try:
+                result = request()
+            except Exception as e:
+                self._release()
+                
+                if is_rate_limit_error(e):
+                    self._decrease("throttled")
+                    self._record("throttled")
+                
+                if not is_transient_error(e) or attempt == self.max_retries:
+                    self._record("failures")
+                    raise
+                
+                self._record("retries")
+                delay = retry_after(e) or self._backoff(attempt)
+                logger.warning(f"LLM request failed ({e}), retrying in {delay:.1f}s")
+                self.sleep(delay)
+                continue
+            
+            latency = self.clock() - start
+            self._release()
+            self._record("calls")
+            
+            if latency > self.target_latency:
+                self._decrease(f"latency {latency:.1f}s")
+            else:
+                self._increase()
+            
+            return result
+    
+    def _backoff(self, attempt: int) -> float:
+        """
+        Compute a jittered exponential backoff delay.
+        
+        Args:
+            attempt: Zero-based attempt number
+        
+        Returns:
+            Delay in seconds
+        """
+        return self.jitter() * min(self.max_delay, self.base_delay * 2 ** attempt)
+    
+    def _acquire(self) -> None:
+        """Wait for a free slot under the concurrency limit."""
+        with self._condition:
+            while self.in_flight >= self.concurrency:
+                self._condition.wait()
+            self.in_flight += 1
+    
+    def _release(self) -> None:
+        """Release a slot."""
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+    
+    def _record(self, name: str) -> None:
+        """
+        Increment a statistics counter.
+        
+        Args:
+            name: Counter name
+        """
+        with self._condition:
+            self.stats[name] += 1
+    
+    def _increase(self) -> None:
+        """Additively increase the limit by about one per window of calls."""
+        with self._condition:
+            before = self.concurrency
+            self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+            if self.concurrency > before:
+                self._condition.notify()
+    
+    def _decrease(self, reason: str) -> None:
+        """
+        Multiplicatively decrease the limit.
+        
+        Args:
+            reason: Reason for the decrease, for logging
+        """
+        with self._condition:
+            self.limit = max(1.0, self.limit / 2)
+        logger.info(f"Reduced LLM concurrency to {self.concurrency} ({reason})")
+
+
+_shared_scheduler: Optional[LLMScheduler] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_scheduler(config: Dict[str, Any]) -> LLMScheduler:
+    """
+    Get the process-wide scheduler, creating it on first use.
+    
+    All summarizers in a process share one scheduler, so they respect a single
+    rate-limit budget. The configuration of the first caller is used.
+    
+    Args:
+        config: Rate limit configuration
+    
+    Returns:
+        The shared scheduler
+    """
+    global _shared_scheduler
+    
+    with _shared_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = LLMScheduler.from_config(config)
+        return _shared_scheduler
@@ -0,0 +1,192 @@
+"""
+Persistent summary tree with memoized nodes.
+
+The tree mirrors the structure of a project summary:
+chunk -> document -> source section -> project overview. Every node is keyed
+by a hash of its inputs (the text for leaves, the child keys for inner nodes),
+so regenerating a summary only re-runs the nodes whose inputs changed, i.e.
+the path from a changed leaf to the root.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SummaryNode:
+    """A node of the summary tree."""
+    def __init__(self, key: str, kind: str, summary: str):
+        self.key = key
+        self.kind = kind
+        self.summary = summary
+
+
+class SummaryTree:
+    """
+    Content-addressed store of summary tree nodes.
+
+    Nodes are kept in memory and, if a path is given, persisted as JSON so
+    they can be reused by later runs. Only the nodes reached during the
+    current run are written back, which drops nodes of outdated content.
+    The tree can be shared by sections summarized on different threads.
+    """
+
+    def __init__(self, path: Optional[str] = None, salt: str = ""):
+        """
+        Initialize the summary tree.
+
+        Args:
+            path: Path of the JSON file to persist the tree to, None to keep it in memory
+            salt: Extra input mixed into every key (e.g. the model name), so
+                nodes produced with different settings are not reused
+        """
+        self.path = path
+        self.salt = salt
+        self.nodes: Dict[str, Dict[str, str]] = {}
+        self.visited: Dict[str, Dict[str, str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self.nodes = json.load(f)
+                logger.debug(f"Loaded {len(self.nodes)} summary tree nodes from {path}")
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not load summary tree from {path}: {e}")
+
+    def key(self, kind: str, parts: List[str]) -> str:
+        """
+        Compute the key of a node from its kind and inputs.
+
+        Args:
+            kind: Node kind (chunk, document, section, project)
+            parts: Inputs of the node, texts for leaves and child keys otherwise
+
+        Returns:
+            Hex digest identifying the node
+        """
+        digest = hashlib.sha256()
+        for part in [self.salt, kind] + parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def leaf(self, kind: str, text: str, summarize: Callable[[str], str]) -> SummaryNode:
+        """
+        Get or compute a leaf node.
+
+        Args:
+            kind: Node kind
+            text: Text to summarize
+            summarize: Function producing the summary of the text
+
+        Returns:
+            The leaf node
+        """
+        return self._memoize(kind, self.key(kind, [text]), lambda: summarize(text))
+
+    def leaves(self, kind: str, texts: List[str],
+               summarize_many: Callable[[List[str]], List[str]]) -> List[SummaryNode]:
+        """
+        Get or compute several leaf nodes at once.
+
+        All missing leaves are summarized with a single call to summarize_many,
+        which lets the caller batch them into shared prompts.
+
+        Args:
+            kind: Node kind
+            texts: Texts to summarize
+            summarize_many: Function producing the summaries of a list of texts, in order
+
+        Returns:
+            The leaf nodes, in the order of the texts
+        """
+        keys = [self.key(kind, [text]) for text in texts]
+        with self._lock:
+            missing = {key: text for key, text in zip(keys, texts) if key not in self.nodes}
+
+        if missing:
+            summaries = summarize_many(list(missing.values()))
+            computed = dict(zip(missing.keys(), summaries))
+        else:
+            computed = {}
+
+        return [self._memoize(kind, key, lambda key=key: computed[key]) for key in keys]
+
+    def node(self, kind: str, children: List[SummaryNode],
+             combine: Callable[[List[str]], str]) -> SummaryNode:
+        """
+        Get or compute an inner node from its children.
+
+        A node with a single child reuses the child's summary without calling
+        combine.
+
+        Args:
+            kind: Node kind
+            children: Child nodes
+            combine: Function producing the node summary from the child summaries
+
+        Returns:
+            The inner node
+        """
+        key = self.key(kind, [child.key for child in children])
+
+        if len(children) == 1:
+            return self._memoize(kind, key, lambda: children[0].summary)
+
+        return self._memoize(kind, key, lambda: combine([child.summary for child in children]))
+
+    def save(self) -> None:
+        """Persist the nodes reached during this run, if a path is configured."""
+        if not self.path:
+            return
+
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.visited, f)
+            os.replace(tmp_path, self.path)
+
+            logger.debug(f"Saved {len(self.visited)} summary tree nodes to {self.path}")
+        except OSError as e:
+            logger.warning(f"Could not save summary tree to {self.path}: {e}")
+
+    def _memoize(self, kind: str, key: str, compute: Callable[[], str]) -> SummaryNode:
+        """
+        Return the stored node for a key, computing and storing it if missing.
+
+        Args:
+            kind: Node kind
+            key: Node key
+            compute: Function producing the node summary
+
+        Returns:
+            The node
+        """
+        with self._lock:
+            entry = self.nodes.get(key)
+
+        if entry is None:
+            # Computed outside the lock so other sections are not blocked by the LLM call
+            entry = {"kind": kind, "summary": compute()}
+            with self._lock:
+                entry = self.nodes.setdefault(key, entry)
+                self.misses += 1
+                self.visited[key] = entry
+        else:
+            with self._lock:
+                self.hits += 1
+                self.visited[key] = entry
+
+        return SummaryNode(key, kind, entry["summary"])
@@ -0,0 +1,736 @@
+"""
+HTTP transport shared by the API adapters.
+
+The Notion, Drive and Jira SDKs each bring their own HTTP stack. They are all
+handed the process-wide transport instead, so connections to a host are kept
+alive and reused across adapters, threads and projects, responses are
+compressed, and timeouts, retries and backoff are configured in one place.
+"""
+
+import gzip
+import http.client
+import io
+import logging
+import ssl
+import threading
+import time
+import zlib
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Tuple, Union
+from urllib.parse import urljoin, urlsplit
+
+from src.utils.retry import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+# Methods retried after connection errors, as they can be repeated safely
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "PUT", "DELETE", "OPTIONS"])
+
+# Statuses retried for idempotent methods
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+# Statuses retried for every method, as the request was not processed
+REJECTED_STATUSES = frozenset([429, 503])
+
+REDIRECT_STATUSES = frozenset([301, 302, 303, 307, 308])
+
+# Headers carrying credentials, not sent on to another origin after a redirect
+CREDENTIAL_HEADERS = frozenset(["authorization", "proxy-authorization", "cookie"])
+
+# Bytes read at a time when a download is streamed
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def _redirect_headers(headers: Dict[str, str], url: str, location: str) -> Dict[str, str]:
+    """
+    Get the headers to send to the target of a redirect.
+
+    Args:
+        headers: Headers of the redirected request
+        url: Redirected URL
+        location: Absolute URL the request is redirected to
+
+    Returns:
+        The same headers, without the credential headers if the redirect
+        leaves the scheme, host and port of url
+    """
+    source, target = urlsplit(url), urlsplit(location)
+    if (source.scheme, source.hostname, source.port) == (target.scheme, target.hostname, target.port):
+        return headers
+    return {name: value for name, value in headers.items() if name.lower() not in CREDENTIAL_HEADERS}
+
+
+class HttpResponse:
+    """Response read completely from a pooled connection."""
+
+    def __init__(self, status: int, reason: str, headers: Dict[str, str], content: bytes, url: str):
+        """
+        Initialize the response.
+
+        Args:
+            status: HTTP status code
+            reason: Reason phrase
+            headers: Response headers with lowercase names
+            content: Decoded body
+            url: Requested URL
+        """
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+        self.url = url
+
+
+class HttpStatusError(Exception):
+    """Retryable error status, carrying its response for retry_after."""
+
+    def __init__(self, response: HttpResponse):
+        super().__init__(f"HTTP {response.status} {response.reason}")
+        self.response = response
+        self.status_code = response.status
+
+
+class _HostPool:
+    """Keep-alive connections to one host, at most max_connections in use at a time."""
+
+    def __init__(self, scheme: str, host: str, port: Optional[int], max_connections: int,
+                 connect_timeout: float, idle_timeout: float, ssl_context: ssl.SSLContext):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.connect_timeout = connect_timeout
+        self.idle_timeout = idle_timeout
+        self.ssl_context = ssl_context
+
+        # Idle connections with the time they were released, most recent last
+        self.idle: Deque[Tuple[http.client.HTTPConnection, float]] = deque()
+        self.in_use = 0
+        self.stats = {
+            "requests": 0, "retries": 0, "connections_created": 0, "connections_reused": 0,
+            "stale_connections": 0, "max_in_use": 0, "wait_seconds": 0.0,
+            "bytes_received": 0, "bytes_decoded": 0,
+        }
+        self._condition = threading.Condition()
+
+    def acquire(self) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        Take a connection, waiting while all of them are in use.
+
+        Returns:
+            Connection and whether it was reused
+        """
+        start = time.monotonic()
+        with self._condition:
+            while self.in_use >= self.max_connections:
+                self._condition.wait()
+            self.in_use += 1
+            self.stats["wait_seconds"] += time.monotonic() - start
+            self.stats["max_in_use"] = max(self.stats["max_in_use"], self.in_use)
+
+            # Connections idle for too long are likely closed by the server
+            now = time.monotonic()
+            while self.idle:
+                connection, released = self.idle.pop()
+                if now - released < self.idle_timeout:
+                    self.stats["connections_reused"] += 1
+                    return connection, True
+                connection.close()
+
+        try:
+            return self.connect(), False
+        except BaseException:
+            self.release(None, False)
+            raise
+
+    def connect(self) -> http.client.HTTPConnection:
+        """
+        Open a new connection, counted as created.
+
+        Returns:
+            Connected connection
+        """
+        if self.scheme == "https":
+            connection: http.client.HTTPConnection = http.client.HTTPSConnection(
+                self.host, self.port, timeout=self.connect_timeout, context=self.ssl_context
+            )
+        else:
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=self.connect_timeout)
+        connection.connect()
+        with self._condition:
+            self.stats["connections_created"] += 1
+        return connection
+
+    def release(self, connection: Optional[http.client.HTTPConnection], keep: bool) -> None:
+        """
+        Return a connection taken with acquire.
+
+        Args:
+            connection: Connection, None if it could not be opened
+            keep: Whether the connection can be reused
+        """
+        with self._condition:
+            self.in_use -= 1
+            if connection is not None:
+                if keep:
+                    self.idle.append((connection, time.monotonic()))
+                else:
+                    connection.close()
+            self._condition.notify()
+
+    def count(self, name: str, value: Union[int, float] = 1) -> None:
+        """Add to a statistic."""
+        with self._condition:
+            self.stats[name] += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the statistics of the pool, with its current use."""
+        with self._condition:
+            return dict(self.stats, in_use=self.in_use, idle=len(self.idle),
+                        max_connections=self.max_connections,
+                        utilization=self.stats["max_in_use"] / self.max_connections)
+
+    def close(self) -> None:
+        """Close the idle connections."""
+        with self._condition:
+            while self.idle:
+                self.idle.pop()[0].close()
+
+
+class HttpTransport:
+    """
+    Thread-safe HTTP client with a keep-alive connection pool per host.
+
+    Requests ask for compressed responses, which are decoded before they are
+    returned. Connection errors of idempotent requests and retryable statuses
+    are retried with exponential backoff, honouring Retry-After; the response
+    is returned once retries are exhausted, so callers see the final status.
+    Callers with a retry loop of their own send their requests within
+    without_retries(), so each request is retried by one policy only.
+    """
+
+    def __init__(self, connect_timeout: float = 10.0, read_timeout: float = 60.0,
+                 max_connections_per_host: int = 16, idle_timeout: float = 30.0,
+                 max_retries: int = 3, backoff_base: float = 0.5, max_backoff: float = 30.0,
+                 compression: bool = True, sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialize the transport.
+
+        Args:
+            connect_timeout: Seconds to establish a connection
+            read_timeout: Seconds to wait for data from the server
+            max_connections_per_host: Connections to a host in use at a time
+            idle_timeout: Seconds after which idle connections are not reused
+            max_retries: Retries of a failed request
+            backoff_base: First backoff delay in seconds
+            max_backoff: Maximum backoff delay in seconds
+            compression: Whether to ask for gzip or deflate responses
+            sleep: Function used to wait between retries
+        """
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_connections_per_host = max_connections_per_host
+        self.idle_timeout = idle_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.compression = compression
+        self.sleep = sleep
+
+        self._ssl_context = ssl.create_default_context()
+        self._pools: Dict[Tuple[str, str, Optional[int]], _HostPool] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "HttpTransport":
+        """
+        Create a transport from the http configuration.
+
+        Args:
+            config: Timeout, pool and retry settings
+
+        Returns:
+            New transport
+        """
+        return cls(
+            connect_timeout=config.get("connect_timeout", 10.0),
+            read_timeout=config.get("read_timeout", 60.0),
+            max_connections_per_host=config.get("max_connections_per_host", 16),
+            idle_timeout=config.get("idle_timeout", 30.0),
+            max_retries=config.get("max_retries", 3),
+            backoff_base=config.get("backoff_base", 0.5),
+            max_backoff=config.get("max_backoff", 30.0),
+            compression=config.get("compression", True),
+        )
+
+    def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                body: Union[bytes, str, None] = None, timeout: Optional[float] = None) -> HttpResponse:
+        """
+        Send a request on a pooled connection.
+
+        Args:
+            method: HTTP method
+            url: Absolute http or https URL
+            headers: Request headers
+            body: Request body, strings are encoded as UTF-8
+            timeout: Read timeout in seconds, read_timeout by default
+
+        Returns:
+            Response with its decoded body
+
+        Raises:
+            OSError: If the server stays unreachable
+            http.client.HTTPException: If the server response stays invalid
+        """
+        method = method.upper()
+        parts = urlsplit(url)
+        pool = self._pool(parts.scheme, parts.hostname or "", parts.port)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+
+        headers = dict(headers or {})
+        if not any(name.lower() == "accept-encoding" for name in headers):
+            # Byte ranges are offsets into the file as stored, not into a compressed body
+            ranged = any(name.lower() == "range" for name in headers)
+            if ranged or not self.compression:
+                headers["Accept-Encoding"] = "identity"
+            else:
+                headers["Accept-Encoding"] = "gzip, deflate"
+
+        max_retries = self._max_retries()
+        for attempt in range(max_retries + 1):
+            pool.count("requests")
+            try:
+                response = self._send(pool, method, target, headers, body, timeout, url)
+            except (OSError, http.client.HTTPException) as e:
+                if attempt == max_retries or method not in IDEMPOTENT_METHODS:
+                    raise
+                error: Exception = e
+            else:
+                retryable = response.status in (RETRY_STATUSES if method in IDEMPOTENT_METHODS
+                                                 else REJECTED_STATUSES)
+                if not retryable or attempt == max_retries:
+                    return response
+                error = HttpStatusError(response)
+
+            pool.count("retries")
+            delay = backoff_delay(attempt, self.backoff_base, error, self.max_backoff)
+            logger.warning(f"{method} {url} failed ({error}), retrying in {delay:.1f}s")
+            self.sleep(delay)
+
+    def download(self, url: str, write: Callable[[bytes], Any], headers: Optional[Dict[str, str]] = None,
+                 timeout: Optional[float] = None, redirections: int = 5,
+                 chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> HttpResponse:
+        """
+        Stream the body of a GET request, chunk by chunk, without holding it in memory.
+
+        The body is requested uncompressed, so the chunks are the file as
+        stored. Redirects are followed, without the credential headers if
+        they lead to another origin. Connection errors and retryable statuses
+        are retried as long as nothing has been written.
+
+        Args:
+            url: Absolute http or https URL
+            write: Called with each chunk of a successful response
+            headers: Request headers
+            timeout: Read timeout in seconds, read_timeout by default
+            redirections: Maximum number of redirects to follow
+            chunk_size: Bytes read at a time
+
+        Returns:
+            Final response, with the body only if its status is not 2xx
+        """
+        headers = {name: value for name, value in (headers or {}).items()
+                   if name.lower() != "accept-encoding"}
+        headers["Accept-Encoding"] = "identity"
+
+        response = self._stream(url, write, headers, timeout, chunk_size)
+        while response.status in REDIRECT_STATUSES and "location" in response.headers and redirections > 0:
+            target = urljoin(url, response.headers["location"])
+            headers = _redirect_headers(headers, url, target)
+            url = target
+            redirections -= 1
+            response = self._stream(url, write, headers, timeout, chunk_size)
+        return response
+
+    @contextmanager
+    def without_retries(self) -> Iterator[None]:
+        """
+        Send the requests of the current thread only once within the block.
+
+        Used around SDK calls that the caller retries itself.
+        """
+        previous = getattr(self._local, "max_retries", None)
+        self._local.max_retries = 0
+        try:
+            yield
+        finally:
+            self._local.max_retries = previous
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the request and connection statistics of every host.
+
+        Returns:
+            Statistics by host, including the current and peak number of
+            connections in use and the utilization of the pool
+        """
+        with self._lock:
+            pools = list(self._pools.values())
+        return {pool.host if pool.port is None else f"{pool.host}:{pool.port}": pool.snapshot()
+                for pool in pools}
+
+    def close(self) -> None:
+        """Close the idle connections of every host."""
+        with self._lock:
+            pools = list(self._pools.values())
+        for pool in pools:
+            pool.close()
+
+    def _max_retries(self) -> int:
+        """Get the number of retries of the requests of the current thread."""
+        max_retries = getattr(self._local, "max_retries", None)
+        return self.max_retries if max_retries is None else max_retries
+
+    def _pool(self, scheme: str, host: str, port: Optional[int]) -> _HostPool:
+        """
+        Get the connection pool of a host, creating it on first use.
+
+        Args:
+            scheme: "http" or "https"
+            host: Host name
+            port: Port, None for the default of the scheme
+
+        Returns:
+            Connection pool
+        """
+        if scheme not in ("http", "https") or not host:
+            raise ValueError(f"Unsupported URL: {scheme}://{host}")
+
+        key = (scheme, host, port)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = _HostPool(scheme, host, port, self.max_connections_per_host,
+                                 self.connect_timeout, self.idle_timeout, self._ssl_context)
+                self._pools[key] = pool
+            return pool
+
+    def _send(self, pool: _HostPool, method: str, target: str, headers: Dict[str, str],
+              body: Optional[bytes], timeout: Optional[float], url: str) -> HttpResponse:
+        """
+        Send a request once, replacing a reused connection closed by the server.
+
+        Args:
+            pool: Pool of the host
+            method: HTTP method
+            target: Path and query
+            headers: Request headers
+            body: Request body
+            timeout: Read timeout in seconds
+            url: Requested URL
+
+        Returns:
+            Response with its decoded body
+        """
+        connection, reused = pool.acquire()
+        try:
+            try:
+                raw, content = self._exchange(connection, method, target, headers, body, timeout)
+            except (ConnectionResetError, BrokenPipeError):
+                if not reused or method not in IDEMPOTENT_METHODS:
+                    raise
+                # The server most likely closed the idle connection before the
+                # request reached it, but it may have been processed, so only
+                # requests that can be repeated are sent again on a new one
+                connection.close()
+                pool.count("stale_connections")
+                connection = pool.connect()
+                raw, content = self._exchange(connection, method, target, headers, body, timeout)
+        except BaseException:
+            pool.release(connection, False)
+            raise
+        pool.release(connection, not raw.will_close)
+
+        response_headers = {name.lower(): value for name, value in raw.getheaders()}
+        pool.count("bytes_received", len(content))
+        content = self._decode(content, response_headers)
+        pool.count("bytes_decoded", len(content))
+        return HttpResponse(raw.status, raw.reason, response_headers, content, url)
+
+    def _stream(self, url: str, write: Callable[[bytes], Any], headers: Dict[str, str],
+                timeout: Optional[float], chunk_size: int) -> HttpResponse:
+        """
+        Send a GET request and pass its body to write as it arrives, retrying until the first chunk.
+
+        Returns:
+            Response, with the body only if its status is not 2xx
+        """
+        parts = urlsplit(url)
+        pool = self._pool(parts.scheme, parts.hostname or "", parts.port)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+        max_retries = self._max_retries()
+        for attempt in range(max_retries + 1):
+            pool.count("requests")
+            connection, _ = pool.acquire()
+            keep = False
+            written = 0
+            try:
+                if connection.sock is None:
+                    connection.connect()
+                connection.sock.settimeout(timeout or self.read_timeout)
+                connection.request("GET", target, headers=headers)
+                raw = connection.getresponse()
+                response_headers = {name.lower(): value for name, value in raw.getheaders()}
+
+                if not 200 <= raw.status < 300:
+                    response = HttpResponse(raw.status, raw.reason, response_headers, raw.read(), url)
+                    keep = not raw.will_close
+                    if response.status not in RETRY_STATUSES or attempt == max_retries:
+                        return response
+                    error: Exception = HttpStatusError(response)
+                else:
+                    while True:
+                        chunk = raw.read(chunk_size)
+                        if not chunk:
+                            break
+                        write(chunk)
+                        written += len(chunk)
+                    keep = not raw.will_close
+                    return HttpResponse(raw.status, raw.reason, response_headers, b"", url)
+            except (OSError, http.client.HTTPException) as e:
+                if written or attempt == max_retries:
+                    raise
+                error = e
+            finally:
+                pool.count("bytes_received", written)
+                pool.count("bytes_decoded", written)
+                pool.release(connection, keep)
+
+            pool.count("retries")
+            delay = backoff_delay(attempt, self.backoff_base, error, self.max_backoff)
+            logger.warning(f"GET {url} failed ({error}), retrying in {delay:.1f}s")
+            self.sleep(delay)
+
+    def _exchange(self, connection: http.client.HTTPConnection, method: str, target: str,
+                  headers: Dict[str, str], body: Optional[bytes],
+                  timeout: Optional[float]) -> Tuple[http.client.HTTPResponse, bytes]:
+        """
+        Write a request and read its whole response.
+
+        Returns:
+            Response and its body as received
+        """
+        if connection.sock is None:
+            connection.connect()
+        connection.sock.settimeout(timeout or self.read_timeout)
+        connection.request(method, target, body=body, headers=headers)
+        raw = connection.getresponse()
+        return raw, raw.read()
+
+    @staticmethod
+    def _decode(content: bytes, headers: Dict[str, str]) -> bytes:
+        """
+        Decode a compressed body and update the headers to match.
+
+        Args:
+            content: Body as received
+            headers: Response headers with lowercase names, updated in place
+
+        Returns:
+            Decoded body
+        """
+        encoding = headers.get("content-encoding", "").strip().lower()
+        if encoding == "gzip":
+            content = gzip.decompress(content)
+        elif encoding == "deflate":
+            try:
+                content = zlib.decompress(content)
+            except zlib.error:
+                # Some servers send raw deflate data without the zlib header
+                content = zlib.decompress(content, -zlib.MAX_WBITS)
+        else:
+            return content
+
+        del headers["content-encoding"]
+        headers["content-length"] = str(len(content))
+        return content
+
+
+class Httplib2Adapter:
+    """
+    Transport in the interface of httplib2.Http, for google-api-python-client.
+
+    Redirects are followed like httplib2 does, except that credential
+    headers are dropped when a redirect leads to another origin.
+    """
+
+    def __init__(self, transport: HttpTransport):
+        """
+        Initialize the adapter.
+
+        Args:
+            transport: Transport sending the requests
+        """
+        self.transport = transport
+        self.timeout = transport.read_timeout
+        self.follow_redirects = True
+        self.redirect_codes = set(REDIRECT_STATUSES)
+
+    def request(self, uri: str, method: str = "GET", body: Union[bytes, str, None] = None,
+                headers: Optional[Dict[str, str]] = None, redirections: int = 5,
+                connection_type: Any = None) -> Tuple["Httplib2Response", bytes]:
+        """
+        Send a request.
+
+        Args:
+            uri: Absolute URL
+            method: HTTP method
+            body: Request body
+            headers: Request headers
+            redirections: Maximum number of redirects to follow
+            connection_type: Ignored, connections come from the transport
+
+        Returns:
+            Response headers and status, and the decoded body
+        """
+        response = self.transport.request(method, uri, headers=headers, body=body, timeout=self.timeout)
+        while (self.follow_redirects and response.status in self.redirect_codes
+               and "location" in response.headers and redirections > 0):
+            if response.status == 303 or (response.status in (301, 302) and method not in ("GET", "HEAD")):
+                method, body = "GET", None
+            location = urljoin(uri, response.headers["location"])
+            headers = _redirect_headers(headers or {}, uri, location)
+            uri = location
+            redirections -= 1
+            response = self.transport.request(method, uri, headers=headers, body=body, timeout=self.timeout)
+        return Httplib2Response(response), response.content
+
+
+class Httplib2Response(dict):
+    """Response headers with the status, like httplib2.Response."""
+
+    def __init__(self, response: HttpResponse):
+        super().__init__(response.headers)
+        self["status"] = str(response.status)
+        self.status = response.status
+        self.reason = response.reason
+
+
+def _sdk_headers(headers: Any) -> Dict[str, str]:
+    """
+    Get the headers of an SDK request to send through the transport.
+
+    Args:
+        headers: Request headers of the SDK
+
+    Returns:
+        The headers without Accept-Encoding, which the transport sets to the
+        encodings it can decode
+    """
+    return {name: value for name, value in headers.items() if name.lower() != "accept-encoding"}
+
+
+def httpx_client(transport: HttpTransport) -> Optional[Any]:
+    """
+    Create an httpx client sending its requests through the transport, for notion-client.
+
+    Args:
+        transport: Transport sending the requests
+
+    Returns:
+        httpx.Client, or None if httpx is not installed
+    """
+    try:
+        import httpx
+    except ImportError:
+        logger.debug("httpx is not installed, the Notion SDK uses its own connections")
+        return None
+
+    class _HttpxTransport(httpx.BaseTransport):
+        def handle_request(self, request: "httpx.Request") -> "httpx.Response":
+            timeout = (request.extensions.get("timeout") or {}).get("read")
+            response = transport.request(request.method, str(request.url), headers=_sdk_headers(request.headers),
+                                         body=request.read() or None, timeout=timeout)
+            return httpx.Response(response.status, headers=list(response.headers.items()),
+                                  content=response.content, request=request)
+
+    return httpx.Client(transport=_HttpxTransport())
+
+
+def requests_session(transport: HttpTransport) -> Optional[Any]:
+    """
+    Create a requests session sending its requests through the transport, for atlassian-python-api.
+
+    Args:
+        transport: Transport sending the requests
+
+    Returns:
+        requests.Session, or None if requests is not installed
+    """
+    try:
+        import requests
+        from requests.adapters import BaseAdapter
+        from requests.structures import CaseInsensitiveDict
+        from requests.utils import get_encoding_from_headers
+    except ImportError:
+        logger.debug("requests is not installed, the Jira SDK uses its own connections")
+        return None
+
+    class _RequestsAdapter(BaseAdapter):
+        def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+            read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+            result = transport.request(request.method, request.url, headers=_sdk_headers(request.headers),
+                                       body=request.body, timeout=read_timeout)
+            response = requests.Response()
+            response.status_code = result.status
+            response.reason = result.reason
+            response.headers = CaseInsensitiveDict(result.headers)
+            response.encoding = get_encoding_from_headers(response.headers)
+            # The body is read completely, but iter_content() still reads raw
+            response._content = result.content
+            response._content_consumed = True
+            response.raw = io.BytesIO(result.content)
+            response.url = request.url
+            response.request = request
+            response.connection = self
+            return response
+
+        def close(self):
+            pass
+
+    session = requests.Session()
+    adapter = _RequestsAdapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_shared_transport: Optional[HttpTransport] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_transport(config: Optional[Dict[str, Any]] = None) -> HttpTransport:
+    """
+    Get the process-wide transport, creating it on first use.
+
+    All adapters in a process share one transport, so connections to a host
+    are reused across adapters and projects. The configuration of the first
+    caller is used.
+
+    Args:
+        config: Timeout, pool and retry configuration, defaults if None
+
+    Returns:
+        The shared transport
+    """
+    global _shared_transport
+
+    with _shared_lock:
+        if _shared_transport is None:
+            _shared_transport = HttpTransport.from_config(config or {})
+        return _shared_transport
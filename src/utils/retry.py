@@ -0,0 +1,111 @@
+"""
+Classification of API errors for retries.
+"""
+
+import random
+from typing import Optional
+
+
+def _status(error: Exception) -> Optional[int]:
+    """
+    Get the HTTP status of an error, if any.
+
+    Args:
+        error: Exception raised by an API client
+
+    Returns:
+        Status code, from the error (status_code or status, as raised by the
+        Notion SDK) or from its response
+    """
+    for value in (getattr(error, "status_code", None), getattr(error, "status", None),
+                  getattr(getattr(error, "response", None), "status_code", None)):
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """
+    Check whether an error is a provider rate-limit response (HTTP 429).
+
+    Args:
+        error: Exception raised by an API client
+
+    Returns:
+        True if the request was throttled
+    """
+    status = _status(error)
+    return status == 429 or "RateLimit" in type(error).__name__
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Check whether an error is worth retrying.
+
+    Args:
+        error: Exception raised by an API client
+
+    Returns:
+        True for rate limits, server errors and timeouts
+    """
+    status = _status(error)
+    return (
+        is_rate_limit_error(error)
+        or (isinstance(status, int) and status >= 500)
+        or isinstance(error, (TimeoutError, ConnectionError))
+        or "Timeout" in type(error).__name__
+    )
+
+
+def is_rejected_error(error: Exception) -> bool:
+    """
+    Check whether a request certainly was not processed, so it can be sent again even if not idempotent.
+
+    Args:
+        error: Exception raised by an API client
+
+    Returns:
+        True for rate limits, 503 responses and refused connections
+    """
+    return is_rate_limit_error(error) or _status(error) == 503 or isinstance(error, ConnectionRefusedError)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """
+    Extract the server-suggested retry delay from an error, if any.
+
+    Args:
+        error: Exception raised by an API client
+
+    Returns:
+        Delay in seconds, or None
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        return float(value) if value is not None else None
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base_delay: float = 1.0, error: Optional[Exception] = None,
+                  max_delay: Optional[float] = None) -> float:
+    """
+    Compute the delay before retrying a failed request.
+
+    Args:
+        attempt: Number of the failed attempt, starting at 0
+        base_delay: Delay after the first attempt, doubled after every retry
+        error: Error of the failed attempt, whose Retry-After takes precedence
+        max_delay: Upper bound of the delay, if any, also applied to Retry-After
+
+    Returns:
+        Delay in seconds, with jitter between half and all of the exponential delay
+    """
+    suggested = retry_after(error) if error is not None else None
+    if suggested is not None:
+        return max(0.0, suggested if max_delay is None else min(suggested, max_delay))
+    delay = base_delay * 2 ** attempt
+    if max_delay is not None:
+        delay = min(delay, max_delay)
+    return delay * (0.5 + random.random() / 2)
@@ -31,15 +31,32 @@ class MockNotionClient:
     
     def create_summary_page(self, project_id, content):
         return "https://notion.so/summary-page"
+    
+    def cache_stats(self):
+        return {"hits": 1, "misses": 0, "stores": 0}
+    
+    def start_summary_page(self, project_id):
+        self.appended = []
+        return {"id": "summary-page-id", "url": "https://notion.so/summary-page"}
+    
+    def append_to_page(self, page_id, content):
+        self.appended.append(content)
+    
+    def publish_sections(self, page_id, sections):
+        self.appended.extend(sections)
+    
+    def update_summary_page(self, project_id, content):
+        self.updated = content
+        return "https://notion.so/existing-summary-page"
 
 class MockGDriveClient:
     def __init__(self, config):
         self.config = config
     
-    def get_relevant_files(self, project_id):
+    def get_relevant_files(self, project_id, project_name=None):
         return GDRIVE_FILES
     
-    def download_file(self, file_id, destination_folder):
+    def download_file(self, file_id, destination_folder, metadata=None):
         return os.path.join(destination_folder, "mock_file.pdf")
 
 class MockJiraClient:
@@ -49,6 +66,13 @@ class MockJiraClient:
     
     def get_project_issues(self, project_id):
         return JIRA_TASKS
+    
+    def download_attachment(self, attachment, destination_folder):
+        self.downloaded = getattr(self, "downloaded", []) + [attachment["id"]]
+        file_path = os.path.join(destination_folder, f"jira-{attachment['id']}")
+        with open(file_path, "w") as f:
+            f.write(attachment["filename"])
+        return file_path, attachment["md5"]
 
 class MockParserFactory:
     def get_parser(self, mime_type):
@@ -59,9 +83,14 @@ class MockParserFactory:
 class MockLLMSummarizer:
     def __init__(self, config):
         self.config = config
+        self.section_timings = {"header": 0.0}
     
     def generate_summary(self, data):
         return "Comprehensive project summary"
+    
+    def stream_summary(self, data):
+        yield "# Project Summary"
+        yield "Comprehensive project summary"
 
 class ErrorNotionClient:
     def __init__(self, config):
@@ -156,6 +185,23 @@ class TestDocumentationAgent(unittest.TestCase):
         
         # Verify
         self.assertEqual(result, "https://notion.so/summary-page")
+        self.assertEqual(
+            self.agent.notion_client.appended,
+            ["# Project Summary", "Comprehensive project summary"]
+        )
+        self.assertEqual(self.agent.trace["section_timings"], {"header": 0.0})
+        self.assertEqual(self.agent.trace["notion_cache"]["hits"], 1)
+        self.assertIsInstance(self.agent.trace["http"], dict)
+        
+    def test_run_update_mode(self):
+        """Test that the update mode updates the existing summary page."""
+        config = dict(self.test_config, notion={"jira_url_property": "jira-url", "summary_mode": "update"})
+        agent = DocumentationAgent(config, "test-project-id")
+        
+        result = agent.run()
+        
+        self.assertEqual(result, "https://notion.so/existing-summary-page")
+        self.assertEqual(agent.notion_client.updated, "# Project Summary\n\nComprehensive project summary")
         
     def test_run_dry_run(self):
         """Test dry run of the documentation agent."""
@@ -170,6 +216,8 @@ class TestDocumentationAgent(unittest.TestCase):
         
         # Verify
         self.assertIsNotNone(result)
+        with open(result) as f:
+            self.assertEqual(f.read(), "# Project Summary\n\nComprehensive project summary")
         
         # Clean up
         if os.path.exists(result):
@@ -177,6 +225,34 @@ class TestDocumentationAgent(unittest.TestCase):
         if os.path.exists("test_output"):
             os.rmdir("test_output")
         
+    def test_collect_documents_deduplicates_attachments(self):
+        """Test that Jira attachments already in Drive or attached twice are not parsed."""
+        self.agent.jira_client = MockJiraClient("https://jira.example.com", {})
+        drive_files = [dict(GDRIVE_FILES[0], md5Checksum="drive-hash", size="2048")]
+        tasks = [
+            {"key": "TEST-1", "attachments": [
+                {"id": "a1", "filename": "spec.pdf", "mimeType": "application/pdf", "size": 10, "md5": "drive-hash"},
+                {"id": "a2", "filename": "design.pdf", "mimeType": "application/pdf", "size": 10, "md5": "new-hash"},
+            ]},
+            {"key": "TEST-2", "attachments": [
+                {"id": "a3", "filename": "design copy.pdf", "mimeType": "application/pdf", "size": 10, "md5": "new-hash"},
+                {"id": "a4", "filename": "huge.pdf", "mimeType": "application/pdf", "size": 10 ** 9, "md5": "other"},
+                {"id": "a5", "filename": GDRIVE_FILES[0]["name"], "mimeType": "application/pdf", "size": 2048,
+                 "md5": "unknown"},
+            ]},
+        ]
+        
+        documents = self.agent._collect_documents(drive_files, tasks)
+        
+        names = [document["name"] for document in documents]
+        self.assertEqual(names[0], GDRIVE_FILES[0]["name"])
+        self.assertEqual(len(names), 2)
+        self.assertTrue(names[1] in ("design.pdf (TEST-1)", "design copy.pdf (TEST-2)"))
+        self.assertEqual(self.agent.trace["documents"],
+                         {"drive_files": 1, "jira_attachments": 1, "duplicate_attachments": 3})
+        # The copy of the Drive file is recognized by its name and size, before downloading
+        self.assertEqual(sorted(self.agent.jira_client.downloaded), ["a1", "a2", "a3"])
+        
     def test_error_handling(self):
         """Test error handling during agent execution."""
         # Setup the agent with error mock class
@@ -0,0 +1,322 @@
+"""
+Tests for the Google Drive adapter.
+"""
+
+import hashlib
+import re
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import patch
+import os
+import sys
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.adapters.gdrive import FOLDER_MIME_TYPE, DownloadError, GoogleDriveClient
+
+PDF = "application/pdf"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+class FakeRequest:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self, num_retries=0):
+        return self.response
+
+
+class FakeDrive:
+    """Drive service serving a folder tree, two files per response page."""
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.queries = []
+        self.contents = {}
+        self.ranges = []
+        self.failures = 0
+        self.changes_log = []
+        self.change_queries = []
+        self.lock = threading.Lock()
+
+    def files(self):
+        return self
+
+    def list(self, q, fields, pageSize, pageToken=None, **kwargs):
+        with self.lock:
+            self.queries.append(q)
+
+        match = re.match(r"'([^']+)' in parents", q)
+        if match:
+            items = self.tree.get(match.group(1), [])
+        else:
+            names = re.findall(r"name contains '([^']+)'", q)
+            items = [item for children in self.tree.values() for item in children
+                     if item["mimeType"] == FOLDER_MIME_TYPE and any(name in item["name"] for name in names)]
+
+        mime_types = re.findall(r"mimeType = '([^']+)'", q)
+        if match and mime_types:
+            items = [item for item in items if item["mimeType"] in mime_types]
+
+        start = int(pageToken or 0)
+        response = {"files": items[start:start + 2]}
+        if start + 2 < len(items):
+            response["nextPageToken"] = str(start + 2)
+        return FakeRequest(response)
+    
+    def get_media(self, fileId, **kwargs):
+        return FakeMediaRequest(self, fileId)
+    
+    def changes(self):
+        return FakeChanges(self)
+
+
+class FakeChanges:
+    """Changes resource serving the changes after a numeric page token."""
+
+    def __init__(self, drive):
+        self.drive = drive
+
+    def getStartPageToken(self, **kwargs):
+        return FakeRequest({"startPageToken": str(len(self.drive.changes_log))})
+
+    def list(self, pageToken, **kwargs):
+        self.drive.change_queries.append(pageToken)
+        start = int(pageToken)
+        changes = self.drive.changes_log[start:start + 2]
+        if start + 2 < len(self.drive.changes_log):
+            return FakeRequest({"changes": changes, "nextPageToken": str(start + 2)})
+        return FakeRequest({"changes": changes, "newStartPageToken": str(len(self.drive.changes_log))})
+
+
+class FakeMediaRequest:
+    """Media request serving the requested byte range of a file."""
+
+    def __init__(self, drive, file_id):
+        self.drive = drive
+        self.file_id = file_id
+        self.headers = {}
+
+    def execute(self, num_retries=0):
+        start, end = (int(part) for part in self.headers["Range"][len("bytes="):].split("-"))
+        with self.drive.lock:
+            self.drive.ranges.append((start, end))
+            if self.drive.failures:
+                self.drive.failures -= 1
+                raise ConnectionError("connection reset")
+        return self.drive.contents[self.file_id][start:end + 1]
+
+
+def folder(folder_id, name=None):
+    return {"id": folder_id, "name": name or folder_id, "mimeType": FOLDER_MIME_TYPE}
+
+
+def file(file_id, mime_type=PDF):
+    return {"id": file_id, "name": f"{file_id}.pdf", "mimeType": mime_type}
+
+
+class TestGoogleDriveAdapter(unittest.TestCase):
+    """Test cases for the Google Drive adapter."""
+    
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.test_config = {
+            "file_types": [PDF, DOCX],
+            "max_files_to_fetch": 100,
+            "search_depth": 2
+        }
+        self.tree = {
+            "root": [folder("P-1 Apollo", "Apollo (P-1)")],
+            "P-1 Apollo": [file("a1"), file("a2"), folder("design"), file("image", "image/png"), file("a3", DOCX)],
+            "design": [file("d1"), folder("archive")],
+            "archive": [file("old")],
+        }
+        self.drive = FakeDrive(self.tree)
+        self.build_patcher = patch("src.adapters.gdrive.build", return_value=self.drive)
+        self.build_patcher.start()
+        
+        self.client = GoogleDriveClient(self.test_config)
+    
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+        self.build_patcher.stop()
+    
+    def test_discovers_files_breadth_first(self):
+        """Test that folders are walked up to search_depth with MIME filtering in the query."""
+        files = self.client.get_relevant_files("P-1", "Apollo")
+        
+        self.assertEqual([f["id"] for f in files], ["a1", "a2", "a3", "d1"])
+        folder_queries = [q for q in self.drive.queries if "in parents" in q]
+        self.assertIn(f"mimeType = '{PDF}'", folder_queries[0])
+        self.assertIn("trashed = false", folder_queries[0])
+        # The archive folder is beyond search_depth
+        self.assertFalse(any("'archive' in parents" in q for q in folder_queries))
+    
+    def test_ranks_all_files_before_the_candidate_cap(self):
+        """Test that deeper files compete on relevance for the candidate slots."""
+        self.tree["design"] = [{"id": "deep", "name": "Apollo design.pdf", "mimeType": PDF}]
+        self.client.max_candidates = 2
+        
+        files = self.client.get_relevant_files("P-1", "Apollo")
+        
+        self.assertEqual([f["id"] for f in files], ["deep", "a1"])
+    
+    def test_counts_exports_against_the_byte_budget(self):
+        """Test that Google Docs files count an estimated export size."""
+        self.tree["P-1 Apollo"] = [
+            {"id": "doc1", "name": "one", "mimeType": "application/vnd.google-apps.document"},
+            {"id": "doc2", "name": "two", "mimeType": "application/vnd.google-apps.document"},
+            {"id": "pdf", "name": "three.pdf", "mimeType": PDF, "size": "100"},
+        ]
+        self.client.file_types.append("application/vnd.google-apps.document")
+        self.client.export_size_estimate = 300
+        self.client.max_total_bytes = 450
+        
+        files = self.client.get_relevant_files("P-1", "Apollo")
+        
+        self.assertEqual([f["id"] for f in files], ["doc1", "pdf"])
+    
+    def test_configured_project_folders(self):
+        """Test that configured folders are used without searching."""
+        self.client.config["project_folders"] = {"P-1": "design"}
+        
+        files = self.client.get_relevant_files("P-1")
+        
+        self.assertEqual([f["id"] for f in files], ["d1", "old"])
+        self.assertFalse(any("name contains" in q for q in self.drive.queries))
+    
+    def test_no_project_folder(self):
+        """Test that a project without folders has no files."""
+        self.assertEqual(self.client.get_relevant_files("P-2", "Zeus"), [])
+    
+    def test_selects_relevant_files_within_budget(self):
+        """Test that candidates are ranked by relevance and picked under the byte budgets."""
+        self.tree["P-1 Apollo"] = [
+            {"id": "old", "name": "notes.pdf", "mimeType": PDF, "size": "100", "modifiedTime": "2020-01-01T00:00:00Z"},
+            {"id": "recent", "name": "notes.pdf", "mimeType": PDF, "size": "100",
+             "modifiedTime": datetime.now(timezone.utc).isoformat()},
+            {"id": "named", "name": "Apollo plan.docx", "mimeType": DOCX, "size": "300"},
+            {"id": "huge", "name": "Apollo export.pdf", "mimeType": PDF, "size": "5000"},
+            {"id": "spec", "name": "spec.docx", "mimeType": DOCX, "size": "100"},
+        ]
+        self.client.max_file_bytes = 1000
+        self.client.max_total_bytes = 450
+        self.client.type_weights = {DOCX: 1.2}
+        
+        files = self.client.get_relevant_files("P-1", "Apollo")
+        
+        # The named file comes first, the huge one is too large and spec no longer fits
+        self.assertEqual([f["id"] for f in files], ["named", "recent"])
+        self.client.max_files = 1
+        self.assertEqual([f["id"] for f in self.client.get_relevant_files("P-1", "Apollo")], ["named"])
+    
+    def test_reuses_listing_until_drive_changes(self):
+        """Test that projects are listed again only after changes in their folders."""
+        with tempfile.TemporaryDirectory() as folder_path:
+            self.test_config["changes_state_file"] = os.path.join(folder_path, "changes.json")
+            self.tree["root"].append(folder("P-2 Zeus", "Zeus (P-2)"))
+            self.tree["P-2 Zeus"] = [file("z1")]
+            
+            client = GoogleDriveClient(self.test_config)
+            self.assertEqual([f["id"] for f in client.get_relevant_files("P-1", "Apollo")], ["a1", "a2", "a3", "d1"])
+            client.get_relevant_files("P-2", "Zeus")
+            
+            # A new client reads the persisted listings and token
+            self.drive.changes_log += [
+                {"fileId": "x", "file": {"id": "x", "parents": ["unrelated"]}},
+                {"fileId": "new", "file": {"id": "new", "parents": ["design"]}},
+                {"fileId": "other", "removed": True},
+            ]
+            self.tree["design"].insert(0, file("new"))
+            self.drive.queries.clear()
+            
+            client = GoogleDriveClient(self.test_config)
+            self.assertEqual(client.changed_projects(["P-1", "P-2", "P-3"]), ["P-1", "P-3"])
+            self.assertEqual([f["id"] for f in client.get_relevant_files("P-2", "Zeus")], ["z1"])
+            self.assertEqual(self.drive.queries, [])
+            
+            self.assertEqual([f["id"] for f in client.get_relevant_files("P-1", "Apollo")],
+                             ["a1", "a2", "a3", "new", "d1"])
+            self.assertEqual(self.drive.change_queries, ["0", "0", "2", "3", "3"])
+    
+    def _content(self, size=1000):
+        content = bytes(i % 251 for i in range(size))
+        self.drive.contents["big"] = content
+        self.client.chunk_size = 300
+        self.client.sleep = lambda delay: None
+        metadata = {"id": "big", "name": "big.pdf", "mimeType": PDF, "size": str(size),
+                    "md5Checksum": hashlib.md5(content).hexdigest()}
+        return content, metadata
+    
+    def test_downloads_ranges_in_parallel(self):
+        """Test that a file is assembled from range requests and retried chunks."""
+        content, metadata = self._content()
+        self.drive.failures = 1
+        
+        with tempfile.TemporaryDirectory() as folder_path:
+            path = self.client.download_file("big", folder_path, metadata)
+            
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), content)
+            self.assertEqual(os.listdir(folder_path), ["big.pdf"])
+        
+        self.assertEqual(sorted(set(self.drive.ranges)), [(0, 299), (300, 599), (600, 899), (900, 999)])
+        self.assertEqual(bytes(self.client.download_bytes("big", metadata)), content)
+    
+    def test_resumes_interrupted_download(self):
+        """Test that only the chunks missing after an interruption are fetched again, by a later run."""
+        content, metadata = self._content()
+        self.client.download_workers = 1
+        self.client.download_retries = 0
+        
+        with tempfile.TemporaryDirectory() as download_dir, tempfile.TemporaryDirectory() as folder_path:
+            self.client.download_dir = download_dir
+            original = self.drive.get_media
+            calls = []
+            
+            def interrupt_third(fileId, **kwargs):
+                calls.append(fileId)
+                if len(calls) == 3:
+                    raise ValueError("interrupted")
+                return original(fileId, **kwargs)
+            
+            # Each run downloads into its own temporary folder
+            with patch.object(self.drive, "get_media", interrupt_third), tempfile.TemporaryDirectory() as run_path:
+                with self.assertRaises(ValueError):
+                    self.client.download_file("big", run_path, metadata)
+            
+            self.drive.ranges.clear()
+            path = self.client.download_file("big", folder_path, metadata)
+            
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), content)
+            self.assertEqual(self.drive.ranges, [(600, 899), (900, 999)])
+            self.assertEqual(os.listdir(download_dir), [])
+    
+    def test_downloads_without_pwrite(self):
+        """Test that chunks are written at their offsets where os.pwrite is missing, as on Windows."""
+        content, metadata = self._content()
+        
+        with tempfile.TemporaryDirectory() as folder_path, patch.dict(os.__dict__):
+            del os.__dict__["pwrite"]
+            path = self.client.download_file("big", folder_path, metadata)
+            
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), content)
+        
+    def test_rejects_checksum_mismatch(self):
+        """Test that a corrupted download raises and leaves no partial file."""
+        content, metadata = self._content()
+        metadata["md5Checksum"] = "0" * 32
+        
+        with tempfile.TemporaryDirectory() as folder_path:
+            with self.assertRaises(DownloadError):
+                self.client.download_file("big", folder_path, metadata)
+            self.assertEqual(os.listdir(folder_path), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
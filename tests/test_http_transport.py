@@ -0,0 +1,276 @@
+"""
+Tests for the shared HTTP transport.
+"""
+
+import gzip
+import http.client
+import importlib.util
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import sys
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.utils.http import HttpTransport, Httplib2Adapter, get_shared_transport, httpx_client, requests_session
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Request handler whose behaviour is selected by the path."""
+
+    protocol_version = "HTTP/1.1"
+    failures = {}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/gzip":
+            body = b"compressible " * 200
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                return self._reply(200, gzip.compress(body), {"Content-Encoding": "gzip"})
+            return self._reply(200, body)
+        if path.startswith("/flaky"):
+            with self.lock:
+                remaining = self.failures.get(path, 0)
+                self.failures[path] = remaining - 1
+            if remaining > 0:
+                return self._reply(503, b"busy", {"Retry-After": "2"})
+            return self._reply(200, b"recovered")
+        if path == "/throttled":
+            with self.lock:
+                remaining = self.failures.get(path, 0)
+                self.failures[path] = remaining - 1
+            if remaining > 0:
+                return self._reply(429, b"later", {"Retry-After": "3600"})
+            return self._reply(200, b"recovered")
+        if path == "/slow":
+            time.sleep(0.05)
+        if path == "/close":
+            # Keep-alive is not refused, but the connection is closed anyway
+            self._reply(200, b"bye")
+            self.close_connection = True
+            return
+        if path == "/redirect":
+            return self._reply(303, b"", {"Location": "/target"})
+        if path == "/elsewhere":
+            # The same server under another host name is another origin
+            return self._reply(302, b"", {"Location": f"http://localhost:{self.server.server_port}/file"})
+        if path == "/moved":
+            return self._reply(301, b"", {"Location": "/file"})
+        if path == "/encoding-gzip":
+            # Compressed the way the client asks for
+            encoding = self.headers.get("Accept-Encoding", "")
+            if "br" in encoding or "gzip" not in encoding:
+                return self._reply(200, encoding.encode())
+            return self._reply(200, gzip.compress(b"line one\nline two"), {"Content-Encoding": "gzip"})
+        if path == "/encoding":
+            return self._reply(200, self.headers.get("Accept-Encoding", "").encode())
+        if path == "/file":
+            return self._reply(200, self.headers.get("Authorization", "anonymous").encode() * 1000)
+        return self._reply(200, path.encode())
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._reply(500, b"error")
+
+    def _reply(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHttpTransport(unittest.TestCase):
+    """Test cases for the shared HTTP transport."""
+
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        Handler.failures = {}
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, args=(0.01,), daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_port}"
+        self.host = f"127.0.0.1:{self.server.server_port}"
+
+        self.delays = []
+        self.transport = HttpTransport(max_connections_per_host=2, sleep=self.delays.append)
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+        self.transport.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_reuses_keep_alive_connections(self):
+        """Test that sequential requests to a host share one connection."""
+        for _ in range(3):
+            self.assertEqual(self.transport.request("GET", f"{self.base}/a").content, b"/a")
+
+        stats = self.transport.stats()[self.host]
+        self.assertEqual(stats["connections_created"], 1)
+        self.assertEqual(stats["connections_reused"], 2)
+        self.assertEqual(stats["idle"], 1)
+
+    def test_decodes_compressed_responses(self):
+        """Test that gzip responses are requested and decoded."""
+        response = self.transport.request("GET", f"{self.base}/gzip")
+
+        self.assertEqual(response.content, b"compressible " * 200)
+        self.assertNotIn("content-encoding", response.headers)
+        stats = self.transport.stats()[self.host]
+        self.assertLess(stats["bytes_received"], stats["bytes_decoded"])
+
+    def test_retries_with_retry_after(self):
+        """Test that retryable statuses are retried after the delay the server asks for."""
+        Handler.failures = {"/flaky": 2}
+
+        response = self.transport.request("GET", f"{self.base}/flaky")
+
+        self.assertEqual(response.content, b"recovered")
+        self.assertEqual(self.delays, [2.0, 2.0])
+        self.assertEqual(self.transport.stats()[self.host]["retries"], 2)
+
+    def test_caps_retry_after(self):
+        """Test that a Retry-After longer than the maximum backoff is capped."""
+        Handler.failures = {"/throttled": 1}
+
+        self.assertEqual(self.transport.request("GET", f"{self.base}/throttled").content, b"recovered")
+        self.assertEqual(self.delays, [30.0])
+
+    def test_returns_final_status_without_retrying_posts(self):
+        """Test that server errors of non-idempotent requests are returned as is."""
+        response = self.transport.request("POST", f"{self.base}/append", body='{"a": 1}')
+
+        self.assertEqual(response.status, 500)
+        self.assertEqual(self.delays, [])
+
+    def test_bounds_connections_per_host(self):
+        """Test that concurrent requests wait for one of the pooled connections."""
+        threads = [threading.Thread(target=self.transport.request, args=("GET", f"{self.base}/slow"))
+                   for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = self.transport.stats()[self.host]
+        self.assertEqual(stats["requests"], 6)
+        self.assertEqual(stats["max_in_use"], 2)
+        self.assertLessEqual(stats["connections_created"], 2)
+        self.assertEqual(stats["utilization"], 1.0)
+        self.assertEqual(stats["in_use"], 0)
+
+    def test_replaces_connections_closed_by_the_server(self):
+        """Test that a request on a connection the server closed is sent again on a new one."""
+        self.transport.request("GET", f"{self.base}/close")
+        time.sleep(0.05)
+
+        response = self.transport.request("GET", f"{self.base}/after")
+
+        self.assertEqual(response.content, b"/after")
+        stats = self.transport.stats()[self.host]
+        self.assertEqual(stats["connections_created"], 2)
+        self.assertEqual(stats["stale_connections"], 1)
+
+    def test_does_not_replay_posts_on_closed_connections(self):
+        """Test that a request that cannot be repeated is not sent again after the connection was closed."""
+        self.transport.request("GET", f"{self.base}/close")
+        time.sleep(0.05)
+
+        with self.assertRaises((OSError, http.client.HTTPException)):
+            self.transport.request("POST", f"{self.base}/append", body='{"a": 1}')
+        self.assertEqual(self.transport.stats()[self.host]["stale_connections"], 0)
+
+    def test_without_retries(self):
+        """Test that requests of callers retrying on their own are sent once."""
+        Handler.failures = {"/flaky": 1}
+
+        with self.transport.without_retries():
+            self.assertEqual(self.transport.request("GET", f"{self.base}/flaky").status, 503)
+        self.assertEqual(self.delays, [])
+
+        Handler.failures = {"/flaky": 1}
+        self.assertEqual(self.transport.request("GET", f"{self.base}/flaky").status, 200)
+        self.assertEqual(self.delays, [2.0])
+
+    def test_range_requests_are_not_compressed(self):
+        """Test that byte ranges are requested of the uncompressed body."""
+        self.assertEqual(self.transport.request("GET", f"{self.base}/encoding").content, b"gzip, deflate")
+        response = self.transport.request("GET", f"{self.base}/encoding", headers={"Range": "bytes=0-9"})
+        self.assertEqual(response.content, b"identity")
+
+    def test_httplib2_adapter_follows_redirects(self):
+        """Test the httplib2 interface used by the Drive service."""
+        response, content = Httplib2Adapter(self.transport).request(f"{self.base}/redirect")
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response["status"], "200")
+        self.assertEqual(content, b"/target")
+
+    def test_httplib2_adapter_drops_credentials_on_redirects_to_other_origins(self):
+        """Test that credentials are only sent on after a redirect to the same origin."""
+        adapter = Httplib2Adapter(self.transport)
+
+        _, content = adapter.request(f"{self.base}/moved", headers={"Authorization": "secret"})
+        self.assertEqual(content, b"secret" * 1000)
+        _, content = adapter.request(f"{self.base}/elsewhere", headers={"authorization": "secret"})
+        self.assertEqual(content, b"anonymous" * 1000)
+
+    def test_streams_downloads_without_credentials_to_other_origins(self):
+        """Test that downloads are written in chunks, uncompressed, without leaking credentials on redirect."""
+        chunks = []
+        response = self.transport.download(f"{self.base}/file", chunks.append,
+                                           headers={"Authorization": "secret"}, chunk_size=1024)
+
+        self.assertEqual(response.status, 200)
+        self.assertEqual(b"".join(chunks), b"secret" * 1000)
+        self.assertGreater(len(chunks), 1)
+
+        chunks = []
+        self.transport.download(f"{self.base}/elsewhere", chunks.append, headers={"Authorization": "secret"})
+        self.assertEqual(b"".join(chunks), b"anonymous" * 1000)
+
+    @unittest.skipUnless(importlib.util.find_spec("requests"), "requests is not installed")
+    def test_requests_session(self):
+        """Test the requests interface used by the Jira SDK, including streaming reads of the body."""
+        session = requests_session(self.transport)
+        session.headers["Accept-Encoding"] = "gzip, deflate, br"
+
+        response = session.get(f"{self.base}/encoding-gzip")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.iter_content(4)), b"line one\nline two")
+
+        response = session.get(f"{self.base}/encoding-gzip", stream=True)
+        self.assertEqual(list(response.iter_lines()), [b"line one", b"line two"])
+        self.assertEqual(response.content, b"line one\nline two")
+
+    @unittest.skipUnless(importlib.util.find_spec("httpx"), "httpx is not installed")
+    def test_httpx_client(self):
+        """Test the httpx interface used by the Notion SDK."""
+        client = httpx_client(self.transport)
+
+        response = client.get(f"{self.base}/encoding-gzip", headers={"Accept-Encoding": "gzip, br"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"line one\nline two")
+        self.assertEqual(self.transport.stats()[self.host]["requests"], 1)
+
+    def test_shared_transport(self):
+        """Test that the first configuration creates the process-wide transport."""
+        transport = get_shared_transport({"read_timeout": 5})
+
+        self.assertIs(get_shared_transport({"read_timeout": 99}), transport)
+        self.assertIs(get_shared_transport(), transport)
+        self.assertEqual(transport.read_timeout, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
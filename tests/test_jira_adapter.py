@@ -0,0 +1,349 @@
+"""
+Tests for the Jira adapter.
+"""
+
+import hashlib
+import re
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+import os
+import sys
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.adapters.jira import DownloadError, JiraClient, build_jql
+from src.adapters.jira_adf import adf_to_markdown
+
+
+def text(value, *marks):
+    node = {"type": "text", "text": value}
+    if marks:
+        node["marks"] = [{"type": mark} if isinstance(mark, str) else mark for mark in marks]
+    return node
+
+
+def paragraph(*content):
+    return {"type": "paragraph", "content": list(content)}
+
+
+def item(*content):
+    return {"type": "listItem", "content": list(content)}
+
+
+def issue(number, **fields):
+    fields.setdefault("summary", f"Issue {number}")
+    fields.setdefault("status", {"name": "Done", "statusCategory": {"name": "Done"}})
+    return {"key": f"APO-{number}", "id": str(1000 + number), "fields": fields}
+
+
+class FakeJira:
+    """Jira client serving search windows of a fixed list of issues."""
+
+    issues = []
+    calls = []
+    changelogs = {}
+    posts = []
+    lock = threading.Lock()
+
+    def __init__(self, url, **kwargs):
+        self.url = url
+
+    def jql(self, jql, fields="*all", start=0, limit=None, **kwargs):
+        with self.lock:
+            self.calls.append({"jql": jql, "fields": fields, "start": start, "limit": limit})
+
+        issues = self.issues
+        if "order by updated desc, key desc" in jql:
+            issues = sorted(issues, key=lambda issue: (issue["fields"].get("updated", ""), int(issue["id"])),
+                            reverse=True)
+        match = re.search(r'updated >= "([^"]+)"', jql)
+        if match:
+            since = datetime.strptime(match.group(1), "%Y/%m/%d %H:%M").strftime("%Y-%m-%dT%H:%M")
+            issues = [issue for issue in issues if issue["fields"]["updated"] >= since]
+        return {"startAt": start, "total": len(issues), "issues": issues[start:start + limit]}
+
+    def post(self, path, data=None, **kwargs):
+        with self.lock:
+            self.posts.append(data)
+        logs = [{"issueId": issue_id, "changeHistories": self.changelogs[issue_id]}
+                for issue_id in data["issueIdsOrKeys"] if issue_id in self.changelogs]
+        # One changelog per page
+        start = int(data.get("nextPageToken", 0))
+        response = {"issueChangeLogs": logs[start:start + 1]}
+        if start + 1 < len(logs):
+            response["nextPageToken"] = str(start + 1)
+        return response
+
+
+class FakeTransport:
+    """Transport streaming a fixed body in chunks."""
+
+    def __init__(self, status=200):
+        self.status = status
+        self.requests = []
+
+    def download(self, url, write, headers=None, **kwargs):
+        self.requests.append((url, headers))
+        if self.status == 200:
+            for chunk in (b"first ", b"second"):
+                write(chunk)
+        return SimpleNamespace(status=self.status, reason="Not Found")
+
+
+class TestJiraAdapter(unittest.TestCase):
+    """Test cases for the Jira adapter."""
+
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.test_config = {
+            "include_statuses": ["Done", "Won't \"Do\""],
+            "exclude_labels": ["duplicate"],
+            "max_issues_to_fetch": 25,
+            "page_size": 10
+        }
+        FakeJira.issues = [issue(number) for number in range(1, 31)]
+        FakeJira.calls = []
+        FakeJira.changelogs = {}
+        FakeJira.posts = []
+        self.jira_patcher = patch("src.adapters.jira.Jira", FakeJira)
+        self.jira_patcher.start()
+
+        self.client = JiraClient("https://acme.atlassian.net/browse/APO-7", self.test_config)
+
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+        self.jira_patcher.stop()
+
+    def test_build_jql(self):
+        """Test that status and label filters are compiled into the query."""
+        self.assertEqual(
+            build_jql("APO", ["Done", 'Won\'t "Do"'], ["duplicate"]),
+            'project = "APO" and status in ("Done", "Won\'t \\"Do\\"") '
+            'and (labels is EMPTY or labels not in ("duplicate")) order by updated desc, key desc'
+        )
+        self.assertEqual(build_jql("APO", [], []), 'project = "APO" order by updated desc, key desc')
+
+    def test_fetches_windows_up_to_max_issues(self):
+        """Test that the pages after the first one are fetched up to max_issues_to_fetch, newest first."""
+        tasks = self.client.get_project_issues("ignored")
+
+        self.assertEqual(self.client.url, "https://acme.atlassian.net")
+        self.assertEqual([task["key"] for task in tasks], [f"APO-{number}" for number in range(30, 5, -1)])
+        self.assertEqual(sorted((call["start"], call["limit"]) for call in FakeJira.calls),
+                         [(0, 10), (10, 10), (20, 5)])
+        self.assertTrue(all(call["jql"].startswith('project = "APO"') for call in FakeJira.calls))
+        self.assertNotIn("comment", FakeJira.calls[0]["fields"])
+
+    def test_converts_issue_fields(self):
+        """Test that issues are converted to the task data of the summarizer."""
+        FakeJira.issues = [issue(
+            1,
+            issuetype={"name": "Story"},
+            priority={"name": "High"},
+            description={"type": "doc", "version": 1, "content": [paragraph(text("Ship it", "em"))]},
+            assignee={"displayName": "Ada"},
+            created="2024-01-01T10:00:00.000+0000",
+            resolutiondate="2024-01-05T10:00:00.000+0000",
+            parent={"key": "APO-100", "fields": {"summary": "Checkout", "issuetype": {"name": "Epic"}}},
+            attachment=[{"id": "10", "filename": "spec.pdf", "mimeType": "application/pdf", "size": 42,
+                         "content": "https://acme.atlassian.net/rest/api/3/attachment/content/10"}]
+        )]
+
+        task = self.client.get_project_issues("APO")[0]
+
+        self.assertEqual(task["issue_type"], {"name": "Story"})
+        self.assertEqual(task["status"], {"name": "Done", "category": "Done"})
+        self.assertEqual(task["assignee"], {"name": "Ada"})
+        self.assertEqual(task["description"], "*Ship it*")
+        self.assertEqual(task["epic"], {"key": "APO-100", "name": "Checkout"})
+        self.assertEqual(task["resolved"], "2024-01-05T10:00:00.000+0000")
+        self.assertEqual(task["attachments"][0]["filename"], "spec.pdf")
+        self.assertIn("attachment", FakeJira.calls[0]["fields"])
+        self.assertEqual(len(FakeJira.calls), 1)
+
+    def test_serves_issues_from_synced_store(self):
+        """Test that later runs only fetch the issues updated since the watermark."""
+        FakeJira.issues = [issue(number, updated=f"2024-01-{number:02d}T10:00:00.000+0000",
+                                 labels=["duplicate"] if number == 3 else [])
+                           for number in range(1, 13)]
+        FakeJira.issues[4]["fields"]["status"] = {"name": "In Progress"}
+
+        with tempfile.TemporaryDirectory() as store_dir:
+            self.test_config["store_dir"] = store_dir
+            client = JiraClient("https://acme.atlassian.net/browse/APO", self.test_config)
+
+            keys = [task["key"] for task in client.get_project_issues("APO")]
+            self.assertEqual(keys, [f"APO-{number}" for number in (12, 11, 10, 9, 8, 7, 6, 4, 2, 1)])
+            # The store holds the whole project, filters are applied locally
+            self.assertNotIn("status in", FakeJira.calls[0]["jql"])
+
+            FakeJira.calls = []
+            FakeJira.issues[4]["fields"].update(status={"name": "Done"}, updated="2024-01-20T08:00:00.000+0000")
+            client = JiraClient("https://acme.atlassian.net/browse/APO", self.test_config)
+
+            keys = [task["key"] for task in client.get_project_issues("APO")]
+            self.assertEqual(keys[0], "APO-5")
+            self.assertEqual(len(FakeJira.calls), 1)
+            self.assertIn('updated >= "2024/01/11 10:00"', FakeJira.calls[0]["jql"])
+            self.assertEqual(client.sync_project("APO"), 1)
+            self.assertTrue(os.path.exists(os.path.join(store_dir, "acme.atlassian.net.sqlite3")))
+            client.store.close()
+
+    def test_reconciles_deleted_and_moved_issues(self):
+        """Test that stored issues no longer in the project are removed."""
+        FakeJira.issues = [issue(number, updated=f"2024-01-{number:02d}T10:00:00.000+0000")
+                           for number in range(1, 6)]
+        
+        with tempfile.TemporaryDirectory() as store_dir:
+            self.test_config.update(store_dir=store_dir, reconcile_hours=0)
+            client = JiraClient("https://acme.atlassian.net/browse/APO", self.test_config)
+            self.assertEqual(len(client.get_project_issues("APO")), 5)
+            
+            # APO-2 is deleted and APO-4 moved to another project
+            del FakeJira.issues[3]
+            del FakeJira.issues[1]
+            FakeJira.calls = []
+            client = JiraClient("https://acme.atlassian.net/browse/APO", self.test_config)
+            
+            keys = [task["key"] for task in client.get_project_issues("APO")]
+            self.assertEqual(keys, ["APO-5", "APO-3", "APO-1"])
+            self.assertEqual([call["fields"] for call in FakeJira.calls][-1], "key")
+            client.store.close()
+    
+    def test_attaches_bulk_status_changelogs(self):
+        """Test that status changes are fetched in bulk batches and attached to the issues."""
+        FakeJira.changelogs = {
+            "1030": [{"created": "2024-01-03T10:00:00.000+0000", "items": [
+                {"fieldId": "status", "fromString": "To Do", "toString": "In Progress"}]}],
+            "1029": [
+                {"created": "2024-01-05T10:00:00.000+0000", "items": [
+                    {"fieldId": "status", "fromString": "In Progress", "toString": "Done"},
+                    {"fieldId": "assignee", "fromString": None, "toString": "Ada"}]},
+                {"created": "2024-01-02T10:00:00.000+0000", "items": [
+                    {"fieldId": "status", "fromString": "To Do", "toString": "In Progress"}]},
+            ],
+        }
+
+        with patch("src.adapters.jira.CHANGELOG_BATCH_SIZE", 10):
+            tasks = self.client.get_project_issues("APO")
+
+        self.assertEqual([change["to"] for change in tasks[1]["status_changes"]], ["In Progress", "Done"])
+        self.assertEqual(tasks[0]["status_changes"][0]["at"], "2024-01-03T10:00:00.000+0000")
+        self.assertEqual(tasks[2]["status_changes"], [])
+        # Three batches of ten issues, the first one in two pages
+        self.assertEqual(len(FakeJira.posts), 4)
+        self.assertEqual(FakeJira.posts[0]["fieldIds"], ["status"])
+
+    def test_streams_attachments_to_disk(self):
+        """Test that attachments are written and hashed chunk by chunk."""
+        self.client.transport = FakeTransport()
+        attachment = {"id": "10", "filename": "spec.pdf", "url": ""}
+
+        with tempfile.TemporaryDirectory() as folder:
+            file_path, md5 = self.client.download_attachment(attachment, folder)
+            with open(file_path, "rb") as f:
+                self.assertEqual(f.read(), b"first second")
+
+            self.client.transport = FakeTransport(status=404)
+            with self.assertRaises(DownloadError):
+                self.client.download_attachment(dict(attachment, id="11"), folder)
+            self.assertEqual(os.listdir(folder), ["jira-10.pdf"])
+
+        self.assertEqual(md5, hashlib.md5(b"first second").hexdigest())
+        url, headers = self.client.transport.requests[0]
+        self.assertEqual(url, "https://acme.atlassian.net/rest/api/3/attachment/content/11")
+        self.assertTrue(headers["Authorization"].startswith("Basic "))
+
+
+class TestAdfMarkdown(unittest.TestCase):
+    """Test cases for the conversion of ADF documents to markdown."""
+
+    def test_inline_marks_and_nodes(self):
+        """Test formatting marks, links and inline nodes."""
+        document = {"type": "doc", "version": 1, "content": [
+            {"type": "heading", "attrs": {"level": 2}, "content": [text("Goal")]},
+            paragraph(
+                text("Ship "), text("fast", "strong"), text(" with "), text("x = 1", "code", "strong"),
+                {"type": "hardBreak"},
+                text("docs", {"type": "link", "attrs": {"href": "https://example.com"}}),
+                text(" by "), {"type": "mention", "attrs": {"id": "42", "text": "@Ada"}},
+                text(" "), {"type": "status", "attrs": {"text": "BLOCKED"}},
+                text(" "), {"type": "date", "attrs": {"timestamp": "1704067200000"}}
+            ),
+        ]}
+
+        self.assertEqual(adf_to_markdown(document), "## Goal\n\nShip **fast** with `x = 1`\n"
+                                                    "[docs](https://example.com) by @Ada [BLOCKED] 2024-01-01")
+
+    def test_nested_lists_quotes_and_tasks(self):
+        """Test numbering and indentation of nested blocks."""
+        document = {"type": "doc", "content": [
+            {"type": "bulletList", "content": [
+                item(paragraph(text("One")), {"type": "orderedList", "attrs": {"order": 3}, "content": [
+                    item(paragraph(text("Three"))), item(paragraph(text("Four"), {"type": "hardBreak"}, text("more")))
+                ]}),
+                item(paragraph(text("Two"))),
+            ]},
+            {"type": "blockquote", "content": [paragraph(text("Quoted"))]},
+            {"type": "taskList", "content": [
+                {"type": "taskItem", "attrs": {"state": "DONE"}, "content": [text("Done")]},
+                {"type": "taskItem", "attrs": {"state": "TODO"}, "content": [text("Open")]},
+            ]},
+            {"type": "rule"},
+        ]}
+
+        self.assertEqual(adf_to_markdown(document), "\n\n".join([
+            "- One", "  3. Three", "  4. Four\n     more", "- Two", "> Quoted", "- [x] Done", "- [ ] Open", "---"
+        ]))
+
+    def test_list_items_starting_with_nested_blocks(self):
+        """Test that the marker of a list item is kept when its first block is a list or a quote."""
+        document = {"type": "doc", "content": [
+            {"type": "bulletList", "content": [
+                item({"type": "bulletList", "content": [
+                    item(paragraph(text("nested-first"))), item(paragraph(text("nested-second")))
+                ]}, paragraph(text("after"))),
+                item({"type": "blockquote", "content": [paragraph(text("Quoted"))]}),
+                item({"type": "expand", "attrs": {"title": "Details"}, "content": [paragraph(text("inside"))]}),
+                item({"type": "expand", "content": [paragraph(text("untitled"))]}),
+                item({"type": "unknownBlock", "content": [text("weird"), {"type": "hardBreak"}, text("lines")]}),
+            ]},
+        ]}
+
+        self.assertEqual(adf_to_markdown(document), "\n\n".join([
+            "- - nested-first", "  - nested-second", "  after", "- > Quoted", "- **Details**", "  inside",
+            "- untitled", "- weird\n  lines"
+        ]))
+
+    def test_code_table_and_plain_strings(self):
+        """Test code blocks, tables and non-ADF values."""
+        cell = lambda kind, value: {"type": kind, "content": [paragraph(text(value))]}
+        document = {"type": "doc", "content": [
+            {"type": "codeBlock", "attrs": {"language": "python"}, "content": [text("print(1)\nprint(2)")]},
+            {"type": "table", "content": [
+                {"type": "tableRow", "content": [cell("tableHeader", "Name"), cell("tableHeader", "Owner")]},
+                {"type": "tableRow", "content": [cell("tableCell", "API"), cell("tableCell", "a|b")]},
+            ]},
+        ]}
+
+        self.assertEqual(adf_to_markdown(document), "```python\nprint(1)\nprint(2)\n```\n\n"
+                                                    "| Name | Owner |\n| --- | --- |\n| API | a\\|b |")
+        self.assertEqual(adf_to_markdown("plain"), "plain")
+        self.assertEqual(adf_to_markdown(None), "")
+
+    def test_deep_nesting_does_not_recurse(self):
+        """Test that deeply nested documents are converted without recursion."""
+        node = paragraph(text("Deep"))
+        for _ in range(5000):
+            node = {"type": "blockquote", "content": [node]}
+
+        self.assertTrue(adf_to_markdown({"type": "doc", "content": [node]}).endswith("> Deep"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,10 +2,14 @@
 Tests for the LLM summarizer.
 """
 
+import json
+import re
 import unittest
 from unittest.mock import MagicMock, patch
 import os
 import sys
+import tempfile
+import threading
 
 # Add the parent directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -23,6 +27,20 @@ from tests.data.mock_data import NOTION_PAGE, GDRIVE_FILES, JIRA_TASKS
 
 # Now that we've set up mocks, we can import the module
 from src.summarizers.llm import LLMSummarizer
+from src.summarizers.backends import ChainBackend, RecordingBackend, ReplayBackend, ReplayMissError
+from src.summarizers.batching import PromptBatcher
+from src.summarizers.clustering import cluster_texts
+from src.summarizers.dag import SectionGraph
+from src.summarizers.retrieval import BM25Index
+from src.summarizers.scheduler import LLMScheduler, TokenBucket, get_shared_scheduler
+
+
+def fake_llm_response(prompt):
+    """Answer batched prompts with valid JSON and other prompts with plain text."""
+    item_ids = re.findall(r"^### Item (\S+)$", prompt, re.MULTILINE)
+    if item_ids:
+        return json.dumps({item_id: f"Summary of item {item_id}" for item_id in item_ids})
+    return "Test summary content"
 
 
 class TestLLMSummarizer(unittest.TestCase):
@@ -82,6 +100,7 @@ class TestLLMSummarizer(unittest.TestCase):
             {
                 "key": "TEST-1",
                 "summary": "Test task",
+                "description": "Rollout is blocked by an open risk",
                 "issue_type": {"name": "Task"},
                 "status": {"name": "Done"}
             }
@@ -121,6 +140,96 @@ class TestLLMSummarizer(unittest.TestCase):
         self.assertIn("Project Summary: TEST-123", result)
         self.assertIn("Generated on:", result)
         
+    def test_stream_summary(self):
+        """Test that the summary is streamed section by section."""
+        test_data = {
+            "notion_data": self.notion_data,
+            "drive_documents": self.drive_documents,
+            "jira_tasks": self.jira_tasks,
+            "project_id": "TEST-123"
+        }
+        
+        # Topic sections are opt-in
+        self.assertEqual(len(list(self.summarizer.stream_summary(test_data))), 5)
+        
+        self.summarizer.topic_sections = {
+            "Decisions": "decision decisions decided chose choice tradeoff",
+            "Risks and Open Issues": "risk risks issue issues problem blocker open question limitation",
+        }
+        sections = list(self.summarizer.stream_summary(test_data))
+        
+        # Header, one section per source, the retrieved topics and the overview
+        self.assertEqual(len(sections), 6)
+        self.assertIn("Project Summary: TEST-123", sections[0])
+        self.assertTrue(sections[1].startswith("# Project Overview"))
+        self.assertTrue(sections[2].startswith("# Project Documents"))
+        self.assertTrue(sections[3].startswith("# Project Tasks"))
+        self.assertTrue(sections[4].startswith("# Risks and Open Issues"))
+        self.assertIn("- Jira: TEST-1", sections[4])
+        self.assertTrue(sections[5].startswith("# Executive Summary"))
+        
+        # Every node of the section graph is timed
+        self.assertIn("jira", self.summarizer.section_timings)
+        self.assertIn("overview", self.summarizer.section_timings)
+        
+    def test_summarize_notion_databases(self):
+        """Test that records of linked databases are listed in the overview."""
+        notion_data = dict(self.notion_data, databases=[{"id": "db1", "title": "Decisions", "records": [
+            {"id": "row1", "title": "Use PostgreSQL", "url": "", "properties": {"Status": "Accepted"}}
+        ]}])
+        
+        result = self.summarizer._summarize_notion_data(notion_data)
+        
+        self.assertIn("### Decisions\n\n- Use PostgreSQL (Status: Accepted)", result)
+        
+    def test_summary_tree_reuses_unchanged_nodes(self):
+        """Test that regeneration only re-runs nodes on the path of a change."""
+        chain = self.mock_llm_chain.return_value
+        chain.run.side_effect = fake_llm_response
+        documents = [
+            {"id": "doc1", "name": "Doc 1", "content": "First document"},
+            {"id": "doc2", "name": "Doc 2", "content": "Second document"}
+        ]
+        
+        with tempfile.TemporaryDirectory() as cache_dir:
+            summarizer = LLMSummarizer(dict(self.test_config, tree_cache_dir=cache_dir))
+            list(summarizer.stream_summary({"drive_documents": documents, "project_id": "TREE-1"}))
+            
+            # One batched prompt for both chunks and the drive section;
+            # the root has a single child
+            self.assertEqual(chain.run.call_count, 2)
+            
+            # A fresh summarizer reuses the persisted tree
+            chain.run.reset_mock()
+            summarizer = LLMSummarizer(dict(self.test_config, tree_cache_dir=cache_dir))
+            list(summarizer.stream_summary({"drive_documents": documents, "project_id": "TREE-1"}))
+            self.assertEqual(chain.run.call_count, 0)
+            
+            # Changing one document only re-runs its leaf and the section
+            documents[1] = dict(documents[1], content="Second document, revised")
+            list(summarizer.stream_summary({"drive_documents": documents, "project_id": "TREE-1"}))
+            self.assertEqual(chain.run.call_count, 2)
+        
+    def test_retrieval_index_is_persisted(self):
+        """Test that the retrieval index is reused while the content is unchanged."""
+        test_data = {
+            "notion_data": self.notion_data,
+            "drive_documents": self.drive_documents,
+            "project_id": "INDEX-1"
+        }
+        
+        with tempfile.TemporaryDirectory() as index_dir:
+            summarizer = LLMSummarizer(dict(self.test_config, index_dir=index_dir))
+            index = summarizer._load_index(test_data)
+            self.assertEqual(len(index), 2)
+            self.assertTrue(os.path.exists(os.path.join(index_dir, "INDEX-1.json.gz")))
+            
+            with patch.object(BM25Index, "add") as mock_add:
+                reloaded = summarizer._load_index(test_data)
+                mock_add.assert_not_called()
+            self.assertEqual(reloaded.fingerprint, index.fingerprint)
+            self.assertEqual(reloaded.search("paragraph")[0][1]["source"], "Notion")
+        
     def test_summarize_notion_data(self):
         """Test summarization of Notion data."""
         result = self.summarizer._summarize_notion_data(self.notion_data)
@@ -147,6 +256,108 @@ class TestLLMSummarizer(unittest.TestCase):
         self.assertIn("## Task", result)
         self.assertIn("[TEST-1]", result)
         
+    def test_summarize_jira_digest(self):
+        """Test the bounded digest for large numbers of Jira tasks."""
+        tasks = []
+        for i in range(300):
+            tasks.append({
+                "key": f"BIG-{i}",
+                "summary": f"Task {i}",
+                "issue_type": {"name": "Bug" if i % 3 == 0 else "Task"},
+                "status": {"name": "Done"},
+                "priority": {"name": "Critical" if i == 7 else "Medium"},
+                "assignee": {"name": f"User {i % 15}"},
+                "epic": {"key": "EPIC-1", "name": "Checkout"} if i % 2 else None,
+                "created": "2023-01-01T00:00:00.000Z",
+                "resolved": f"2023-01-{1 + i % 28:02d}T00:00:00.000+0000"
+            })
+        
+        result = self.summarizer._summarize_jira_tasks(tasks)
+        
+        self.assertIn("300 issues in total.", result)
+        self.assertIn("- Task: 200 (67%)", result)
+        self.assertIn("- Bug: 100 (33%)", result)
+        self.assertIn("- ... and 5 more", result)
+        self.assertIn("- Checkout: 150 issues", result)
+        self.assertIn("Median: 13.0 days", result)
+        self.assertNotIn("## Task", result)
+        
+        # Only the notable issues are listed, most urgent first
+        notable = result.split("## Notable Issues\n")[1].strip().splitlines()
+        self.assertEqual(len(notable), 20)
+        self.assertTrue(notable[0].startswith("- [BIG-7]"))
+        
+    def test_summarize_jira_flow(self):
+        """Test the delivery flow metrics of the digest, computed from status changes."""
+        tasks = [
+            {
+                "key": "FLOW-1",
+                "summary": "Login",
+                "status": {"name": "Done"},
+                "created": "2024-01-01T00:00:00.000Z",
+                "resolved": "2024-01-11T00:00:00.000Z",
+                "status_changes": [
+                    {"at": "2024-01-03T00:00:00.000Z", "from": "To Do", "to": "In Progress"},
+                    {"at": "2024-01-10T00:00:00.000Z", "from": "In Progress", "to": "Review"},
+                    {"at": "2024-01-11T00:00:00.000Z", "from": "Review", "to": "Done"}
+                ]
+            },
+            {
+                "key": "FLOW-2",
+                "summary": "Search",
+                "status": {"name": "Done"},
+                "created": "2024-01-02T00:00:00.000Z",
+                "resolved": "2024-01-24T00:00:00.000Z",
+                "status_changes": [
+                    {"at": "2024-01-04T00:00:00.000Z", "from": "To Do", "to": "In Progress"},
+                    {"at": "2024-01-24T00:00:00.000Z", "from": "In Progress", "to": "Done"}
+                ]
+            },
+            {"key": "FLOW-3", "summary": "Export", "status": {"name": "To Do"},
+             "created": "2024-01-05T00:00:00.000Z", "status_changes": []}
+        ]
+        
+        # The task list is unchanged
+        self.assertNotIn("## Delivery Flow", self.summarizer._summarize_jira_tasks(tasks))
+        
+        self.summarizer.jira_summary_mode = "digest"
+        result = self.summarizer._summarize_jira_tasks(tasks)
+        
+        self.assertIn("## Delivery Flow", result)
+        self.assertIn("- Median: 16.0 days", result)
+        self.assertIn("- Cycle time: median 14.0 days", result)
+        # Both issues were resolved two weeks apart, with an empty week in between
+        self.assertIn("- Throughput: 0.7 issues per week over 3 weeks", result)
+        self.assertIn("2024-01-08: 1, 2024-01-15: 0, 2024-01-22: 1", result)
+        self.assertIn("- In Progress: median 13.5 days, 27.0 days in total over 2 stays", result)
+        
+        # Tasks without resolution or status changes have no flow section
+        self.assertNotIn("## Delivery Flow", self.summarizer._summarize_jira_tasks([tasks[2]]))
+        
+    def test_summarize_jira_themes(self):
+        """Test clustering of Jira tasks into themes."""
+        chain = self.mock_llm_chain.return_value
+        chain.run.side_effect = fake_llm_response
+        summarizer = LLMSummarizer(dict(self.test_config, jira_summary_mode="themes", jira_theme_count=2))
+        
+        tasks = []
+        for i in range(40):
+            topic = "login password oauth session" if i % 2 else "checkout payment invoice refund"
+            tasks.append({
+                "key": f"THEME-{i}",
+                "summary": f"{topic.split()[i % 4]} work",
+                "description": topic,
+                "status": {"name": "Done"}
+            })
+        
+        result = summarizer._summarize_jira_tasks(tasks)
+        
+        self.assertIn("40 issues grouped into 2 themes.", result)
+        self.assertEqual(result.count("(20 issues)"), 2)
+        self.assertEqual(result.count("Representative issues:"), 2)
+        # Both themes are described in a single batched prompt
+        self.assertEqual(chain.run.call_count, 1)
+        
     def test_empty_data(self):
         """Test handling of empty data."""
         empty_data = {
@@ -187,5 +398,295 @@ class TestLLMSummarizer(unittest.TestCase):
             self.assertIn("Error generating summary", result)
 
 
+class TestSectionGraph(unittest.TestCase):
+    """Test cases for the section graph."""
+    
+    def test_independent_sections_run_concurrently(self):
+        """Test that independent sections overlap and outputs keep their order."""
+        barrier = threading.Barrier(2, timeout=5)
+        
+        def section(name):
+            def run(_):
+                barrier.wait()
+                return name
+            return run
+        
+        graph = SectionGraph(max_workers=2)
+        graph.add("slow", section("slow"))
+        graph.add("fast", section("fast"))
+        graph.add("hidden", lambda _: "hidden", output=False)
+        graph.add("none", lambda _: None)
+        graph.add("overview", lambda results: results["slow"] + "+" + results["fast"],
+                  dependencies=["slow", "fast"])
+        
+        self.assertEqual(list(graph.execute()), [("slow", "slow"), ("fast", "fast"), ("overview", "slow+fast")])
+        self.assertEqual(set(graph.timings), {"slow", "fast", "hidden", "none", "overview"})
+        
+    def test_invalid_nodes(self):
+        """Test that duplicate names and unknown dependencies are rejected."""
+        graph = SectionGraph()
+        graph.add("a", lambda _: "a")
+        
+        with self.assertRaises(ValueError):
+            graph.add("a", lambda _: "a")
+        with self.assertRaises(ValueError):
+            graph.add("b", lambda _: "b", dependencies=["c"])
+        
+    def test_errors_are_raised(self):
+        """Test that an error of a node is raised by execute."""
+        def fail(_):
+            raise RuntimeError("boom")
+        
+        graph = SectionGraph()
+        graph.add("a", lambda _: "a")
+        graph.add("b", fail)
+        graph.add("c", lambda results: "c", dependencies=["b"])
+        
+        with self.assertRaises(RuntimeError):
+            list(graph.execute())
+
+
+class TestPromptBatcher(unittest.TestCase):
+    """Test cases for the prompt batcher."""
+    
+    def test_pack_respects_budget(self):
+        """Test that small items are packed within the token budget."""
+        batcher = PromptBatcher(MagicMock(), token_budget=100, max_items=3)
+        items = [(str(i), "x" * 80) for i in range(7)] + [("large", "x" * 400)]
+        
+        batches = batcher.pack(items)
+        
+        self.assertEqual(batches[0], [("large", "x" * 400)])
+        self.assertEqual([len(batch) for batch in batches[1:]], [3, 3, 1])
+        
+    def test_summarize_splits_batched_response(self):
+        """Test that a batched response is split into per-item results."""
+        complete = MagicMock(side_effect=fake_llm_response)
+        batcher = PromptBatcher(complete)
+        
+        results = batcher.summarize([("a", "first"), ("b", "second")], "Instruction", "{text}")
+        
+        self.assertEqual(complete.call_count, 1)
+        self.assertEqual(results, {"a": "Summary of item a", "b": "Summary of item b"})
+        
+    def test_summarize_falls_back_to_single_calls(self):
+        """Test the fallback for unparseable and incomplete batched responses."""
+        complete = MagicMock(side_effect=['{"a": "Summary of a"}', "Summary of b"])
+        batcher = PromptBatcher(complete)
+        
+        results = batcher.summarize([("a", "first"), ("b", "second")], "Instruction", "Single: {text}")
+        
+        self.assertEqual(results, {"a": "Summary of a", "b": "Summary of b"})
+        complete.assert_called_with("Single: second")
+        
+        complete = MagicMock(return_value="not json")
+        results = PromptBatcher(complete).summarize([("a", "first"), ("b", "second")], "Instruction", "{text}")
+        self.assertEqual(complete.call_count, 3)
+        self.assertEqual(results, {"a": "not json", "b": "not json"})
+
+
+class TestClustering(unittest.TestCase):
+    """Test cases for the offline theme clustering."""
+    
+    def test_cluster_texts(self):
+        """Test that texts on distinct topics end up in distinct themes."""
+        texts = [
+            "search index query ranking" if i % 3 else "button layout modal page"
+            for i in range(90)
+        ]
+        
+        themes = cluster_texts(texts, n_clusters=2, n_representatives=2)
+        
+        self.assertEqual([len(theme.members) for theme in themes], [60, 30])
+        self.assertTrue(all(texts[index] == texts[themes[0].members[0]] for index in themes[0].members))
+        self.assertEqual(len(themes[1].representatives), 2)
+        self.assertIn("layout", themes[1].terms)
+        
+    def test_cluster_texts_empty(self):
+        """Test clustering without texts."""
+        self.assertEqual(cluster_texts([]), [])
+
+
+class TestBM25Index(unittest.TestCase):
+    """Test cases for the BM25 retrieval index."""
+    
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.index = BM25Index()
+        for text in [
+            "The payment service talks to the billing database",
+            "Login uses OAuth with short lived tokens",
+            "The main risk is the migration of the billing database",
+            "Weekly meeting notes"
+        ]:
+            self.index.add({"source": "Test", "title": text[:10], "text": text})
+    
+    def test_search_ranks_matching_passages(self):
+        """Test BM25 ranking of matching passages."""
+        results = self.index.search("billing database risk", k=2)
+        
+        self.assertEqual(len(results), 2)
+        self.assertTrue(results[0][1]["text"].startswith("The main risk"))
+        self.assertGreater(results[0][0], results[1][0])
+        self.assertEqual(self.index.search("unrelated words"), [])
+    
+    def test_save_and_load(self):
+        """Test persistence of the index."""
+        with tempfile.TemporaryDirectory() as index_dir:
+            path = os.path.join(index_dir, "index.json.gz")
+            self.index.save(path)
+            loaded = BM25Index.load(path)
+        
+        self.assertEqual(
+            [passage["text"] for _, passage in loaded.search("oauth tokens")],
+            [passage["text"] for _, passage in self.index.search("oauth tokens")]
+        )
+
+
+class TestRecordReplayBackends(unittest.TestCase):
+    """Test cases for the record and replay LLM backends."""
+    
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "recording.jsonl")
+        
+        # Record two prompts with known latencies
+        chain = MagicMock()
+        chain.run.side_effect = lambda prompt: f"Response to {prompt}"
+        times = iter([0.0, 0.25, 1.0, 1.5, 2.0, 2.75])
+        recorder = RecordingBackend(ChainBackend(chain), self.path, clock=lambda: next(times))
+        for prompt in ["first", "second", "first"]:
+            recorder.complete(prompt)
+        
+    def tearDown(self):
+        """Tear down test fixtures, if any."""
+        self.temp_dir.cleanup()
+    
+    def test_replay_reproduces_responses_and_latency(self):
+        """Test that replay serves recorded responses with recorded timing."""
+        sleeps = []
+        replay = ReplayBackend(self.path, sleep=sleeps.append)
+        
+        self.assertEqual(replay.complete("second"), "Response to second")
+        self.assertEqual(replay.complete("first"), "Response to first")
+        self.assertEqual(replay.complete("first"), "Response to first")
+        self.assertEqual(sleeps, [0.5, 0.25, 0.75])
+        
+        fast = ReplayBackend(self.path, speed=2.0, sleep=sleeps.append)
+        fast.complete("second")
+        self.assertEqual(sleeps[-1], 0.25)
+    
+    def test_replay_misses(self):
+        """Test unrecorded prompts in strict and lenient mode."""
+        with self.assertRaises(ReplayMissError):
+            ReplayBackend(self.path, strict=True, sleep=lambda _: None).complete("unknown")
+        
+        sleeps = []
+        replay = ReplayBackend(self.path, sleep=sleeps.append)
+        self.assertIn("No recorded response", replay.complete("unknown"))
+        self.assertIn(sleeps[0], [0.25, 0.5, 0.75])
+        self.assertEqual(replay.misses, 1)
+    
+    def test_summarizer_replays_without_api_key(self):
+        """Test that the summarizer runs offline on a recording."""
+        with patch.dict(os.environ, {"OPENAI_API_KEY": ""}):
+            summarizer = LLMSummarizer({"backend": "replay", "recording_file": self.path, "replay_speed": 0})
+        
+        result = summarizer.generate_summary({
+            "drive_documents": [{"name": "Doc", "content": "Some content"}],
+            "project_id": "REPLAY-1"
+        })
+        
+        self.assertIn("Project Summary: REPLAY-1", result)
+        self.assertIn("No recorded response", result)
+
+
+class RateLimitError(Exception):
+    """Stand-in for a provider rate-limit error."""
+    status_code = 429
+
+
+class FakeClock:
+    """Manually advanced clock whose sleep advances the time."""
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+    
+    def __call__(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestLLMScheduler(unittest.TestCase):
+    """Test cases for the rate-limit aware scheduler."""
+    
+    def setUp(self):
+        """Set up test fixtures, if any."""
+        self.clock = FakeClock()
+    
+    def make_scheduler(self, **kwargs):
+        return LLMScheduler(clock=self.clock, sleep=self.clock.sleep, jitter=lambda: 0.5, **kwargs)
+    
+    def test_token_bucket_wait(self):
+        """Test that overdrawing the bucket returns the time to refill."""
+        bucket = TokenBucket(60, clock=self.clock)
+        
+        self.assertEqual(bucket.reserve(60), 0.0)
+        self.assertAlmostEqual(bucket.reserve(30), 30.0)
+        self.clock.now += 30
+        self.assertAlmostEqual(bucket.reserve(1), 1.0)
+    
+    def test_token_limit_delays_requests(self):
+        """Test that calls wait for the tokens-per-minute budget."""
+        scheduler = self.make_scheduler(tokens_per_minute=1000)
+        
+        scheduler.call(lambda: "first", 1000)
+        scheduler.call(lambda: "second", 500)
+        
+        self.assertEqual(len(self.clock.sleeps), 1)
+        self.assertAlmostEqual(self.clock.sleeps[0], 30.0)
+    
+    def test_throttling_retries_and_decreases_concurrency(self):
+        """Test AIMD decrease and jittered retry on 429 responses."""
+        scheduler = self.make_scheduler(initial_concurrency=8)
+        request = MagicMock(side_effect=[RateLimitError("slow down"), "ok"])
+        
+        result = scheduler.call(request, 10)
+        
+        self.assertEqual(result, "ok")
+        self.assertEqual(scheduler.concurrency, 4)
+        self.assertEqual(scheduler.stats["throttled"], 1)
+        self.assertEqual(self.clock.sleeps, [0.5])
+    
+    def test_success_increases_concurrency(self):
+        """Test additive increase after a window of fast calls."""
+        scheduler = self.make_scheduler(initial_concurrency=2, max_concurrency=3)
+        
+        for _ in range(3):
+            scheduler.call(lambda: "ok", 10)
+        self.assertEqual(scheduler.concurrency, 3)
+        
+        for _ in range(10):
+            scheduler.call(lambda: "ok", 10)
+        self.assertEqual(scheduler.concurrency, 3)
+    
+    def test_non_transient_errors_are_raised(self):
+        """Test that other errors are not retried."""
+        scheduler = self.make_scheduler()
+        request = MagicMock(side_effect=ValueError("bad prompt"))
+        
+        with self.assertRaises(ValueError):
+            scheduler.call(request, 10)
+        self.assertEqual(request.call_count, 1)
+    
+    def test_shared_scheduler(self):
+        """Test that the scheduler is shared process-wide."""
+        self.assertIs(get_shared_scheduler({}), get_shared_scheduler({"requests_per_minute": 1}))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -2,6 +2,9 @@
 Tests for the Notion adapter.
 """
 
+from datetime import datetime, timezone
+import tempfile
+import threading
 import unittest
 from unittest.mock import MagicMock, patch
 import os
@@ -74,7 +77,8 @@ NOTION_BLOCKS = {
 }
 
 # Import the classes after setting up the mocks
-from src.adapters.notion import NotionClient
+from src.adapters.notion import BlockPublisher, NotionClient, PublishError
+from src.adapters.notion_markdown import blocks_to_markdown, markdown_to_blocks
 
 
 class TestNotionAdapter(unittest.TestCase):
@@ -164,6 +168,290 @@ class TestNotionAdapter(unittest.TestCase):
         mock_create_summary_page.assert_called_once_with("test-page-id", "Test documentation")
         self.assertEqual(result, "https://notion.so/new-page")
         
+    def test_append_to_page_batches_blocks(self):
+        """Test that appended content is split into API-sized batches."""
+        content = "\n".join(f"- Item {i}" for i in range(250))
+        
+        self.notion_client.append_to_page("summary-page-id", content)
+        
+        append = self.notion_client.client.blocks.children.append
+        self.assertEqual(append.call_count, 3)
+        batch_sizes = [len(call.kwargs["children"]) for call in append.call_args_list]
+        self.assertEqual(batch_sizes, [100, 100, 50])
+        self.assertEqual(append.call_args_list[0].kwargs["children"][0]["type"], "bulleted_list_item")
+        
+    def _mock_workspace(self, children):
+        """Serve blocks.children.list from a dictionary of block ID to child blocks, two per page."""
+        def list_children(block_id, page_size=100, start_cursor=None):
+            start = int(start_cursor or 0)
+            results = children.get(block_id, [])
+            return {
+                "results": results[start:start + 2],
+                "next_cursor": str(start + 2),
+                "has_more": start + 2 < len(results)
+            }
+        
+        self.notion_client.client.blocks.children.list.side_effect = list_children
+        self.notion_client.client.pages.retrieve.return_value = NOTION_PAGE
+        
+    def _paragraph(self, block_id, text, **kwargs):
+        return dict({"id": block_id, "type": "paragraph",
+                     "paragraph": {"rich_text": [{"plain_text": text}]}}, **kwargs)
+        
+    def test_get_project_data_fetches_block_tree(self):
+        """Test that paginated, nested blocks and linked pages are fetched."""
+        self._mock_workspace({
+            "test-page-id": [
+                self._paragraph("p1", "First"),
+                self._paragraph("p2", "Second", has_children=True),
+                self._paragraph("p3", "Third"),
+                {"id": "child-page", "type": "child_page", "child_page": {"title": "Design"}, "has_children": True}
+            ],
+            "p2": [self._paragraph("p2a", "Nested")],
+            "child-page": [
+                self._paragraph("c1", "Design notes"),
+                {"id": "back-link", "type": "link_to_page", "link_to_page": {"type": "page_id", "page_id": "test-page-id"}},
+                {"id": "deep-link", "type": "link_to_page", "link_to_page": {"type": "page_id", "page_id": "deep-page"}}
+            ],
+            "deep-page": [self._paragraph("d1", "Deep content")],
+        })
+        
+        result = self.notion_client.get_project_data("test-page-id")
+        
+        self.assertEqual(result["title"], "Test Project")
+        self.assertEqual(result["properties"]["jira-url"]["url"], "https://jira.example.com/projects/TEST")
+        self.assertLess(result["content"].index("Second"), result["content"].index("Nested"))
+        self.assertLess(result["content"].index("Nested"), result["content"].index("Third"))
+        self.assertIn("## Design\n\nDesign notes", result["content"])
+        self.assertIn("Deep content", result["content"])
+        # The link back to the project page is not followed again
+        self.assertEqual([page["id"] for page in result["linked_pages"]], ["child-page", "deep-page"])
+        
+    def test_get_project_data_uses_page_cache(self):
+        """Test that unchanged pages are served from the cache and edited ones refetched."""
+        children = {
+            "test-page-id": [self._paragraph("p1", "Root", has_children=True),
+                             {"id": "child-page", "type": "child_page", "child_page": {"title": "Design"}}],
+            "p1": [self._paragraph("p1a", "Nested")],
+            "child-page": [self._paragraph("c1", "Design notes")],
+        }
+        edited = {"test-page-id": "2023-01-10T00:00:00.000Z", "child-page": "2023-01-01T00:00:00.000Z"}
+        
+        with tempfile.TemporaryDirectory() as cache_dir:
+            client = NotionClient(dict(self.test_config, cache_dir=cache_dir))
+            self.notion_client = client
+            self._mock_workspace(children)
+            client.client.pages.retrieve.side_effect = lambda page_id: dict(
+                NOTION_PAGE, id=page_id, last_edited_time=edited[page_id]
+            )
+            list_children = client.client.blocks.children.list
+            
+            first = client.get_project_data("test-page-id")
+            self.assertEqual(list_children.call_count, 3)
+            
+            # Unchanged pages are read from the cache, nested blocks included
+            list_children.reset_mock()
+            second = client.get_project_data("test-page-id")
+            self.assertEqual(list_children.call_count, 0)
+            self.assertEqual(second["content"], first["content"])
+            
+            # An edited linked page is fetched again
+            children["child-page"] = [self._paragraph("c1", "New design notes")]
+            edited["child-page"] = "2023-02-01T00:00:00.000Z"
+            third = client.get_project_data("test-page-id")
+            self.assertEqual([call.kwargs["block_id"] for call in list_children.call_args_list], ["child-page"])
+            self.assertIn("New design notes", third["content"])
+            self.assertEqual(client.cache_stats(), {"hits": 3, "misses": 3, "stores": 3})
+        
+    def test_page_cache_skips_incomplete_and_recently_edited_pages(self):
+        """Test that pages with failed nested fetches or edited in the last minute are not cached."""
+        children = {
+            "test-page-id": [self._paragraph("p1", "Root", has_children=True),
+                             {"id": "child-page", "type": "child_page", "child_page": {"title": "Design"}}],
+            "child-page": [self._paragraph("c1", "Design notes")],
+        }
+        recent = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:00.000Z")
+        edited = {"test-page-id": "2023-01-10T00:00:00.000Z", "child-page": recent}
+        
+        with tempfile.TemporaryDirectory() as cache_dir:
+            client = NotionClient(dict(self.test_config, cache_dir=cache_dir))
+            self.notion_client = client
+            self._mock_workspace(children)
+            served = client.client.blocks.children.list.side_effect
+            
+            def list_children(block_id, **kwargs):
+                if block_id == "p1":
+                    raise ServerError("unavailable")
+                return served(block_id, **kwargs)
+            
+            client.client.blocks.children.list.side_effect = list_children
+            client.client.pages.retrieve.side_effect = lambda page_id: dict(
+                NOTION_PAGE, id=page_id, last_edited_time=edited[page_id]
+            )
+            
+            client.get_project_data("test-page-id")
+            
+            self.assertEqual(client.cache_stats()["stores"], 0)
+        
+    def _mock_database(self, rows):
+        """Serve a database of decisions, two rows per response page."""
+        databases = self.notion_client.client.databases
+        databases.retrieve.return_value = {
+            "id": "db1",
+            "title": [{"plain_text": "Decisions"}],
+            "properties": {
+                "Name": {"id": "title", "type": "title"},
+                "Date": {"id": "a%3Bc", "type": "date"},
+                "Status": {"id": "xYz1", "type": "status"},
+            }
+        }
+        
+        def query(database_id, page_size=100, start_cursor=None, **kwargs):
+            start = int(start_cursor or 0)
+            end = start + min(page_size, 2)
+            return {"results": rows[start:end], "next_cursor": str(end), "has_more": end < len(rows)}
+        
+        databases.query.side_effect = query
+        
+    def _row(self, i):
+        return {
+            "id": f"row{i}",
+            "url": f"https://notion.so/row{i}",
+            "properties": {
+                "Name": {"type": "title", "title": [{"plain_text": f"Decision {i}"}]},
+                "Date": {"type": "date", "date": {"start": f"2023-01-0{i + 1}", "end": None}},
+                "Status": {"type": "status", "status": {"name": "Accepted"}},
+                "Notes": {"type": "rich_text", "rich_text": []},
+            }
+        }
+        
+    def test_query_database_pushes_down_filters(self):
+        """Test that filters, sorts and properties are sent to the API and rows are paginated."""
+        self.notion_client.config["databases"] = {
+            "filter": {"property": "Status", "status": {"equals": "Accepted"}},
+            "sorts": [{"property": "Date", "direction": "descending"}, {"property": "Missing", "direction": "ascending"}],
+            "filter_properties": ["Name", "Date", "Status", "Missing"],
+            "max_rows": 5
+        }
+        self._mock_database([self._row(i) for i in range(7)])
+        
+        records = list(self.notion_client.query_database("db1"))
+        
+        self.assertEqual(len(records), 5)
+        self.assertEqual(records[0], {
+            "id": "row0", "title": "Decision 0", "url": "https://notion.so/row0",
+            "properties": {"Date": "2023-01-01", "Status": "Accepted"}
+        })
+        query = self.notion_client.client.databases.query
+        self.assertEqual(query.call_count, 3)
+        first_call = query.call_args_list[0].kwargs
+        self.assertEqual(first_call["filter"], {"property": "Status", "status": {"equals": "Accepted"}})
+        self.assertEqual(first_call["sorts"], [{"property": "Date", "direction": "descending"}])
+        self.assertEqual(first_call["filter_properties"], ["title", "a%3Bc", "xYz1"])
+        
+    def test_get_project_data_reads_linked_databases(self):
+        """Test that databases embedded in the project page are returned as records."""
+        self._mock_workspace({"test-page-id": [
+            {"id": "db1", "type": "child_database", "child_database": {"title": "Decisions"}}
+        ]})
+        self._mock_database([self._row(0)])
+        
+        result = self.notion_client.get_project_data("test-page-id")
+        
+        self.assertEqual(result["databases"][0]["title"], "Decisions")
+        self.assertEqual(result["databases"][0]["records"][0]["title"], "Decision 0")
+        
+    def test_get_project_data_honors_search_depth(self):
+        """Test that linked pages beyond search_depth are not fetched."""
+        self.notion_client.config["search_depth"] = 1
+        self._mock_workspace({
+            "test-page-id": [{"id": "child-page", "type": "child_page", "child_page": {"title": "Design"}}],
+            "child-page": [{"id": "deep-link", "type": "link_to_page",
+                            "link_to_page": {"type": "page_id", "page_id": "deep-page"}}],
+            "deep-page": [self._paragraph("d1", "Deep content")],
+        })
+        
+        result = self.notion_client.get_project_data("test-page-id")
+        
+        self.assertEqual([page["id"] for page in result["linked_pages"]], ["child-page"])
+        fetched = [call.kwargs["block_id"] for call in self.notion_client.client.blocks.children.list.call_args_list]
+        self.assertNotIn("deep-page", fetched)
+        
+    def _listed(self, markdown, prefix):
+        """Blocks as listed by the API for a page created from markdown."""
+        blocks = markdown_to_blocks(markdown)
+        for i, block in enumerate(blocks):
+            block["id"] = f"{prefix}{i}"
+        return blocks
+        
+    def test_update_summary_page_changes_only_modified_blocks(self):
+        """Test that an update patches, inserts and deletes only the changed blocks."""
+        old_markdown = "# Project Summary: P\n\nGenerated on: Monday\n\n## Tasks\n\n- A\n- B\n- C\n\n" + \
+            "\n".join(f"Unchanged {i}" for i in range(200))
+        new_markdown = "# Project Summary: P\n\nGenerated on: Tuesday\n\n## Tasks\n\n- A\n- B2\n- New\n- C\n\n" + \
+            "\n".join(f"Unchanged {i}" for i in range(199))
+        children = {
+            "P": [{"id": "old-summary", "type": "child_page", "child_page": {"title": "Project Summary: P"}},
+                  {"id": "summary", "type": "child_page", "child_page": {"title": "Project Summary: P"}}],
+            "summary": self._listed(old_markdown, "b")
+        }
+        self._mock_workspace(children)
+        client = self.notion_client.client
+        client.pages.retrieve.return_value = {"url": "https://notion.so/summary"}
+        client.blocks.children.append.return_value = {"results": [{"id": "inserted"}]}
+        
+        url = self.notion_client.update_summary_page("P", new_markdown)
+        
+        self.assertEqual(url, "https://notion.so/summary")
+        # "Generated on" and "B" are patched in place
+        self.assertEqual([call.kwargs["block_id"] for call in client.blocks.update.call_args_list], ["b1", "b4"])
+        # "New" is inserted after the patched "B2"
+        append = client.blocks.children.append
+        self.assertEqual(append.call_count, 1)
+        self.assertEqual(append.call_args.kwargs["after"], "b4")
+        self.assertEqual(append.call_args.kwargs["children"][0]["bulleted_list_item"]["rich_text"][0]["text"]["content"], "New")
+        # The last paragraph is deleted
+        client.blocks.delete.assert_called_once_with(block_id="b205")
+        
+    def test_update_summary_page_skips_generation_time_only_changes(self):
+        """Test that a summary differing only in its generation time is not written."""
+        markdown = "# Project Summary: P\n\nGenerated on: {}\n\n## Tasks\n\n- A"
+        self._mock_workspace({
+            "P": [{"id": "summary", "type": "child_page", "child_page": {"title": "Project Summary: P"}}],
+            "summary": self._listed(markdown.format("Monday"), "b")
+        })
+        client = self.notion_client.client
+        client.pages.retrieve.return_value = {"url": "https://notion.so/summary"}
+        
+        self.notion_client.update_summary_page("P", markdown.format("Tuesday"))
+        
+        client.blocks.update.assert_not_called()
+        client.blocks.children.append.assert_not_called()
+        client.blocks.delete.assert_not_called()
+        
+    def test_block_hash_covers_the_whole_payload(self):
+        """Test that block hashes cover nested children and options, but not listing metadata."""
+        block_hash = self.notion_client._block_hash
+        image = lambda url: {"type": "image", "image": {"type": "external", "external": {"url": url}}}
+        table = lambda cell: {"type": "table", "table": {"table_width": 1}, "children": [
+            {"type": "table_row", "table_row": {"cells": [[{"plain_text": cell}]]}}
+        ]}
+        
+        self.assertNotEqual(block_hash(image("a.png")), block_hash(image("b.png")))
+        self.assertNotEqual(block_hash(table("1")), block_hash(table("2")))
+        listed = {"id": "b0", "type": "paragraph", "has_children": False, "paragraph": {
+            "rich_text": [{"type": "text", "plain_text": "Text", "annotations": {"bold": False}}],
+            "color": "default"
+        }}
+        self.assertEqual(block_hash(listed), block_hash(markdown_to_blocks("Text")[0]))
+        
+    def test_update_summary_page_creates_missing_page(self):
+        """Test that a page is created when the project has no summary page yet."""
+        self._mock_workspace({})
+        self.notion_client.client.pages.create.return_value = {"id": "new-page-id", "url": "https://notion.so/new"}
+        
+        self.assertEqual(self.notion_client.update_summary_page("P", "# Summary"), "https://notion.so/new")
+        
     def test_blocks_to_text(self):
         """Test conversion of Notion blocks to text."""
         # Test with simplified blocks
@@ -196,5 +484,196 @@ class TestNotionAdapter(unittest.TestCase):
         self.assertIn("- Bullet point", result)
 
 
+def _block(block_type, text="", children=None, **data):
+    """Build a block with a single rich text span split in two."""
+    block = {"type": block_type, block_type: dict(data)}
+    if text:
+        middle = len(text) // 2
+        block[block_type]["rich_text"] = [{"plain_text": text[:middle]}, {"plain_text": text[middle:]}]
+    if children:
+        block["children"] = children
+    return block
+
+
+class TestNotionMarkdown(unittest.TestCase):
+    """Test cases for the conversion of Notion blocks to markdown."""
+    
+    def test_all_rich_text_spans(self):
+        """Test that every rich text span is kept."""
+        self.assertEqual(blocks_to_markdown([_block("heading_2", "Split heading")]), "## Split heading")
+        
+    def test_nested_lists_and_toggles(self):
+        """Test numbering and indentation of nested blocks."""
+        blocks = [
+            _block("numbered_list_item", "One"),
+            _block("numbered_list_item", "Two", children=[
+                _block("bulleted_list_item", "Nested", children=[_block("to_do", "Deep", checked=True)])
+            ]),
+            _block("paragraph", "Break"),
+            _block("numbered_list_item", "Restart"),
+            _block("toggle", "Details", children=[_block("paragraph", "Hidden")]),
+        ]
+        
+        self.assertEqual(blocks_to_markdown(blocks), "\n\n".join([
+            "1. One", "2. Two", "  - Nested", "    - [x] Deep", "Break", "1. Restart", "- Details", "  Hidden"
+        ]))
+        
+    def test_code_callout_and_table(self):
+        """Test blocks with special formatting."""
+        blocks = [
+            _block("code", "print(1)\nprint(2)", language="python"),
+            _block("callout", "Heads up", icon={"type": "emoji", "emoji": "!"}),
+            _block("divider"),
+            {"type": "table", "table": {"table_width": 2, "has_column_header": True}, "children": [
+                {"type": "table_row", "table_row": {"cells": [[{"plain_text": "Name"}], [{"plain_text": "Owner"}]]}},
+                {"type": "table_row", "table_row": {"cells": [[{"plain_text": "API"}], [{"plain_text": "Ann"}]]}},
+            ]},
+            {"type": "column_list", "column_list": {}, "children": [
+                {"type": "column", "column": {}, "children": [_block("paragraph", "In a column")]}
+            ]},
+            _block("unknown_type", "Fallback text"),
+        ]
+        
+        self.assertEqual(blocks_to_markdown(blocks), "\n\n".join([
+            "```python\nprint(1)\nprint(2)\n```",
+            "> ! Heads up",
+            "---",
+            "| Name | Owner |\n| --- | --- |\n| API | Ann |",
+            "In a column",
+            "Fallback text"
+        ]))
+        
+    def test_deep_nesting(self):
+        """Test that deeply nested blocks do not hit the recursion limit."""
+        block = _block("paragraph", "Leaf")
+        for _ in range(5000):
+            block = _block("synced_block", children=[block])
+        
+        self.assertEqual(blocks_to_markdown([block]), "Leaf")
+
+    def test_markdown_to_blocks(self):
+        """Test conversion of markdown to blocks."""
+        blocks = markdown_to_blocks("\n".join([
+            "# Title", "1. First", "- [x] Done", "> Quote", "---", "```python", "  x = 1", "```", "Text"
+        ]))
+        
+        self.assertEqual([block["type"] for block in blocks], [
+            "heading_1", "numbered_list_item", "to_do", "quote", "divider", "code", "paragraph"
+        ])
+        self.assertTrue(blocks[2]["to_do"]["checked"])
+        self.assertEqual(blocks[5]["code"]["language"], "python")
+        self.assertEqual(blocks[5]["code"]["rich_text"][0]["text"]["content"], "  x = 1")
+        
+        # Round trip through the reverse conversion
+        self.assertEqual(blocks_to_markdown(markdown_to_blocks("## Goals\n\n- Ship it")), "## Goals\n\n- Ship it")
+
+
+class ServerError(Exception):
+    status_code = 503
+
+
+class TestBlockPublisher(unittest.TestCase):
+    """Test cases for the block publisher."""
+    
+    def setUp(self):
+        self.client = MagicMock()
+        self.append = self.client.blocks.children.append
+        
+    def _sent(self):
+        return [[block["paragraph"]["rich_text"][0]["text"]["content"] for block in call.kwargs["children"]]
+                for call in self.append.call_args_list]
+        
+    def _lines(self, start, count):
+        return "\n".join(f"Line {i}" for i in range(start, start + count))
+        
+    def test_batches_grow_while_a_request_is_in_flight(self):
+        """Test that blocks written during a request are packed into full batches."""
+        release = threading.Event()
+        self.append.side_effect = lambda **kwargs: release.wait(5)
+        
+        publisher = BlockPublisher(self.client, "page-id")
+        publisher.write(self._lines(0, 60))
+        publisher.write(self._lines(60, 60))
+        publisher.write(self._lines(120, 60))
+        release.set()
+        publisher.close()
+        
+        self.assertEqual([len(batch) for batch in self._sent()], [60, 100, 20])
+        self.assertEqual(sum(self._sent(), []), [f"Line {i}" for i in range(180)])
+        
+    def test_transient_errors_are_retried(self):
+        """Test that a batch is retried after a server error."""
+        self.append.side_effect = [ServerError("unavailable"), None]
+        
+        with BlockPublisher(self.client, "page-id", sleep=lambda seconds: None) as publisher:
+            publisher.write(self._lines(0, 10))
+        
+        self.assertEqual(self.append.call_count, 2)
+        self.assertEqual(publisher.acknowledged, 1)
+        
+    def test_timed_out_appends_are_checked_before_they_are_sent_again(self):
+        """Test that an append that timed out is only sent again if the page does not end with it."""
+        listed = []
+        self.client.blocks.children.list.side_effect = lambda **kwargs: {"results": listed, "has_more": False}
+        
+        def append(block_id, children):
+            if self.append.call_count == 1:
+                # Applied by Notion, but the response is lost
+                listed.extend(children)
+                raise TimeoutError("read timed out")
+            if self.append.call_count == 2:
+                raise TimeoutError("read timed out")
+            listed.extend(children)
+        self.append.side_effect = append
+        
+        with BlockPublisher(self.client, "page-id", sleep=lambda seconds: None) as publisher:
+            publisher.write(self._lines(0, 10))
+            publisher.write(self._lines(10, 10))
+        
+        self.assertEqual(self.append.call_count, 3)
+        self.assertEqual(self._sent()[1], self._sent()[2])
+        self.assertEqual(self.client.blocks.children.list.call_count, 2)
+        self.assertEqual(publisher.acknowledged, 2)
+        
+    def test_resume_from_last_acknowledged_batch(self):
+        """Test that a failed publication resumes without resending acknowledged batches."""
+        self.append.side_effect = [None, ValueError("invalid"), None, None]
+        publisher = BlockPublisher(self.client, "page-id")
+        
+        # Three full batches, the second one fails
+        publisher.write(self._lines(0, 300))
+        with self.assertRaises(PublishError) as context:
+            publisher.close()
+        self.assertEqual(context.exception.acknowledged, 1)
+        self.assertEqual(self.append.call_count, 2)
+        
+        publisher.resume()
+        
+        sent = self._sent()
+        self.assertEqual(sent[2][0], "Line 100")
+        self.assertEqual(sent[3][-1], "Line 299")
+        self.assertEqual(publisher.acknowledged, 3)
+        
+    def test_publish_sections_resumes_after_a_failed_batch(self):
+        """Test that published sections resume from the failed batch and keep their order."""
+        self.append.side_effect = [None, ValueError("invalid"), None, None, None]
+        notion = NotionClient({})
+        notion.client = self.client
+        
+        notion.publish_sections("page-id", [self._lines(0, 150), self._lines(150, 100), self._lines(250, 50)])
+        
+        self.assertEqual(sum(self._sent()[:1] + self._sent()[2:], []), [f"Line {i}" for i in range(300)])
+        
+    def test_publish_sections_gives_up_after_the_last_resume(self):
+        """Test that a batch failing on every resume is raised."""
+        self.append.side_effect = ValueError("invalid")
+        notion = NotionClient({"publish_resumes": 1})
+        notion.client = self.client
+        
+        with self.assertRaises(PublishError):
+            notion.publish_sections("page-id", [self._lines(0, 10)])
+        self.assertEqual(self.append.call_count, 2)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file